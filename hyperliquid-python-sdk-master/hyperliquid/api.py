@@ -2,18 +2,20 @@ import json
 import logging
 from json import JSONDecodeError
 from urllib3.exceptions import NameResolutionError
-import requests
 from requests.exceptions import Timeout,ConnectionError
+from hyperliquid.transport import HttpTransport, get_shared_transport, is_connect_failure
 from hyperliquid.utils.constants import MAINNET_API_URL
+from hyperliquid.utils.decoder import loads
 from hyperliquid.utils.error import ClientError, ServerError
-from hyperliquid.utils.types import Any
+from hyperliquid.utils.types import Any, Optional
 from vnpy.trader.utility import save_connection_status,write_log
 
 class API:
-    def __init__(self, base_url=None, timeout=None):
+    def __init__(self, base_url=None, timeout=None, transport: Optional[HttpTransport] = None):
         self.base_url = base_url or MAINNET_API_URL
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        # 未传入transport时同一base_url的客户端共用进程内连接池
+        self.transport = transport or get_shared_transport(self.base_url)
+        self.session = self.transport.client
         self._logger = logging.getLogger(__name__)
         self.timeout = timeout
         # 需要重启交易子进程的错误代码
@@ -23,36 +25,42 @@ class API:
         payload = payload or {}
         url = self.base_url + url_path
         try:
-            response = self.session.post(url, json=payload, timeout=self.timeout,verify=False)
-            status_code = response.status_code
-            if status_code // 100 == 2:
-                if status_code == 204:
-                    json_body = {}
-                else:
-                    json_body = response.json()
-                return json_body
+            response = self.transport.post(url, payload, self.timeout)
+            return self.handle_response(response)
+        except Exception as ex:
+            self.handle_exception(url, ex)
+
+    def handle_response(self, response: Any) -> Any:
+        status_code = response.status_code
+        if status_code // 100 == 2:
+            if status_code == 204:
+                json_body = {}
             else:
-                text = response.text
-                # 收到null错误返回空字典
-                if text == "null":
-                    return {}
-                # 502，504错误，重启交易子进程
-                msg = f"REST API请求失败，请求地址：{response.url}，错误代码：{status_code}，错误信息：{text}"
-                write_log(msg,"HYPERLIQUID")
-                if status_code in self.restart_error_code:
-                    save_connection_status("HYPERLIQUID",False,msg)
-                return {"error":text}
-        except ConnectionError as ex:
+                json_body = loads(response.content)
+            return json_body
+        else:
+            text = response.text
+            # 收到null错误返回空字典
+            if text == "null":
+                return {}
+            # 502，504错误，重启交易子进程
+            msg = f"REST API请求失败，请求地址：{response.url}，错误代码：{status_code}，错误信息：{text}"
+            write_log(msg,"HYPERLIQUID")
+            if status_code in self.restart_error_code:
+                save_connection_status("HYPERLIQUID",False,msg)
+            return {"error":text}
+
+    def handle_exception(self, url: str, ex: Exception) -> None:
+        if isinstance(ex, ConnectionError):
             msg = f"REST API连接断开，请求地址：{url}，错误信息：{ex}"
             write_log(msg,"HYPERLIQUID")
-            # SSL连接重试次数超限
-            if "Max retries exceeded" in str(ex):
+            # SSL连接重试次数超限或HTTP/2连接建立失败
+            if is_connect_failure(ex):
                 save_connection_status("HYPERLIQUID",False,msg)
-        except NameResolutionError as ex:
+        elif isinstance(ex, NameResolutionError):
             msg = f"DNS解析失败，无法解析域名，请求地址：{url}，错误信息：{ex}"
             write_log(msg,"HYPERLIQUID")
-        except Exception as ex:
+        else:
             msg = f"REST API运行出错，请求地址：{url}，错误信息：{ex}"
             write_log(msg,"HYPERLIQUID")
             save_connection_status("HYPERLIQUID",False,msg)
-
@@ -0,0 +1,51 @@
+"""基于httpx的异步REST客户端
+
+AsyncInfo和AsyncExchange的请求方法返回协程，可用asyncio.gather并发请求多个永续合约交易所。
+错误处理与同步API一致，需要安装httpx，安装h2时可开启HTTP/2。
+"""
+import logging
+
+from requests.exceptions import ConnectionError
+
+from hyperliquid.api import API
+from hyperliquid.transport import DEFAULT_POOL_SIZE, HEADERS, h2, httpx
+from hyperliquid.utils.constants import MAINNET_API_URL
+from hyperliquid.utils.types import Any, Optional
+
+
+class AsyncAPI(API):
+    def __init__(
+        self,
+        base_url=None,
+        timeout=None,
+        client: Optional["httpx.AsyncClient"] = None,
+        http2: bool = False,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        if httpx is None:
+            raise ImportError("异步客户端需要安装httpx")
+        self.base_url = base_url or MAINNET_API_URL
+        self._logger = logging.getLogger(__name__)
+        self.timeout = timeout
+        # 需要重启交易子进程的错误代码
+        self.restart_error_code = [502,504]
+        # 传入client时多个异步客户端共用一个连接池
+        if client is None:
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            client = httpx.AsyncClient(http2=bool(http2 and h2 is not None), limits=limits, headers=HEADERS, verify=False)
+        self.client = client
+
+    async def post(self, url_path: str, payload: Any = None) -> Any:
+        payload = payload or {}
+        url = self.base_url + url_path
+        try:
+            response = await self.client.post(url, json=payload, timeout=self.timeout)
+            return self.handle_response(response)
+        except httpx.TransportError as ex:
+            # 按requests连接错误处理
+            self.handle_exception(url, ConnectionError(str(ex)))
+        except Exception as ex:
+            self.handle_exception(url, ex)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
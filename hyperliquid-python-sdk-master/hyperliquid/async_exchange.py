@@ -0,0 +1,101 @@
+from eth_account.signers.local import LocalAccount
+
+from hyperliquid.async_api import AsyncAPI, httpx
+from hyperliquid.async_info import AsyncInfo
+from hyperliquid.exchange import Exchange, _get_dex
+from hyperliquid.info import Info
+from hyperliquid.utils.types import Any, BuilderInfo, Cloid, List, Meta, Optional, SpotMeta, Tuple
+
+
+class AsyncExchange(AsyncAPI, Exchange):
+    """Exchange的异步版本，签名在调用线程完成，下单、撤单等请求方法返回协程"""
+
+    def __init__(
+        self,
+        wallet: LocalAccount,
+        base_url: Optional[str] = None,
+        meta: Optional[Meta] = None,
+        vault_address: Optional[str] = None,
+        account_address: Optional[str] = None,
+        spot_meta: Optional[SpotMeta] = None,
+        perp_dexs: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        client: Optional["httpx.AsyncClient"] = None,
+        http2: bool = False,
+        info: Optional[Info] = None,
+    ):
+        AsyncAPI.__init__(self, base_url, timeout, client, http2)
+        self.wallet = wallet
+        self.vault_address = vault_address
+        self.account_address = account_address
+        self.info = AsyncInfo(base_url, meta, spot_meta, perp_dexs, timeout, client=self.client, info=info)
+        self.expires_after: Optional[int] = None
+
+    async def _slippage_price(
+        self,
+        name: str,
+        is_buy: bool,
+        slippage: float,
+        px: Optional[float] = None,
+    ) -> float:
+        coin = self.info.name_to_coin[name]
+        if not px:
+            # Get midprice
+            dex = _get_dex(coin)
+            px = float((await self.info.all_mids(dex))[coin])
+        return self._apply_slippage(coin, is_buy, slippage, px)
+
+    async def market_open(
+        self,
+        name: str,
+        is_buy: bool,
+        sz: float,
+        px: Optional[float] = None,
+        slippage: float = Exchange.DEFAULT_SLIPPAGE,
+        cloid: Optional[Cloid] = None,
+        builder: Optional[BuilderInfo] = None,
+    ) -> Any:
+        px = await self._slippage_price(name, is_buy, slippage, px)
+        return await self.order(
+            name, is_buy, sz, px, order_type={"limit": {"tif": "Ioc"}}, reduce_only=False, cloid=cloid, builder=builder
+        )
+
+    async def market_close(
+        self,
+        coin: str,
+        sz: Optional[float] = None,
+        px: Optional[float] = None,
+        slippage: float = Exchange.DEFAULT_SLIPPAGE,
+        cloid: Optional[Cloid] = None,
+        builder: Optional[BuilderInfo] = None,
+    ) -> Any:
+        address: str = self.wallet.address
+        if self.account_address:
+            address = self.account_address
+        if self.vault_address:
+            address = self.vault_address
+        dex = _get_dex(coin)
+        positions = (await self.info.user_state(address, dex))["assetPositions"]
+        for position in positions:
+            item = position["position"]
+            if coin != item["coin"]:
+                continue
+            szi = float(item["szi"])
+            if not sz:
+                sz = abs(szi)
+            is_buy = True if szi < 0 else False
+            px = await self._slippage_price(coin, is_buy, slippage, px)
+            return await self.order(
+                coin,
+                is_buy,
+                sz,
+                px,
+                order_type={"limit": {"tif": "Ioc"}},
+                reduce_only=True,
+                cloid=cloid,
+                builder=builder,
+            )
+
+    async def approve_agent(self, name: Optional[str] = None) -> Tuple[Any, str]:
+        result, agent_key = Exchange.approve_agent(self, name)
+        return await result, agent_key
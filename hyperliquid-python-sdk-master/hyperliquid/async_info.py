@@ -0,0 +1,63 @@
+from hyperliquid.async_api import AsyncAPI, httpx
+from hyperliquid.info import Info
+from hyperliquid.utils.meta_cache import MetaKey
+from hyperliquid.utils.types import Any, Dict, List, Meta, Optional, SpotMeta
+from vnpy.trader.utility import save_connection_status, write_log
+
+
+class AsyncInfo(AsyncAPI, Info):
+    """Info的异步版本，查询方法与Info相同，返回协程，不支持websocket订阅"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        meta: Optional[Meta] = None,
+        spot_meta: Optional[SpotMeta] = None,
+        perp_dexs: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        client: Optional["httpx.AsyncClient"] = None,
+        http2: bool = False,
+        info: Optional[Info] = None,
+    ):
+        AsyncAPI.__init__(self, base_url, timeout, client, http2)
+        self.ws_manager = None
+        # 合约元数据在构造时通过同步Info加载，已有Info时直接复用
+        if info is None:
+            info = Info(base_url, True, meta, spot_meta, perp_dexs, timeout)
+        self.coin_to_asset = getattr(info, "coin_to_asset", {})
+        self.name_to_coin = getattr(info, "name_to_coin", {})
+        self.asset_to_sz_decimals = getattr(info, "asset_to_sz_decimals", {})
+        self.meta_cache = info.meta_cache
+
+    async def cached_post(self, key: MetaKey, payload: Dict[str, Any]) -> Any:
+        # 与同步Info共用元数据缓存
+        data = self.meta_cache.peek(key)
+        if data is None:
+            data = await self.post("/info", payload)
+            self.meta_cache.put(key, data)
+        return data
+
+    async def meta(self, dex: str = "") -> Meta:
+        return await self.cached_post(("meta", self.base_url, dex), {"type": "meta", "dex": dex})
+
+    async def perp_dexs(self) -> Any:
+        return await self.cached_post(("perpDexs", self.base_url), {"type": "perpDexs"})
+
+    async def spot_meta(self) -> SpotMeta:
+        return await self.cached_post(("spotMeta", self.base_url), {"type": "spotMeta"})
+
+    async def l2_snapshot(self, name: str) -> Any:
+        if name in self.name_to_coin:
+            return await self.post("/info", {"type": "l2Book", "coin": self.name_to_coin[name]})
+        return {}
+
+    async def candles_snapshot(self, name: str, interval: str, startTime: int, endTime: int) -> Any:
+        try:
+            if name in self.name_to_coin:
+                req = {"coin": self.name_to_coin[name], "interval": interval, "startTime": startTime, "endTime": endTime}
+                return await self.post("/info", {"type": "candleSnapshot", "req": req})
+        except Exception as err:
+            msg = f"Info接口获取K线数据出错，错误信息：{err}"
+            write_log(msg,"HYPERLIQUID")
+            save_connection_status("HYPERLIQUID", False, msg)
+            return []
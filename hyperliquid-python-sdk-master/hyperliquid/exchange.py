@@ -7,6 +7,7 @@ from eth_account.signers.local import LocalAccount
 
 from hyperliquid.api import API
 from hyperliquid.info import Info
+from hyperliquid.transport import HttpTransport
 from hyperliquid.utils.constants import MAINNET_API_URL
 from hyperliquid.utils.signing import (
     CancelByCloidRequest,
@@ -68,12 +69,13 @@ class Exchange(API):
         spot_meta: Optional[SpotMeta] = None,
         perp_dexs: Optional[List[str]] = None,
         timeout: Optional[float] = None,
+        transport: Optional[HttpTransport] = None,
     ):
-        super().__init__(base_url, timeout)
+        super().__init__(base_url, timeout, transport)
         self.wallet = wallet
         self.vault_address = vault_address
         self.account_address = account_address
-        self.info = Info(base_url, True, meta, spot_meta, perp_dexs, timeout)
+        self.info = Info(base_url, True, meta, spot_meta, perp_dexs, timeout, transport=self.transport)
         self.expires_after: Optional[int] = None
 
     def _post_action(self, action, signature, nonce):
@@ -99,7 +101,9 @@ class Exchange(API):
             # Get midprice
             dex = _get_dex(coin)
             px = float(self.info.all_mids(dex)[coin])
+        return self._apply_slippage(coin, is_buy, slippage, px)
 
+    def _apply_slippage(self, coin: str, is_buy: bool, slippage: float, px: float) -> float:
         asset = self.info.coin_to_asset[coin]
         # spot assets start at 10000
         is_spot = asset >= 10_000
@@ -1,8 +1,11 @@
 from hyperliquid.api import API
+from hyperliquid.transport import HttpTransport
+from hyperliquid.utils.meta_cache import MetaCache, shared_meta_cache
 from hyperliquid.utils.types import (
     Any,
     Callable,
     Cloid,
+    Dict,
     List,
     Meta,
     Optional,
@@ -14,6 +17,23 @@ from hyperliquid.utils.types import (
 from hyperliquid.websocket_manager import WebsocketManager
 from vnpy.trader.utility import save_connection_status, write_log
 
+
+def fill_perp_meta(
+    meta: Meta,
+    offset: int,
+    coin_to_asset: Dict[str, int],
+    name_to_coin: Dict[str, str],
+    asset_to_sz_decimals: Dict[int, int],
+) -> None:
+    if not meta or "universe" not in meta:
+        return
+    for asset, asset_info in enumerate(meta["universe"]):
+        asset += offset
+        coin_to_asset[asset_info["name"]] = asset
+        name_to_coin[asset_info["name"]] = asset_info["name"]
+        asset_to_sz_decimals[asset] = asset_info["szDecimals"]
+
+
 class Info(API):
     def __init__(
         self,
@@ -24,36 +44,55 @@ class Info(API):
         # 注意：当 perp_dexs 为 None 时，将使用 "" 作为永续合约交易所。"" 代表原始交易所。
         perp_dexs: Optional[List[str]] = None,
         timeout: Optional[float] = None,
+        # typed_decode为True时websocket的l2Book和trades推送解码为结构体
+        typed_decode: bool = False,
+        transport: Optional[HttpTransport] = None,
+        # 元数据缓存，默认使用进程内共享缓存
+        meta_cache: Optional[MetaCache] = None,
     ):  # pylint: disable=too-many-locals
-        super().__init__(base_url, timeout)
+        super().__init__(base_url, timeout, transport)
+        self.meta_cache = meta_cache or shared_meta_cache
         self.ws_manager: Optional[WebsocketManager] = None
         if not skip_ws:
-            self.ws_manager = WebsocketManager(self.base_url)
+            self.ws_manager = WebsocketManager(self.base_url, typed_decode=typed_decode)
             self.ws_manager.start()
 
+        self.coin_to_asset: Dict[str, int] = {}
+        self.name_to_coin: Dict[str, str] = {}
+        self.asset_to_sz_decimals: Dict[int, int] = {}
+        self.load_meta(meta, spot_meta, perp_dexs)
+
+    def load_meta(
+        self,
+        meta: Optional[Meta] = None,
+        spot_meta: Optional[SpotMeta] = None,
+        perp_dexs: Optional[List[str]] = None,
+    ) -> None:
+        """加载元数据并重建名称和资产映射，元数据更新后可再次调用，重建完成后整体替换映射"""
         if spot_meta is None:
             spot_meta = self.spot_meta()
 
         if not spot_meta:
             return
-        self.coin_to_asset = {}
-        self.name_to_coin = {}
-        self.asset_to_sz_decimals = {}
+        coin_to_asset: Dict[str, int] = {}
+        name_to_coin: Dict[str, str] = {}
+        asset_to_sz_decimals: Dict[int, int] = {}
         if "universe" not in spot_meta:
+            self.coin_to_asset, self.asset_to_sz_decimals, self.name_to_coin = {}, {}, {}
             return
 
         # 现货资产从 10000 开始
         for spot_info in spot_meta["universe"]:
             asset = spot_info["index"] + 10000
-            self.coin_to_asset[spot_info["name"]] = asset
-            self.name_to_coin[spot_info["name"]] = spot_info["name"]
+            coin_to_asset[spot_info["name"]] = asset
+            name_to_coin[spot_info["name"]] = spot_info["name"]
             base, quote = spot_info["tokens"]
             base_info = spot_meta["tokens"][base]
             quote_info = spot_meta["tokens"][quote]
-            self.asset_to_sz_decimals[asset] = base_info["szDecimals"]
+            asset_to_sz_decimals[asset] = base_info["szDecimals"]
             name = f'{base_info["name"]}/{quote_info["name"]}'
-            if name not in self.name_to_coin:
-                self.name_to_coin[name] = spot_info["name"]
+            if name not in name_to_coin:
+                name_to_coin[name] = spot_info["name"]
 
         perp_dex_to_offset = {"": 0}
         if perp_dexs is None:
@@ -70,19 +109,17 @@ class Info(API):
         for perp_dex in perp_dexs:
             offset = perp_dex_to_offset[perp_dex]
             if perp_dex == "" and meta is not None:
-                self.set_perp_meta(meta, 0)
+                fresh_meta = meta
             else:
                 fresh_meta = self.meta(dex=perp_dex)
-                self.set_perp_meta(fresh_meta, offset)
+            fill_perp_meta(fresh_meta, offset, coin_to_asset, name_to_coin, asset_to_sz_decimals)
+        # 先替换资产映射再替换名称映射，并发调用name_to_asset时不会查到缺失的资产
+        self.coin_to_asset = coin_to_asset
+        self.asset_to_sz_decimals = asset_to_sz_decimals
+        self.name_to_coin = name_to_coin
 
     def set_perp_meta(self, meta: Meta, offset: int) -> Any:
-        if not meta or "universe" not in meta:
-            return
-        for asset, asset_info in enumerate(meta["universe"]):
-            asset += offset
-            self.coin_to_asset[asset_info["name"]] = asset
-            self.name_to_coin[asset_info["name"]] = asset_info["name"]
-            self.asset_to_sz_decimals[asset] = asset_info["szDecimals"]
+        fill_perp_meta(meta, offset, self.coin_to_asset, self.name_to_coin, self.asset_to_sz_decimals)
 
     def disconnect_websocket(self):
         if self.ws_manager is None:
@@ -293,7 +330,8 @@ class Info(API):
                 ]
             }
         """
-        return cast(Meta, self.post("/info", {"type": "meta", "dex": dex}))
+        key = ("meta", self.base_url, dex)
+        return cast(Meta, self.meta_cache.get(key, lambda: self.post("/info", {"type": "meta", "dex": dex})))
 
     def meta_and_asset_ctxs(self) -> Any:
         """获取交易所元数据和资产上下文
@@ -331,7 +369,7 @@ class Info(API):
         return self.post("/info", {"type": "metaAndAssetCtxs"})
 
     def perp_dexs(self) -> Any:
-        return self.post("/info", {"type": "perpDexs"})
+        return self.meta_cache.get(("perpDexs", self.base_url), lambda: self.post("/info", {"type": "perpDexs"}))
 
     def spot_meta(self) -> SpotMeta:
         """获取交易所现货元数据
@@ -362,7 +400,8 @@ class Info(API):
                 ]
             }
         """
-        return cast(SpotMeta, self.post("/info", {"type": "spotMeta"}))
+        key = ("spotMeta", self.base_url)
+        return cast(SpotMeta, self.meta_cache.get(key, lambda: self.post("/info", {"type": "spotMeta"})))
 
     def spot_meta_and_asset_ctxs(self) -> SpotMetaAndAssetCtxs:
         """获取交易所现货资产上下文
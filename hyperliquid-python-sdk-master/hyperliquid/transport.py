@@ -0,0 +1,126 @@
+"""共享HTTP传输层
+
+同一进程内的Info/Exchange默认按base_url共用一个连接池，避免每个客户端各自建立冷连接。
+安装httpx和h2时可开启HTTP/2多路复用，否则使用requests连接池。
+warm_interval大于0时，空闲超过warm_interval秒后台发送轻量请求保持连接，避免静默期后的第一笔委托重新进行TCP和TLS握手。
+保活默认关闭，由需要低延迟下单的调用方显式开启。
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout, Timeout
+
+from hyperliquid.utils.types import Any, Dict, Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    h2 = None
+
+DEFAULT_POOL_SIZE = 10
+# 默认不保活
+DEFAULT_WARM_INTERVAL = 0.0
+HEADERS = {"Content-Type": "application/json"}
+
+
+class HttpTransport:
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        http2: bool = False,
+        warm_interval: float = DEFAULT_WARM_INTERVAL,
+    ):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.warm_interval = warm_interval
+        # 未安装httpx或h2时回退requests连接池
+        self.http2 = bool(http2 and httpx is not None and h2 is not None)
+        if self.http2:
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            self.client = httpx.Client(http2=True, limits=limits, headers=HEADERS, verify=False)
+        else:
+            self.client = requests.Session()
+            self.client.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.client.mount("https://", adapter)
+            self.client.mount("http://", adapter)
+        self.last_request_time = time.monotonic()
+        self.warm_count = 0
+        self.stop_event = threading.Event()
+        self.warm_thread: Optional[threading.Thread] = None
+        if warm_interval > 0:
+            self.warm_thread = threading.Thread(target=self.run_warming, name="HttpTransportWarming", daemon=True)
+            self.warm_thread.start()
+
+    def post(self, url: str, payload: Any, timeout: Optional[float]) -> Any:
+        """发送POST请求，返回的响应对象提供status_code、content、text和url属性"""
+        self.last_request_time = time.monotonic()
+        if not self.http2:
+            return self.client.post(url, json=payload, timeout=timeout, verify=False)
+        # httpx异常转换为对应的requests异常，API.post按原有方式处理连接错误
+        try:
+            return self.client.post(url, json=payload, timeout=timeout)
+        except httpx.ConnectTimeout as ex:
+            raise ConnectTimeout(str(ex)) from ex
+        except httpx.ReadTimeout as ex:
+            raise ReadTimeout(str(ex)) from ex
+        except httpx.TimeoutException as ex:
+            raise Timeout(str(ex)) from ex
+        except httpx.TransportError as ex:
+            raise ConnectionError(str(ex)) from ex
+
+    def warm(self) -> None:
+        """发送HEAD请求保持连接池中的连接"""
+        self.last_request_time = time.monotonic()
+        try:
+            if self.http2:
+                self.client.head(self.base_url, timeout=10)
+            else:
+                self.client.head(self.base_url, timeout=10, verify=False)
+            self.warm_count += 1
+        except Exception:
+            # 保活失败不影响正常请求，下一次请求会重新建立连接
+            pass
+
+    def run_warming(self) -> None:
+        while not self.stop_event.wait(self.warm_interval / 2):
+            if time.monotonic() - self.last_request_time >= self.warm_interval:
+                self.warm()
+
+    def close(self) -> None:
+        self.stop_event.set()
+        self.client.close()
+        for base_url, transport in list(_shared_transports.items()):
+            if transport is self:
+                _shared_transports.pop(base_url, None)
+
+
+def is_connect_failure(ex: Exception) -> bool:
+    """
+    是否为无法建立连接的错误：requests连接重试次数超限，或httpx建立连接失败(httpx不重试，错误信息不含Max retries exceeded)
+    """
+    if "Max retries exceeded" in str(ex):
+        return True
+    return httpx is not None and isinstance(ex.__cause__, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+# base_url:进程内共享的传输层
+_shared_transports: Dict[str, HttpTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport(base_url: str, **kwargs: Any) -> HttpTransport:
+    """获取base_url对应的共享传输层，首次创建时使用kwargs中的连接池配置"""
+    with _shared_lock:
+        transport = _shared_transports.get(base_url)
+        if transport is None:
+            transport = _shared_transports[base_url] = HttpTransport(base_url, **kwargs)
+        return transport
@@ -0,0 +1,164 @@
+"""JSON解码后端
+
+按orjson > msgspec > json的顺序选择已安装的最快解码库，websocket推送和REST回报共用。
+WsDecoder的typed模式把l2Book和trades推送直接解码为轻量结构体，结构体支持data["px"]形式的下标访问，
+原有按字典取值的回调无需修改，价格和数量已转换为float。
+"""
+import json
+
+from hyperliquid.utils.types import Any, Callable, Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _select_backend() -> Tuple[str, Callable[[Any], Any]]:
+    if orjson is not None:
+        return "orjson", orjson.loads
+    if msgspec is not None:
+        return "msgspec", msgspec.json.decode
+    return "json", json.loads
+
+
+# 当前使用的解码库名称和解码函数，loads同时接受str和bytes
+JSON_BACKEND, loads = _select_backend()
+
+
+if msgspec is not None:
+
+    class DecodedStruct(msgspec.Struct):
+        def __getitem__(self, key: str) -> Any:
+            return getattr(self, key)
+
+    class L2Level(DecodedStruct):
+        px: float
+        sz: float
+        n: int = 0
+
+    class L2BookData(DecodedStruct):
+        coin: str
+        time: int
+        levels: Tuple[List[L2Level], List[L2Level]]
+
+    class Trade(DecodedStruct):
+        coin: str
+        side: str
+        px: float
+        sz: float
+        time: int
+        hash: str = ""
+        tid: int = 0
+
+    class _Envelope(msgspec.Struct):
+        channel: str
+        data: msgspec.Raw = msgspec.Raw(b"")
+
+else:
+
+    class DecodedStruct:  # type: ignore[no-redef]
+        __slots__ = ()
+
+        def __getitem__(self, key: str) -> Any:
+            return getattr(self, key)
+
+        def __repr__(self) -> str:
+            fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+            return f"{type(self).__name__}({fields})"
+
+    class L2Level(DecodedStruct):  # type: ignore[no-redef]
+        __slots__ = ("px", "sz", "n")
+
+        def __init__(self, px: float, sz: float, n: int = 0):
+            self.px = px
+            self.sz = sz
+            self.n = n
+
+    class L2BookData(DecodedStruct):  # type: ignore[no-redef]
+        __slots__ = ("coin", "time", "levels")
+
+        def __init__(self, coin: str, time: int, levels: Tuple[List[L2Level], List[L2Level]]):
+            self.coin = coin
+            self.time = time
+            self.levels = levels
+
+    class Trade(DecodedStruct):  # type: ignore[no-redef]
+        __slots__ = ("coin", "side", "px", "sz", "time", "hash", "tid")
+
+        def __init__(self, coin: str, side: str, px: float, sz: float, time: int, hash: str = "", tid: int = 0):
+            self.coin = coin
+            self.side = side
+            self.px = px
+            self.sz = sz
+            self.time = time
+            self.hash = hash
+            self.tid = tid
+
+
+def _l2_book_from_dict(data: Dict[str, Any]) -> L2BookData:
+    levels = tuple(
+        [L2Level(float(level["px"]), float(level["sz"]), level.get("n", 0)) for level in side]
+        for side in data["levels"]
+    )
+    return L2BookData(coin=data["coin"], time=data["time"], levels=levels)
+
+
+def _trades_from_list(data: List[Dict[str, Any]]) -> List[Trade]:
+    return [
+        Trade(
+            coin=trade["coin"],
+            side=trade["side"],
+            px=float(trade["px"]),
+            sz=float(trade["sz"]),
+            time=trade["time"],
+            hash=trade.get("hash", ""),
+            tid=trade.get("tid", 0),
+        )
+        for trade in data
+    ]
+
+
+# 未安装msgspec时typed模式的字典转换函数
+_DICT_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "l2Book": _l2_book_from_dict,
+    "trades": _trades_from_list,
+}
+
+
+class WsDecoder:
+    def __init__(self, typed: bool = False):
+        # typed为True时l2Book和trades推送的data解码为结构体
+        self.typed = typed
+        if typed and msgspec is not None:
+            self.envelope_decoder = msgspec.json.Decoder(_Envelope)
+            # strict=False允许字符串价格直接解码为float
+            self.data_decoders = {
+                "l2Book": msgspec.json.Decoder(L2BookData, strict=False),
+                "trades": msgspec.json.Decoder(List[Trade], strict=False),
+            }
+
+    def decode(self, message: Any) -> Any:
+        if not self.typed:
+            return loads(message)
+        if msgspec is None:
+            ws_msg = loads(message)
+            converter = _DICT_CONVERTERS.get(ws_msg.get("channel"))
+            if converter is not None:
+                ws_msg["data"] = converter(ws_msg["data"])
+            return ws_msg
+
+        envelope = self.envelope_decoder.decode(message)
+        if not len(envelope.data):
+            return {"channel": envelope.channel}
+        decoder = self.data_decoders.get(envelope.channel)
+        if decoder is not None:
+            data = decoder.decode(envelope.data)
+        else:
+            data = msgspec.json.decode(envelope.data)
+        return {"channel": envelope.channel, "data": data}
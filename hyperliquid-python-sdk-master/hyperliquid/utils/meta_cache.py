@@ -0,0 +1,78 @@
+"""进程内元数据缓存
+
+meta、spotMeta和perpDexs在同一进程的所有Info实例间共享，同一个键并发请求时只发送一次HTTP请求，
+缓存超过ttl秒后下次访问重新请求，invalidate可主动失效。请求失败(空数据或错误信息)的结果不缓存。
+"""
+import threading
+import time
+
+from hyperliquid.utils.types import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_META_TTL = 300.0
+# (请求类型, base_url, 交易所)
+MetaKey = Tuple[str, ...]
+
+
+def is_valid_meta(data: Any) -> bool:
+    return bool(data) and not (isinstance(data, dict) and "error" in data)
+
+
+class MetaCache:
+    def __init__(self, ttl: float = DEFAULT_META_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # 键:(数据, 写入时间)
+        self.entries: Dict[MetaKey, Tuple[Any, float]] = {}
+        # 每个键一把请求锁，同一个键只有一个线程发送请求
+        self.fetch_locks: Dict[MetaKey, threading.Lock] = {}
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def peek(self, key: MetaKey) -> Optional[Any]:
+        """返回未过期的缓存数据，不存在或已过期时返回None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                return None
+            self.hit_count += 1
+            return entry[0]
+
+    def put(self, key: MetaKey, data: Any) -> None:
+        if not is_valid_meta(data):
+            return
+        with self.lock:
+            self.entries[key] = (data, time.monotonic())
+
+    def get(self, key: MetaKey, fetch: Callable[[], Any]) -> Any:
+        """返回缓存数据，未命中时调用fetch请求并缓存"""
+        data = self.peek(key)
+        if data is not None:
+            return data
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock:
+            # 等待锁期间其他线程可能已完成请求
+            data = self.peek(key)
+            if data is not None:
+                return data
+            with self.lock:
+                self.miss_count += 1
+            data = fetch()
+            self.put(key, data)
+            return data
+
+    def invalidate(self, key: Optional[MetaKey] = None) -> None:
+        """失效指定键的缓存，key为None时清空所有缓存"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"size": len(self.entries), "hit": self.hit_count, "miss": self.miss_count}
+
+
+# 进程内共享的元数据缓存，未指定meta_cache的Info默认使用
+shared_meta_cache = MetaCache()
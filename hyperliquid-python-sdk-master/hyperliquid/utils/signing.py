@@ -1,14 +1,14 @@
 from typing import Any
 
+import threading
 import time
-from decimal import Decimal
 
 import msgpack
 from eth_account import Account
 from eth_account.messages import encode_typed_data
 from eth_utils import keccak, to_hex
 
-from hyperliquid.utils.types import Cloid, Literal, NotRequired, Optional, TypedDict, Union
+from hyperliquid.utils.types import Cloid, Dict, Literal, NotRequired, Optional, Tuple, TypedDict, Union
 
 Tif = Union[Literal["Alo"], Literal["Ioc"], Literal["Gtc"]]
 Tpsl = Union[Literal["tp"], Literal["sl"]]
@@ -236,7 +236,58 @@ def user_signed_payload(primary_type, payload_types, action):
     }
 
 
+# l1_payload的EIP-712域和Agent类型固定不变，域分隔符和类型哈希只需计算一次
+L1_DOMAIN_SEPARATOR = keccak(
+    keccak(b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+    + keccak(b"Exchange")
+    + keccak(b"1")
+    + (1337).to_bytes(32, "big")
+    + bytes(32)
+)
+AGENT_TYPE_HASH = keccak(b"Agent(string source,bytes32 connectionId)")
+
+
+class L1Signer:
+    """按钱包和网络缓存的L1 action签名器，每次签名只需msgpack、两次keccak和ECDSA签名"""
+
+    def __init__(self, wallet, is_mainnet):
+        self.wallet = wallet
+        self.is_mainnet = is_mainnet
+        # EIP-712签名摘要前缀和phantom agent的source字段哈希
+        self.prefix = b"\x19\x01" + L1_DOMAIN_SEPARATOR
+        self.source_hash = keccak(b"a" if is_mainnet else b"b")
+        # 直接使用钱包的eth_keys私钥对象签名，wallet.sign_message每次签名都会重新创建私钥对象并推导公钥
+        self.private_key = getattr(wallet, "_key_obj", None)
+
+    def sign(self, action, active_pool, nonce, expires_after):
+        hash = action_hash(action, active_pool, nonce, expires_after)
+        struct_hash = keccak(AGENT_TYPE_HASH + self.source_hash + hash)
+        message_hash = keccak(self.prefix + struct_hash)
+        if self.private_key is None:
+            signed = self.wallet.unsafe_sign_hash(message_hash)
+            return {"r": to_hex(signed["r"]), "s": to_hex(signed["s"]), "v": signed["v"]}
+        signature = self.private_key.sign_msg_hash(message_hash)
+        return {"r": to_hex(signature.r), "s": to_hex(signature.s), "v": signature.v + 27}
+
+
+# (钱包地址, 是否主网):签名器
+_l1_signers: Dict[Tuple[str, bool], L1Signer] = {}
+
+
+def get_l1_signer(wallet, is_mainnet):
+    key = (wallet.address, is_mainnet)
+    signer = _l1_signers.get(key)
+    if signer is None or signer.wallet is not wallet:
+        signer = _l1_signers[key] = L1Signer(wallet, is_mainnet)
+    return signer
+
+
 def sign_l1_action(wallet, action, active_pool, nonce, expires_after, is_mainnet):
+    return get_l1_signer(wallet, is_mainnet).sign(action, active_pool, nonce, expires_after)
+
+
+def sign_l1_action_typed_data(wallet, action, active_pool, nonce, expires_after, is_mainnet):
+    """按完整EIP-712结构化数据签名，与sign_l1_action结果一致，作为参考实现"""
     hash = action_hash(action, active_pool, nonce, expires_after)
     phantom_agent = construct_phantom_agent(hash, is_mainnet)
     data = l1_payload(phantom_agent)
@@ -477,8 +528,8 @@ def float_to_wire(x: float) -> str:
         raise ValueError("float_to_wire causes rounding", x)
     if rounded == "-0":
         rounded = "0"
-    normalized = Decimal(rounded).normalize()
-    return f"{normalized:f}"
+    # 去掉末尾的0和小数点，等价于Decimal(rounded).normalize()后按f格式输出
+    return rounded.rstrip("0").rstrip(".")
 
 
 def float_to_int_for_hashing(x: float) -> int:
@@ -497,8 +548,17 @@ def float_to_int(x: float, power: int) -> int:
     return res
 
 
+# 进程内最近一次签名使用的nonce
+_last_nonce = 0
+_nonce_lock = threading.Lock()
+
+
 def get_timestamp_ms() -> int:
-    return int(time.time() * 1000)
+    """签名动作使用的毫秒时间戳nonce，进程内严格递增，多线程同一毫秒签名时顺延，避免交易所按nonce重复拒单"""
+    global _last_nonce
+    with _nonce_lock:
+        _last_nonce = max(_last_nonce + 1, int(time.time() * 1000))
+        return _last_nonce
 
 
 def order_request_to_order_wire(order: OrderRequest, asset: int) -> OrderWire:
@@ -2,96 +2,205 @@ import json
 import logging
 import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 import socket
 
 import websocket
 
+from hyperliquid.utils.decoder import WsDecoder
 from hyperliquid.utils.types import Any, Callable, Dict, List, NamedTuple, Optional, Subscription, Tuple, WsMsg
 from vnpy.trader.utility import save_connection_status, write_log
 
 ActiveSubscription = NamedTuple("ActiveSubscription", [("callback", Callable[[Any], None]), ("subscription_id", int)])
 
 
-def subscription_to_identifier(subscription: Subscription) -> str:
-    if subscription["type"] == "allMids":
-        return "allMids"
-    elif subscription["type"] == "l2Book":
-        return f'l2Book:{subscription["coin"].lower()}'
-    elif subscription["type"] == "trades":
-        return f'trades:{subscription["coin"].lower()}'
-    elif subscription["type"] == "userEvents":
-        return "userEvents"
-    elif subscription["type"] == "userFills":
-        return f'userFills:{subscription["user"].lower()}'
-    elif subscription["type"] == "candle":
-        return f'candle:{subscription["coin"].lower()},{subscription["interval"]}'
-    elif subscription["type"] == "orderUpdates":
-        return "orderUpdates"
-    elif subscription["type"] == "userFundings":
-        return f'userFundings:{subscription["user"].lower()}'
-    elif subscription["type"] == "userNonFundingLedgerUpdates":
-        return f'userNonFundingLedgerUpdates:{subscription["user"].lower()}'
-    elif subscription["type"] == "webData2":
-        return f'webData2:{subscription["user"].lower()}'
-    elif subscription["type"] == "bbo":
-        return f'bbo:{subscription["coin"].lower()}'
-    elif subscription["type"] == "activeAssetCtx":
-        return f'activeAssetCtx:{subscription["coin"].lower()}'
-    elif subscription["type"] == "activeAssetData":
-        return f'activeAssetData:{subscription["coin"].lower()},{subscription["user"].lower()}'
-    elif subscription["type"] == "clearinghouseState":
-        return f"clearinghouseState:{subscription["dex"].lower()}"
-    elif subscription["type"] == "openOrders":
-        return f"openOrders:{subscription["dex"].lower()}"
-
-
-def ws_msg_to_identifier(ws_msg: WsMsg) -> Optional[str]:
-    if ws_msg["channel"] == "pong":
-        return "pong"
-    elif ws_msg["channel"] == "allMids":
-        return "allMids"
-    elif ws_msg["channel"] == "l2Book":
-        return f'l2Book:{ws_msg["data"]["coin"].lower()}'
-    elif ws_msg["channel"] == "trades":
-        trades = ws_msg["data"]
-        if len(trades) == 0:
-            return None
-        else:
-            return f'trades:{trades[0]["coin"].lower()}'
-    elif ws_msg["channel"] == "user":
-        return "userEvents"
-    elif ws_msg["channel"] == "userFills":
-        return f'userFills:{ws_msg["data"]["user"].lower()}'
-    elif ws_msg["channel"] == "candle":
-        return f'candle:{ws_msg["data"]["s"].lower()},{ws_msg["data"]["i"]}'
-    elif ws_msg["channel"] == "orderUpdates":
-        return "orderUpdates"
-    elif ws_msg["channel"] == "userFundings":
-        return f'userFundings:{ws_msg["data"]["user"].lower()}'
-    elif ws_msg["channel"] == "userNonFundingLedgerUpdates":
-        return f'userNonFundingLedgerUpdates:{ws_msg["data"]["user"].lower()}'
-    elif ws_msg["channel"] == "webData2":
-        return f'webData2:{ws_msg["data"]["user"].lower()}'
-    elif ws_msg["channel"] == "bbo":
-        return f'bbo:{ws_msg["data"]["coin"].lower()}'
-    elif ws_msg["channel"] == "activeAssetCtx" or ws_msg["channel"] == "activeSpotAssetCtx":
-        return f'activeAssetCtx:{ws_msg["data"]["coin"].lower()}'
-    elif ws_msg["channel"] == "activeAssetData":
-        return f'activeAssetData:{ws_msg["data"]["coin"].lower()},{ws_msg["data"]["user"].lower()}'
-    elif ws_msg["channel"] == "clearinghouseState":
-        return f"clearinghouseState:{ws_msg["data"]["dex"].lower()}"
-    elif ws_msg["channel"] == "openOrders":
-        return f"openOrders:{ws_msg["data"]["dex"].lower()}"
+# 订阅类型 -> 组成分发键的订阅字段
+SUBSCRIPTION_KEY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "allMids": (),
+    "l2Book": ("coin",),
+    "trades": ("coin",),
+    "userEvents": (),
+    "userFills": ("user",),
+    "candle": ("coin", "interval"),
+    "orderUpdates": (),
+    "userFundings": ("user",),
+    "userNonFundingLedgerUpdates": ("user",),
+    "webData2": ("user",),
+    "bbo": ("coin",),
+    "activeAssetCtx": ("coin",),
+    "activeAssetData": ("coin", "user"),
+    "clearinghouseState": ("dex",),
+    "openOrders": ("dex",),
+}
+
+
+def subscription_to_key(subscription: Subscription) -> Tuple[str, str]:
+    """订阅信息转换为(订阅类型, 小写分发键)，只在订阅时计算一次"""
+    subscription_type = subscription["type"]
+    if subscription_type == "candle":
+        # K线周期区分大小写(1m分钟，1M月)，只转换coin
+        return subscription_type, f'{subscription["coin"].lower()},{subscription["interval"]}'
+    fields = SUBSCRIPTION_KEY_FIELDS[subscription_type]
+    return subscription_type, ",".join(subscription[field].lower() for field in fields)
+
+
+def _empty_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    return ""
+
+
+def _coin_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    coin = data["coin"]
+    return lower_keys.get(coin) or coin.lower()
+
+
+def _trades_key(data: Any, lower_keys: Dict[str, str]) -> Optional[str]:
+    if not data:
+        return None
+    coin = data[0]["coin"]
+    return lower_keys.get(coin) or coin.lower()
+
+
+def _user_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    user = data["user"]
+    return lower_keys.get(user) or user.lower()
+
+
+def _candle_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    coin = data["s"]
+    return f'{lower_keys.get(coin) or coin.lower()},{data["i"]}'
+
+
+def _asset_data_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    coin, user = data["coin"], data["user"]
+    return f"{lower_keys.get(coin) or coin.lower()},{lower_keys.get(user) or user.lower()}"
+
+
+def _dex_key(data: Any, lower_keys: Dict[str, str]) -> str:
+    dex = data["dex"]
+    return lower_keys.get(dex) or dex.lower()
+
+
+# 推送频道 -> (订阅类型, 分发键提取函数)，提取函数优先使用订阅时缓存的小写值，不在表中的频道(pong，subscriptionResponse等)直接忽略
+CHANNEL_DISPATCH_TABLE: Dict[str, Tuple[str, Callable[[Any, Dict[str, str]], Optional[str]]]] = {
+    "allMids": ("allMids", _empty_key),
+    "l2Book": ("l2Book", _coin_key),
+    "trades": ("trades", _trades_key),
+    "user": ("userEvents", _empty_key),
+    "userFills": ("userFills", _user_key),
+    "candle": ("candle", _candle_key),
+    "orderUpdates": ("orderUpdates", _empty_key),
+    "userFundings": ("userFundings", _user_key),
+    "userNonFundingLedgerUpdates": ("userNonFundingLedgerUpdates", _user_key),
+    "webData2": ("webData2", _user_key),
+    "bbo": ("bbo", _coin_key),
+    "activeAssetCtx": ("activeAssetCtx", _coin_key),
+    "activeSpotAssetCtx": ("activeAssetCtx", _coin_key),
+    "activeAssetData": ("activeAssetData", _asset_data_key),
+    "clearinghouseState": ("clearinghouseState", _dex_key),
+    "openOrders": ("openOrders", _dex_key),
+}
+
+
+# 队列溢出策略：丢弃最旧消息 / 阻塞接收线程直到有空位(不丢消息)
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+
+# 频道分类 -> (队列容量, 溢出策略)
+DEFAULT_QUEUE_CONFIG: Dict[str, Tuple[int, str]] = {
+    "market": (10000, OVERFLOW_DROP_OLDEST),
+    "private": (10000, OVERFLOW_BLOCK),
+}
+
+# 订阅类型 -> 频道分类，未列出的订阅类型(成交，委托，持仓，activeAssetData账户可用保证金等)归入private
+SUBSCRIPTION_CHANNEL_CLASS: Dict[str, str] = {
+    "allMids": "market",
+    "l2Book": "market",
+    "trades": "market",
+    "bbo": "market",
+    "candle": "market",
+    "activeAssetCtx": "market",
+}
+
+
+class ChannelQueue:
+    """有界环形缓冲队列，统计队列深度、丢弃数量和排队延迟"""
+
+    def __init__(self, name: str, capacity: int, overflow: str):
+        self.name = name
+        self.capacity = capacity
+        self.overflow = overflow
+        self.buffer: deque = deque()
+        self.condition = threading.Condition()
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.max_depth = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def put(self, item: Any, stop_event: threading.Event) -> None:
+        with self.condition:
+            if len(self.buffer) >= self.capacity:
+                if self.overflow == OVERFLOW_DROP_OLDEST:
+                    self.buffer.popleft()
+                    self.dropped += 1
+                else:
+                    self.blocked += 1
+                    while len(self.buffer) >= self.capacity and not stop_event.is_set():
+                        self.condition.wait(0.1)
+            self.buffer.append(item)
+            self.received += 1
+            depth = len(self.buffer)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self.condition.notify_all()
+
+    def get(self, timeout: float) -> Optional[Any]:
+        with self.condition:
+            if not self.buffer:
+                self.condition.wait(timeout)
+                if not self.buffer:
+                    return None
+            item = self.buffer.popleft()
+            self.condition.notify_all()
+            return item
+
+    def record_lag(self, lag: float) -> None:
+        self.processed += 1
+        self.last_lag = lag
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self.buffer),
+            "capacity": self.capacity,
+            "overflow": self.overflow,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+            "max_depth": self.max_depth,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": self.total_lag / self.processed if self.processed else 0.0,
+        }
 
 
 class WebsocketManager(threading.Thread):
-    def __init__(self, base_url, auto_reconnect=True):
+    def __init__(self, base_url, auto_reconnect=True, typed_decode=False, async_dispatch=True, queue_config=None):
         super().__init__()
+        # typed_decode为True时l2Book和trades推送解码为结构体
+        self.decoder = WsDecoder(typed_decode)
         self.subscription_id_counter = 0
         self.ws_ready = False
         self.queued_subscriptions: List[Tuple[Subscription, ActiveSubscription]] = []
-        self.active_subscriptions: Dict[str, List[ActiveSubscription]] = defaultdict(list)
+        self.active_subscriptions: Dict[Tuple[str, str], List[ActiveSubscription]] = defaultdict(list)
+        # 订阅字段原始值 -> 小写值，订阅时写入，收到推送时免去逐条lower
+        self.lower_keys: Dict[str, str] = {}
         self.all_subscriptions: List[Tuple[Subscription, ActiveSubscription]] = []  # 新增：保存所有订阅信息
         self.base_url = base_url
         ws_url = "ws" + base_url[len("http") :] + "/ws"
@@ -107,6 +216,18 @@ class WebsocketManager(threading.Thread):
         self.reconnect_delay = 0  # 重连延迟（秒）
         self.need_reconnect = False  # 新增：标记是否需要重连
         self.subscribed_types = {}
+        # async_dispatch为True时接收线程只解码入队，回调由每个频道分类的工作线程按顺序执行
+        self.async_dispatch = async_dispatch
+        self.channel_queues: Dict[str, ChannelQueue] = {}
+        self.dispatch_workers: List[threading.Thread] = []
+        if async_dispatch:
+            # 自定义配置覆盖默认配置，未配置的频道分类使用默认队列
+            for channel_class, (capacity, overflow) in {**DEFAULT_QUEUE_CONFIG, **(queue_config or {})}.items():
+                queue = ChannelQueue(channel_class, capacity, overflow)
+                self.channel_queues[channel_class] = queue
+                worker = threading.Thread(target=self._run_dispatch_worker, args=(queue,), daemon=True)
+                worker.start()
+                self.dispatch_workers.append(worker)
         # 初始化WebSocket连接
         self._create_websocket()
 
@@ -219,6 +340,11 @@ class WebsocketManager(threading.Thread):
             except:
                 pass
 
+        # 等待分发线程执行完当前回调后退出，最多等2秒
+        for worker in self.dispatch_workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout=2)
+
     def on_error(self, _ws, error):
         """处理WebSocket错误"""
         self.is_connected = False
@@ -306,19 +432,49 @@ class WebsocketManager(threading.Thread):
         """处理接收到的消息"""
         if message == "Websocket connection established.":
             return
-        ws_msg: WsMsg = json.loads(message)
-        identifier = ws_msg_to_identifier(ws_msg)
-        if identifier == "pong":
+        ws_msg: WsMsg = self.decoder.decode(message)
+        dispatch = CHANNEL_DISPATCH_TABLE.get(ws_msg["channel"])
+        if dispatch is None:
             return
-        if identifier is None:
+        subscription_type, key_getter = dispatch
+        key = key_getter(ws_msg["data"], self.lower_keys)
+        if key is None:
             return
-        active_subscriptions = self.active_subscriptions[identifier]
-        if len(active_subscriptions) == 0:
-            write_log(f"WEBSOCKET API收到意外订阅的Websocket消息：{message}，{identifier}","HYPERLIQUID")
+        active_subscriptions = self.active_subscriptions.get((subscription_type, key))
+        if not active_subscriptions:
+            write_log(f"WEBSOCKET API收到意外订阅的Websocket消息：{message}，{subscription_type}:{key}","HYPERLIQUID")
+        elif self.async_dispatch:
+            queue = self.channel_queues[SUBSCRIPTION_CHANNEL_CLASS.get(subscription_type, "private")]
+            queue.put((active_subscriptions, ws_msg, time.monotonic()), self.stop_event)
         else:
             for active_subscription in active_subscriptions:
                 active_subscription.callback(ws_msg)
 
+    def _run_dispatch_worker(self, queue: ChannelQueue):
+        """频道分类工作线程，按入队顺序执行回调"""
+        while not self.stop_event.is_set():
+            item = queue.get(0.5)
+            if item is None:
+                continue
+            active_subscriptions, ws_msg, received_time = item
+            queue.record_lag(time.monotonic() - received_time)
+            for active_subscription in active_subscriptions:
+                try:
+                    active_subscription.callback(ws_msg)
+                except Exception as ex:
+                    write_log(f"WEBSOCKET API {queue.name}频道回调出错：{ex}","HYPERLIQUID")
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各频道分类队列深度，丢弃数量和排队延迟(秒)"""
+        return {name: queue.get_stats() for name, queue in self.channel_queues.items()}
+
+    def _register_key(self, subscription: Subscription) -> Tuple[str, str]:
+        """计算订阅分发键并缓存订阅字段的小写值"""
+        for field in SUBSCRIPTION_KEY_FIELDS.get(subscription["type"], ()):
+            value = subscription[field]
+            self.lower_keys[value] = value.lower()
+        return subscription_to_key(subscription)
+
     def on_open(self, _ws):
         """处理WebSocket连接打开"""
         write_log("WEBSOCKET API SDK连接成功","HYPERLIQUID")
@@ -338,8 +494,8 @@ class WebsocketManager(threading.Thread):
             # 先取消订阅再订阅主题
             if self.all_subscriptions:
                 for subscription, active_subscription in self.all_subscriptions:
-                    identifier = subscription_to_identifier(subscription)
-                    self.active_subscriptions[identifier].append(active_subscription)
+                    key = self._register_key(subscription)
+                    self.active_subscriptions[key].append(active_subscription)
                     self.ws.send(json.dumps({"method": "unsubscribe", "subscription": subscription}))
                     time.sleep(0.1)
                     self.ws.send(json.dumps({"method": "subscribe", "subscription": subscription}))
@@ -348,8 +504,8 @@ class WebsocketManager(threading.Thread):
             # 处理队列中的新订阅（如果有）
             if self.queued_subscriptions:
                 for subscription, active_subscription in self.queued_subscriptions:
-                    identifier = subscription_to_identifier(subscription)
-                    self.active_subscriptions[identifier].append(active_subscription)
+                    key = self._register_key(subscription)
+                    self.active_subscriptions[key].append(active_subscription)
                     self.ws.send(json.dumps({"method": "subscribe", "subscription": subscription}))
                     # 添加到所有订阅列表中
                     self.all_subscriptions.append((subscription, active_subscription))
@@ -367,15 +523,15 @@ class WebsocketManager(threading.Thread):
             self.subscription_id_counter += 1
             subscription_id = self.subscription_id_counter
 
-        # 为订阅创建唯一的标识符
-        identifier = subscription_to_identifier(subscription)
+        # 为订阅创建唯一的分发键
+        key = self._register_key(subscription)
 
         # 如果已经订阅过相同类型的订阅，跳过
-        if identifier in self.subscribed_types:
+        if key in self.subscribed_types:
             return subscription_id
         
         # 标记该订阅已成功订阅
-        self.subscribed_types[identifier] = True
+        self.subscribed_types[key] = True
 
         active_sub = ActiveSubscription(callback, subscription_id)
 
@@ -384,7 +540,7 @@ class WebsocketManager(threading.Thread):
             self.queued_subscriptions.append((subscription, active_sub))
         else:
             try:
-                self.active_subscriptions[identifier].append(active_sub)
+                self.active_subscriptions[key].append(active_sub)
                 self.ws.send(json.dumps({"method": "subscribe", "subscription": subscription}))
 
                 # 将订阅保存到所有订阅列表中（用于重连时恢复）
@@ -401,8 +557,8 @@ class WebsocketManager(threading.Thread):
     
     def unsubscribe(self, subscription: Subscription, subscription_id: int) -> bool:
         """取消订阅WebSocket频道"""
-        identifier = subscription_to_identifier(subscription)
-        active_subscriptions = self.active_subscriptions[identifier]
+        key = subscription_to_key(subscription)
+        active_subscriptions = self.active_subscriptions[key]
         new_active_subscriptions = [x for x in active_subscriptions if x.subscription_id != subscription_id]
         
         # 从队列中移除
@@ -419,6 +575,6 @@ class WebsocketManager(threading.Thread):
             except Exception as e:
                 write_log(f"取消订阅失败: {e}","HYPERLIQUID")
                 
-        self.active_subscriptions[identifier] = new_active_subscriptions
+        self.active_subscriptions[key] = new_active_subscriptions
         return len(active_subscriptions) != len(new_active_subscriptions)
     
\ No newline at end of file
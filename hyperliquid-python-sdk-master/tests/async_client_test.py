@@ -0,0 +1,90 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import eth_account
+import pytest
+
+pytest.importorskip("httpx")
+
+from hyperliquid.async_exchange import AsyncExchange  # noqa: E402
+from hyperliquid.async_info import AsyncInfo  # noqa: E402
+
+META = {"universe": [{"name": "BTC", "szDecimals": 5}, {"name": "ETH", "szDecimals": 4}]}
+SPOT_META = {"universe": [], "tokens": []}
+DELAY = 0.2
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(DELAY)
+        if self.path == "/exchange":
+            body = {"status": "ok", "response": {"type": payload["action"]["type"]}}
+        elif payload["type"] == "allMids":
+            body = {"BTC": "100000.0", "ETH": "2000.0"}
+        else:
+            body = {"path": self.path, "payload": payload}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_async_info_gathers_per_dex_queries(base_url):
+    async def run():
+        info = AsyncInfo(base_url, meta=META, spot_meta=SPOT_META)
+        start = time.monotonic()
+        dexs = ["", "xyz", "km", "hyna", "cash"]
+        results = await asyncio.gather(*[info.user_state("0x1", dex) for dex in dexs])
+        elapsed = time.monotonic() - start
+        await info.aclose()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    assert [result["payload"]["dex"] for result in results] == ["", "xyz", "km", "hyna", "cash"]
+    assert elapsed < DELAY * 3
+
+
+def test_async_info_uses_sync_metadata(base_url):
+    async def run():
+        info = AsyncInfo(base_url, meta=META, spot_meta=SPOT_META)
+        assert info.name_to_asset("ETH") == 1
+        assert await info.l2_snapshot("DOGE") == {}
+        result = await info.l2_snapshot("BTC")
+        await info.aclose()
+        return result
+
+    assert asyncio.run(run())["payload"] == {"type": "l2Book", "coin": "BTC"}
+
+
+def test_async_exchange_orders(base_url):
+    wallet = eth_account.Account.from_key("0x0123456789012345678901234567890123456789012345678901234567890123")
+
+    async def run():
+        exchange = AsyncExchange(wallet, base_url, meta=META, spot_meta=SPOT_META)
+        order = await exchange.order("ETH", True, 0.1, 2000, {"limit": {"tif": "Gtc"}})
+        market = await exchange.market_open("BTC", True, 0.001)
+        await exchange.aclose()
+        return order, market
+
+    order, market = asyncio.run(run())
+    assert order == {"status": "ok", "response": {"type": "order"}}
+    assert market == {"status": "ok", "response": {"type": "order"}}
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy_hyperliquid.candle_cache import CANDLE_CACHE_VERSION, CandleCache, add_range, subtract_ranges  # noqa: E402
+from vnpy_hyperliquid.history_engine import CANDLE_DTYPE  # noqa: E402
+
+MINUTE = 60000
+
+
+def build_candles(start, count, close=1.0):
+    candles = np.zeros(count, dtype=CANDLE_DTYPE)
+    candles["t"] = start + np.arange(count) * MINUTE
+    candles["c"] = close
+    return candles
+
+
+def test_add_range_merges_overlapping_and_adjacent_ranges():
+    assert add_range([], 10, 20) == [(10, 20)]
+    # 重叠
+    assert add_range([(10, 20)], 15, 30) == [(10, 30)]
+    # 相邻
+    assert add_range([(10, 20)], 21, 30) == [(10, 30)]
+    # 有间隔
+    assert add_range([(10, 20)], 22, 30) == [(10, 20), (22, 30)]
+    # 填补两个区间之间的缺口
+    assert add_range([(10, 20), (40, 50)], 18, 39) == [(10, 50)]
+    assert add_range([(40, 50)], 10, 20) == [(10, 20), (40, 50)]
+
+
+def test_subtract_ranges_returns_missing_parts():
+    assert subtract_ranges(0, 100, []) == [(0, 100)]
+    assert subtract_ranges(0, 100, [(0, 100)]) == []
+    assert subtract_ranges(0, 100, [(20, 40), (60, 70)]) == [(0, 19), (41, 59), (71, 100)]
+    assert subtract_ranges(30, 65, [(20, 40), (60, 70)]) == [(41, 59)]
+    assert subtract_ranges(0, 10, [(20, 40)]) == [(0, 10)]
+    assert subtract_ranges(50, 60, [(0, 10)]) == [(50, 60)]
+
+
+def test_update_then_query_only_reports_uncovered_window(tmp_path):
+    cache = CandleCache(tmp_path)
+    start = 1700000040000
+    # 已覆盖区间以毫秒计，覆盖到最后一根K线的结束时间
+    cache.update("BTC", "1m", build_candles(start, 10), start, start + 10 * MINUTE - 1)
+    cached, missing = cache.query("BTC", "1m", start, start + 20 * MINUTE - 1)
+    assert len(cached) == 10
+    assert missing == [(start + 10 * MINUTE, start + 20 * MINUTE - 1)]
+
+    # 重叠区间的新数据覆盖旧数据并去重
+    cache.update("BTC", "1m", build_candles(start + 5 * MINUTE, 15, close=2.0), start + 5 * MINUTE, start + 20 * MINUTE - 1)
+    cached, missing = cache.query("BTC", "1m", start, start + 20 * MINUTE - 1)
+    assert missing == []
+    assert len(cached) == 20
+    assert np.all(np.diff(cached["t"]) == MINUTE)
+    assert cached["c"].tolist() == [1.0] * 5 + [2.0] * 15
+
+
+def test_failed_download_keeps_candles_without_marking_coverage(tmp_path):
+    cache = CandleCache(tmp_path)
+    start = 1700000040000
+    # 有分片失败时只保存K线，不标记已覆盖区间
+    cache.update("BTC", "1m", build_candles(start, 5), start, start - 1)
+    cached, missing = cache.query("BTC", "1m", start, start + 4 * MINUTE)
+    assert len(cached) == 5
+    assert missing == [(start, start + 4 * MINUTE)]
+
+
+def test_cache_files_are_per_coin_and_interval(tmp_path):
+    cache = CandleCache(tmp_path)
+    cache.update("xyz:NVDA", "1h", build_candles(0, 2), 0, MINUTE)
+    assert cache.get_path("xyz:NVDA", "1h").name == "xyz_NVDA_1h.npz"
+    assert cache.query("xyz:NVDA", "1m", 0, MINUTE)[1] == [(0, MINUTE)]
+
+    path = cache.get_path("BTC", "1m")
+    np.savez(path, version=np.int64(CANDLE_CACHE_VERSION + 1), candles=build_candles(0, 2), ranges=np.array([[0, MINUTE]]))
+    # 版本不一致的缓存直接丢弃
+    cached, missing = cache.query("BTC", "1m", 0, MINUTE)
+    assert len(cached) == 0
+    assert missing == [(0, MINUTE)]
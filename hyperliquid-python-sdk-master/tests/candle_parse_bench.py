@@ -0,0 +1,101 @@
+"""candleSnapshot回报解析性能基准
+
+运行：python -m tests.candle_parse_bench
+对比旧版逐根创建BarData和列式解析，输出每秒处理K线数和内存峰值。
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+
+# 网关目录与SDK包同名(hyperliquid)，以vnpy_hyperliquid名称注册为包
+gateway_package = ModuleType("vnpy_hyperliquid")
+gateway_package.__path__ = [str(Path(__file__).resolve().parents[2] / "hyperliquid")]
+sys.modules["vnpy_hyperliquid"] = gateway_package
+
+from vnpy_hyperliquid.history_engine import merge_candles, parse_candles  # noqa: E402
+from vnpy.trader.constant import Exchange, Interval  # noqa: E402
+from vnpy.trader.object import BarData  # noqa: E402
+from vnpy.trader.utility import get_local_datetime  # noqa: E402
+
+# 30天1分钟K线，按5000根一个分片
+CANDLE_COUNT = 30 * 24 * 60
+SLICE_SIZE = 5000
+REPEAT = 3
+
+
+def legacy_parse(slices: list) -> list:
+    """
+    基线：改动前query_history逐根创建BarData
+    """
+    history = []
+    for candle in slices:
+        for raw_data in candle:
+            volume = float(raw_data["v"])
+            bar = BarData(
+                symbol="BTC",
+                exchange=Exchange.HYPE,
+                datetime=get_local_datetime(raw_data["t"]),
+                interval=Interval.MINUTE,
+                open_price=raw_data["o"],
+                high_price=raw_data["h"],
+                low_price=raw_data["l"],
+                close_price=raw_data["c"],
+                volume=volume,
+                gateway_name="HYPERLIQUID",
+            )
+            history.append(bar)
+    return history
+
+
+def columnar_parse(slices: list):
+    return merge_candles([parse_candles(candle) for candle in slices])
+
+
+def build_slices() -> list:
+    candles = []
+    for index in range(CANDLE_COUNT):
+        price = 100 + (index % 500) * 0.01
+        candles.append(
+            {
+                "t": 1700000000000 + index * 60000,
+                "T": 1700000000000 + index * 60000 + 59999,
+                "s": "BTC",
+                "i": "1m",
+                "o": f"{price:.2f}",
+                "h": f"{price + 0.05:.2f}",
+                "l": f"{price - 0.05:.2f}",
+                "c": f"{price + 0.01:.2f}",
+                "v": f"{index % 97 + 0.5}",
+                "n": index % 31,
+            }
+        )
+    return [candles[index:index + SLICE_SIZE] for index in range(0, CANDLE_COUNT, SLICE_SIZE)]
+
+
+def measure(parse, slices: list) -> tuple[float, float]:
+    best = 0.0
+    for _ in range(REPEAT):
+        start = perf_counter()
+        parse(slices)
+        best = max(best, CANDLE_COUNT / (perf_counter() - start))
+    tracemalloc.start()
+    result = parse(slices)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak / 1024 / 1024
+
+
+def main():
+    slices = build_slices()
+    before, before_peak = measure(legacy_parse, slices)
+    after, after_peak = measure(columnar_parse, slices)
+    print(f"candles: {CANDLE_COUNT} in {len(slices)} slices, best of {REPEAT}")
+    print(f"before (BarData per candle): {before:,.0f} candles/s, peak {before_peak:.1f} MiB")
+    print(f"after  (columnar):           {after:,.0f} candles/s ({after / before:.2f}x), peak {after_peak:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
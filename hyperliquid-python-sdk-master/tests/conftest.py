@@ -0,0 +1,22 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from hyperliquid.utils.meta_cache import shared_meta_cache
+
+# vnpy网关目录与SDK包同名(hyperliquid)，以vnpy_hyperliquid名称注册为包，网关用例按需导入其中模块
+GATEWAY_FOLDER = Path(__file__).resolve().parents[2] / "hyperliquid"
+if GATEWAY_FOLDER.is_dir() and "vnpy_hyperliquid" not in sys.modules:
+    gateway_package = types.ModuleType("vnpy_hyperliquid")
+    gateway_package.__path__ = [str(GATEWAY_FOLDER)]
+    sys.modules["vnpy_hyperliquid"] = gateway_package
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_meta_cache():
+    # 录制的请求按顺序回放，每个用例从空缓存开始
+    shared_meta_cache.invalidate()
+    yield
+    shared_meta_cache.invalidate()
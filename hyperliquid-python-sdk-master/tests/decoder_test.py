@@ -0,0 +1,59 @@
+import json
+
+from hyperliquid.utils import decoder
+from hyperliquid.utils.decoder import L2Level, WsDecoder, loads
+
+L2_BOOK_MESSAGE = json.dumps(
+    {
+        "channel": "l2Book",
+        "data": {
+            "coin": "BTC",
+            "time": 1700000000000,
+            "levels": [[{"px": "100.5", "sz": "1.25", "n": 3}], [{"px": "101", "sz": "0.5", "n": 1}]],
+        },
+    }
+)
+TRADES_MESSAGE = json.dumps(
+    {
+        "channel": "trades",
+        "data": [{"coin": "BTC", "side": "B", "px": "100.5", "sz": "0.1", "hash": "0x0", "time": 1, "tid": 7}],
+    }
+)
+
+
+def test_loads_accepts_str_and_bytes():
+    assert loads('{"a": [1, "2"]}') == {"a": [1, "2"]}
+    assert loads(b'{"a": 1.5}') == {"a": 1.5}
+
+
+def test_untyped_decode_returns_dicts():
+    ws_msg = WsDecoder().decode(L2_BOOK_MESSAGE)
+    assert ws_msg["data"]["levels"][0][0] == {"px": "100.5", "sz": "1.25", "n": 3}
+
+
+def test_typed_decode_l2_book():
+    ws_msg = WsDecoder(typed=True).decode(L2_BOOK_MESSAGE)
+    data = ws_msg["data"]
+    assert ws_msg["channel"] == "l2Book"
+    assert data["coin"] == "BTC"
+    assert data.time == 1700000000000
+    bid = data["levels"][0][0]
+    assert isinstance(bid, L2Level)
+    assert (bid["px"], bid.sz, bid.n) == (100.5, 1.25, 3)
+    assert data["levels"][1][0].px == 101.0
+
+
+def test_typed_decode_trades_and_other_channels():
+    typed_decoder = WsDecoder(typed=True)
+    trades = typed_decoder.decode(TRADES_MESSAGE)["data"]
+    assert trades[0]["px"] == 100.5
+    assert trades[0].tid == 7
+    ws_msg = typed_decoder.decode('{"channel": "orderUpdates", "data": [{"status": "open"}]}')
+    assert ws_msg["data"] == [{"status": "open"}]
+    assert typed_decoder.decode('{"channel": "pong"}') == {"channel": "pong"}
+
+
+def test_typed_decode_without_msgspec(monkeypatch):
+    monkeypatch.setattr(decoder, "msgspec", None)
+    ws_msg = WsDecoder(typed=True).decode(L2_BOOK_MESSAGE)
+    assert ws_msg["data"]["levels"][0][0]["px"] == 100.5
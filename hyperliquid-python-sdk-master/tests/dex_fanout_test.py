@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy_hyperliquid.hyperliquid_gateway import DexFanout  # noqa: E402
+
+
+def request(dex):
+    if dex == "xyz":
+        time.sleep(0.05)
+        raise ConnectionError("xyz down")
+    time.sleep(0.2 if dex == "slow" else 0)
+    return {"dex": dex}
+
+
+def test_run_calls_back_in_order_and_raises_first_error():
+    logs = []
+    received = []
+    fanout = DexFanout(logs.append, 4)
+    try:
+        with pytest.raises(ConnectionError, match="xyz down"):
+            fanout.run("meta", ["", "slow", "xyz", "abc"], request, lambda data, dex: received.append(dex))
+        # 出错交易所之后的交易所照常回调
+        assert received == ["", "slow", "abc"]
+        assert len(logs) == 1
+        dexs = fanout.get_stats()["meta"]["dexs"]
+        assert dexs["xyz"]["error"] == 1
+        # 出错请求记录自身耗时，不是整轮耗时
+        assert 40 <= dexs["xyz"]["last_ms"] < 150
+        assert dexs["slow"]["error"] == 0
+    finally:
+        fanout.stop()
@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Exchange, Interval  # noqa: E402
+from vnpy.trader.object import BarData, HistoryRequest  # noqa: E402
+from vnpy.trader.utility import TZ_INFO  # noqa: E402
+
+from vnpy_hyperliquid import history_engine  # noqa: E402
+from vnpy_hyperliquid.candle_cache import CandleCache  # noqa: E402
+from vnpy_hyperliquid.history_engine import (  # noqa: E402
+    CANDLE_DTYPE,
+    HistoryEngine,
+    RateBudget,
+    merge_candles,
+    parse_candles,
+    split_window,
+)
+
+MINUTE = 60000
+END = datetime(2024, 1, 1, tzinfo=TZ_INFO)
+START = END - timedelta(minutes=19)
+START_MS = int(START.timestamp() * 1000)
+
+
+def build_raw(start_ms, end_ms):
+    return [
+        {"t": t, "T": t + MINUTE - 1, "s": "BTC", "i": "1m", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "3", "n": 4}
+        for t in range(start_ms, end_ms + 1, MINUTE)
+    ]
+
+
+def build_engine(snapshot, saved, newest_bar=None, cache=None):
+    return HistoryEngine(
+        "HYPERLIQUID",
+        snapshot,
+        lambda req, candles: saved.append(candles),
+        lambda req: newest_bar,
+        lambda msg: None,
+        2,
+        60000,
+        10,
+        5000,
+        cache,
+    )
+
+
+def build_request():
+    return HistoryRequest(symbol="BTC", exchange=Exchange.HYPE, start=START, end=END, interval=Interval.MINUTE)
+
+
+def test_split_window_covers_window_without_overlap():
+    assert split_window(0, 99, 30) == [(0, 29), (30, 59), (60, 89), (90, 99)]
+    assert split_window(0, 29, 30) == [(0, 29)]
+    assert split_window(10, 9, 30) == []
+
+
+def test_merge_candles_sorts_and_keeps_latest_duplicate():
+    first = parse_candles(build_raw(0, 2 * MINUTE))
+    second = parse_candles(build_raw(MINUTE, 3 * MINUTE))
+    second["c"] = 9
+    merged = merge_candles([second, first])
+    assert merged["t"].tolist() == [0, MINUTE, 2 * MINUTE, 3 * MINUTE]
+    # 开始时间相同时保留后面分片的K线
+    assert merged["c"].tolist() == [1.5, 1.5, 1.5, 9]
+    assert merged.dtype == CANDLE_DTYPE
+    assert len(merge_candles([])) == 0
+
+
+def test_rate_budget_waits_when_tokens_are_exhausted(monkeypatch):
+    clock = [100.0]
+    waits = []
+    monkeypatch.setattr(history_engine, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(history_engine, "sleep", waits.append)
+    # 每秒补充10权重，最多积累100权重
+    budget = RateBudget(600)
+    assert budget.acquire(60) == 0
+    assert budget.acquire(40) == 0
+    assert budget.acquire(20) == pytest.approx(2)
+    assert waits == [pytest.approx(2)]
+    clock[0] += 1
+    # 补充的权重先抵扣已预占的权重
+    assert budget.acquire(50) == pytest.approx(6)
+    clock[0] += 100
+    # 空闲时最多积累capacity权重
+    assert budget.acquire(100) == 0
+    assert budget.acquire(10) == pytest.approx(1)
+
+
+def test_download_merges_slices_and_saves_once():
+    saved = []
+    engine = build_engine(lambda coin, interval, start, end: build_raw(start, end), saved)
+    try:
+        job = engine.submit(build_request(), "BTC")
+        assert job.done.wait(5)
+        assert job.status == "finished"
+        assert len(job.slices) == 2
+        assert len(saved) == 1
+        assert saved[0]["t"].tolist() == list(range(START_MS, START_MS + 20 * MINUTE, MINUTE))
+    finally:
+        engine.stop()
+
+
+def test_failed_slice_marks_job_error_and_skips_save():
+    saved = []
+    calls = []
+
+    def snapshot(coin, interval, start, end):
+        calls.append(start)
+        if start > START_MS:
+            raise ConnectionError("boom")
+        return build_raw(start, end)
+
+    engine = build_engine(snapshot, saved)
+    try:
+        job = engine.submit(build_request(), "BTC")
+        assert job.done.wait(5)
+        assert job.status == "error"
+        assert job.failed_slices == [(START_MS + 10 * MINUTE, START_MS + 19 * MINUTE)]
+        # 每次重试单独捕获异常
+        assert calls.count(START_MS + 10 * MINUTE) == history_engine.MAX_SLICE_RETRY + 1
+        assert saved == []
+    finally:
+        engine.stop()
+
+
+def test_resume_refills_gap_left_by_failed_job():
+    saved = []
+    failing = [True]
+
+    def snapshot(coin, interval, start, end):
+        if failing[0] and start > START_MS:
+            return {"error": "rate limited"}
+        return build_raw(start, end)
+
+    newest_bar = BarData(symbol="BTC", exchange=Exchange.HYPE, datetime=END, interval=Interval.MINUTE, gateway_name="HYPERLIQUID")
+    engine = build_engine(snapshot, saved, newest_bar)
+    try:
+        job = engine.submit(build_request(), "BTC")
+        assert job.done.wait(5) and job.status == "error"
+        failing[0] = False
+        # 数据库最新K线已到请求终止时间，但上次任务留下缺口，仍从缺口起始时间重新下载
+        job = engine.submit(build_request(), "BTC", incremental=True)
+        assert job.done.wait(5)
+        assert job.status == "finished"
+        assert job.window[0] == START_MS
+        assert len(saved[0]) == 20
+        job = engine.submit(build_request(), "BTC", incremental=True)
+        assert job.done.wait(5)
+        assert job.status == "current"
+    finally:
+        engine.stop()
+
+
+def test_cached_window_is_not_downloaded_again(tmp_path):
+    saved = []
+    calls = []
+
+    def snapshot(coin, interval, start, end):
+        calls.append((start, end))
+        return build_raw(start, end)
+
+    engine = build_engine(snapshot, saved, cache=CandleCache(tmp_path))
+    try:
+        job = engine.submit(build_request(), "BTC")
+        assert job.done.wait(5)
+        assert len(calls) == 2
+        job = engine.submit(build_request(), "BTC")
+        assert job.done.wait(5)
+        assert len(calls) == 2
+        assert job.cached_bars == 20
+        assert np.array_equal(saved[1], saved[0])
+    finally:
+        engine.stop()
+
+
+def test_stop_finishes_pending_jobs_as_cancelled():
+    engine = build_engine(lambda coin, interval, start, end: build_raw(start, end), [])
+    engine.stop()
+    job = engine.submit(build_request(), "BTC")
+    assert job.done.is_set()
+    assert job.status == "cancelled"
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Exchange, Interval  # noqa: E402
+from vnpy.trader.object import BarData  # noqa: E402
+from vnpy.trader.utility import TZ_INFO  # noqa: E402
+
+from vnpy_hyperliquid.hyperliquid_gateway import LiveBarStore  # noqa: E402
+
+OPEN_TIME = datetime(2024, 1, 1, tzinfo=TZ_INFO)
+OPEN_MS = int(OPEN_TIME.timestamp() * 1000)
+MINUTE = 60000
+
+
+def build_bar(minutes, volume):
+    return BarData(
+        symbol="BTC",
+        exchange=Exchange.HYPE,
+        datetime=OPEN_TIME + timedelta(minutes=minutes),
+        interval=Interval.MINUTE,
+        volume=volume,
+        gateway_name="HYPERLIQUID",
+    )
+
+
+def update(store, minutes, volume):
+    return store.update("BTC_HYPE", build_bar(minutes, volume), OPEN_MS + (minutes + 1) * MINUTE - 1)
+
+
+def test_next_bar_rolls_over_previous_bar():
+    store = LiveBarStore(2)
+    assert update(store, 0, 1) is None
+    assert update(store, 0, 2) is None
+    assert store.get_bar("BTC_HYPE").volume == 2
+    finished = update(store, 1, 1)
+    assert finished.volume == 2
+    assert store.get_bar("BTC_HYPE").datetime == OPEN_TIME + timedelta(minutes=1)
+    # 旧K线的乱序推送直接丢弃
+    assert update(store, 0, 3) is None
+    assert [bar.volume for bar in store.pop_finished()] == [2]
+    assert store.pop_finished() == []
+
+
+def test_timeout_closes_bar_once():
+    store = LiveBarStore(2)
+    update(store, 0, 1)
+    close_ms = OPEN_MS + MINUTE - 1
+    assert store.check_closed(close_ms + 1000) == []
+    closed = store.check_closed(close_ms + 2000)
+    assert [bar.volume for bar in closed] == [1]
+    assert store.check_closed(close_ms + 5000) == []
+    # 走完后不再作为正在走的K线返回
+    assert store.get_bar("BTC_HYPE") is None
+    # 超时走完的K线收到下一根K线时不重复推送
+    assert update(store, 1, 1) is None
+    assert store.get_bar("BTC_HYPE").volume == 1
+    assert [bar.volume for bar in store.pop_finished()] == [1]
+
+
+def test_late_push_after_timeout_is_saved_without_emitting():
+    store = LiveBarStore(2)
+    update(store, 0, 1)
+    store.check_closed(OPEN_MS + MINUTE + 5000)
+    assert update(store, 0, 1.5) is None
+    assert store.get_bar("BTC_HYPE") is None
+    assert store.check_closed(OPEN_MS + MINUTE + 10000) == []
+    # 迟到推送覆盖写入数据库
+    assert [bar.volume for bar in store.pop_finished()] == [1, 1.5]
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from hyperliquid.api import API
+from hyperliquid.info import Info
+from hyperliquid.utils.meta_cache import MetaCache, shared_meta_cache
+
+META = {"universe": [{"name": "BTC", "szDecimals": 5}]}
+SPOT_META = {"universe": [], "tokens": []}
+
+
+def test_concurrent_gets_fetch_once():
+    cache = MetaCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return META
+
+    threads = [threading.Thread(target=cache.get, args=(("meta", "url", ""), fetch)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert cache.get(("meta", "url", ""), fetch) is META
+
+
+def test_ttl_invalidate_and_errors():
+    cache = MetaCache(ttl=0.05)
+    results = iter([{"error": "busy"}, None, META, META, META])
+    key = ("spotMeta", "url")
+    assert cache.get(key, lambda: next(results)) == {"error": "busy"}
+    assert cache.get(key, lambda: next(results)) is None
+    assert cache.get(key, lambda: next(results)) is META
+    assert cache.get_stats()["miss"] == 3
+    time.sleep(0.06)
+    assert cache.peek(key) is None
+    assert cache.get(key, lambda: next(results)) is META
+    cache.invalidate(key)
+    assert cache.peek(key) is None
+    cache.get(key, lambda: next(results))
+    cache.invalidate()
+    assert cache.get_stats()["size"] == 0
+
+
+def test_info_instances_share_metadata(monkeypatch):
+    payloads = []
+
+    def post(self, url_path, payload=None):
+        payloads.append(payload["type"])
+        return META if payload["type"] == "meta" else SPOT_META
+
+    monkeypatch.setattr(API, "post", post)
+    first = Info("http://127.0.0.1:1", skip_ws=True)
+    second = Info("http://127.0.0.1:1", skip_ws=True)
+    assert payloads == ["spotMeta", "meta"]
+    assert first.coin_to_asset == second.coin_to_asset == {"BTC": 0}
+    assert second.meta() is META
+
+    shared_meta_cache.invalidate(("meta", "http://127.0.0.1:1", ""))
+    second.meta()
+    assert payloads == ["spotMeta", "meta", "meta"]
+    assert Info("http://127.0.0.1:1", skip_ws=True, meta_cache=MetaCache()).coin_to_asset == {"BTC": 0}
+    assert payloads == ["spotMeta", "meta", "meta", "spotMeta", "meta"]
@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("vnpy")
+
+from hyperliquid.utils.meta_cache import MetaCache  # noqa: E402
+
+from vnpy_hyperliquid import meta_snapshot  # noqa: E402
+from vnpy_hyperliquid.meta_snapshot import META_SNAPSHOT_VERSION, MetaSnapshot, diff_universe  # noqa: E402
+
+BASE_URL = "https://api.hyperliquid.xyz"
+PERP_DEXS = [None, {"name": "xyz", "fullName": "XYZ", "deployer": "0x1"}]
+BTC = {"name": "BTC", "szDecimals": 5, "maxLeverage": 40, "marginTableId": 56}
+ETH = {"name": "ETH", "szDecimals": 4, "maxLeverage": 25}
+NVDA = {"name": "xyz:NVDA", "szDecimals": 3, "maxLeverage": 10}
+SPOT_META = {
+    "universe": [{"name": "PURR/USDC", "tokens": [1, 0], "index": 0, "isCanonical": True}],
+    "tokens": [
+        {"name": "USDC", "szDecimals": 8, "index": 0, "evmContract": None, "fullName": None},
+        {"name": "PURR", "szDecimals": 0, "index": 1, "evmContract": None},
+    ],
+}
+
+
+def cached(cache, key):
+    return cache.get(key, lambda: pytest.fail(f"缓存未命中：{key}"))
+
+
+@pytest.fixture
+def files(monkeypatch):
+    files = {}
+    monkeypatch.setattr(meta_snapshot, "save_json", lambda file_name, data: files.__setitem__(file_name, data))
+    monkeypatch.setattr(meta_snapshot, "load_json", lambda file_name: files.get(file_name, {}))
+    return files
+
+
+def test_diff_universe():
+    old = [BTC, ETH]
+    new = [dict(BTC, maxLeverage=50), NVDA]
+    added, removed, changed = diff_universe(old, new)
+    assert added == [NVDA]
+    assert removed == ["ETH"]
+    assert changed == [dict(BTC, maxLeverage=50)]
+    assert diff_universe(old, list(old)) == ([], [], [])
+
+
+def test_update_then_load_round_trip(files):
+    snapshot = MetaSnapshot("snapshot.json", BASE_URL, ["", "xyz"])
+    diffs = snapshot.update(PERP_DEXS, {"": {"universe": [BTC, ETH]}, "xyz": {"universe": [NVDA]}}, SPOT_META)
+    # 首次保存时所有合约都是新增
+    assert diffs["perp"][""][0] == [{"name": "BTC", "szDecimals": 5, "maxLeverage": 40}, ETH]
+    assert diffs["spot"]
+    saved = files["snapshot.json"]
+    assert saved["version"] == META_SNAPSHOT_VERSION
+    # 只保存用到的字段
+    assert saved["perp_dexs"] == [None, {"name": "xyz"}]
+    assert "fullName" not in saved["spot_meta"]["tokens"][0]
+    assert "isCanonical" not in saved["spot_meta"]["universe"][0]
+
+    cache = MetaCache()
+    loaded = MetaSnapshot("snapshot.json", BASE_URL, ["", "xyz"])
+    assert loaded.load(cache)
+    assert loaded.metas == saved["metas"]
+    assert cached(cache, ("meta", BASE_URL, "xyz")) == {"universe": [NVDA]}
+    assert cached(cache, ("spotMeta", BASE_URL)) == saved["spot_meta"]
+    assert cached(cache, ("perpDexs", BASE_URL)) == [None, {"name": "xyz"}]
+
+    diffs = loaded.update(PERP_DEXS, {"": {"universe": [BTC]}, "xyz": {"universe": [NVDA]}}, SPOT_META)
+    assert diffs == {"perp": {"": ([], ["ETH"], [])}, "spot": False}
+
+
+def test_load_rejects_mismatched_snapshot(files):
+    MetaSnapshot("snapshot.json", BASE_URL, [""]).update(PERP_DEXS, {"": {"universe": [BTC]}}, SPOT_META)
+    cache = MetaCache()
+    # 缺少配置的交易所
+    assert not MetaSnapshot("snapshot.json", BASE_URL, ["", "xyz"]).load(cache)
+    # 地址不一致
+    assert not MetaSnapshot("snapshot.json", "https://api.hyperliquid-testnet.xyz", [""]).load(cache)
+    files["snapshot.json"]["version"] = META_SNAPSHOT_VERSION + 1
+    assert not MetaSnapshot("snapshot.json", BASE_URL, [""]).load(cache)
+    assert not MetaSnapshot("missing.json", BASE_URL, [""]).load(cache)
@@ -0,0 +1,101 @@
+"""HyperliquidWebsocketApi.on_depth深度推送性能基准
+
+运行：python -m tests.on_depth_bench
+对比旧版闭包+setattr逐档写入和预生成字段名写入，输出每秒处理帧数。
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType, SimpleNamespace
+
+# 网关目录与SDK包同名(hyperliquid)，以vnpy_hyperliquid名称注册为包，网关模块内的相对导入才能解析
+gateway_package = ModuleType("vnpy_hyperliquid")
+gateway_package.__path__ = [str(Path(__file__).resolve().parents[2] / "hyperliquid")]
+sys.modules["vnpy_hyperliquid"] = gateway_package
+
+from vnpy_hyperliquid.hyperliquid_gateway import HyperliquidWebsocketApi  # noqa: E402
+from vnpy.trader.constant import Exchange  # noqa: E402
+from vnpy.trader.object import TickData  # noqa: E402
+from vnpy.trader.utility import TZ_INFO, get_local_datetime  # noqa: E402
+
+FRAME_COUNT = 2000
+REPEAT = 5
+
+
+def legacy_on_depth(self, packet: dict):
+    """
+    基线：改动前的on_depth实现
+    """
+    data = packet["data"]
+    symbol: str = data["coin"]
+    exchange = Exchange.HYPE
+    tick = self.ticks[f"{symbol}_{exchange.value}"]
+    order_book = data["levels"]
+    bids, asks = order_book[0], order_book[1]
+
+    def update_order_book(order_books, type_prefix):
+        for index, data in enumerate(order_books, start=1):
+            setattr(tick, f"{type_prefix}_price_{index}", float(data["px"]))
+            setattr(tick, f"{type_prefix}_volume_{index}", float(data["sz"]))
+
+    update_order_book(bids, "bid")
+    update_order_book(asks, "ask")
+    tick.datetime = get_local_datetime(data["time"])
+    if tick.last_price:
+        self.gateway.on_tick(tick)
+
+
+def build_packets():
+    packets = []
+    for index in range(FRAME_COUNT):
+        mid = 100 + (index % 50) * 0.1
+        levels = [
+            [{"px": f"{mid - level * 0.1:.1f}", "sz": f"{1 + level * 0.5}", "n": level + 1} for level in range(20)],
+            [{"px": f"{mid + (level + 1) * 0.1:.1f}", "sz": f"{2 + level * 0.5}", "n": level + 1} for level in range(20)],
+        ]
+        packets.append({"channel": "l2Book", "data": {"coin": "BTC", "time": 1700000000000 + index, "levels": levels}})
+    return packets
+
+
+def build_api():
+    tick = TickData(
+        symbol="BTC",
+        name="BTC",
+        exchange=Exchange.HYPE,
+        gateway_name="HYPERLIQUID",
+        datetime=datetime.now(TZ_INFO),
+    )
+    tick.last_price = 100
+    return SimpleNamespace(
+        ticks={"BTC_HYPE": tick},
+        is_spot_symbol=lambda symbol: False,
+        gateway=SimpleNamespace(on_tick=lambda tick: None),
+        conflator=None,
+        order_books={},
+        tick_board=None,
+    )
+
+
+def measure(on_depth, packets) -> float:
+    api = build_api()
+    best = 0.0
+    for _ in range(REPEAT):
+        start = perf_counter()
+        for packet in packets:
+            on_depth(api, packet)
+        best = max(best, len(packets) / (perf_counter() - start))
+    return best
+
+
+def main():
+    packets = build_packets()
+    before = measure(legacy_on_depth, packets)
+    after = measure(HyperliquidWebsocketApi.on_depth, packets)
+    print(f"frames: {len(packets)} (20 levels per side), best of {REPEAT}")
+    print(f"before (closure + setattr): {before:,.0f} frames/s")
+    print(f"after  (field table):       {after:,.0f} frames/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Direction, Exchange  # noqa: E402
+
+from vnpy_hyperliquid.hyperliquid_gateway import OrderBook  # noqa: E402
+
+BIDS = [{"px": "99", "sz": "1", "n": 1}, {"px": "98", "sz": "2", "n": 2}, {"px": "97", "sz": "3", "n": 1}]
+ASKS = [{"px": "101", "sz": "1", "n": 1}, {"px": "102", "sz": "2", "n": 3}, {"px": "104", "sz": "1", "n": 1}]
+
+
+def build_book():
+    book = OrderBook("BTC", Exchange.HYPE)
+    book.update(BIDS, ASKS, datetime(2024, 1, 1))
+    return book
+
+
+def test_update_publishes_one_consistent_snapshot():
+    book = build_book()
+    bids, asks, dt = book.snapshot
+    assert dt == datetime(2024, 1, 1)
+    assert bids[0].tolist() == [99, 98, 97]
+    assert asks[3].tolist() == [1, 3, 4]
+    assert book.best_bid() == 99
+    assert book.best_ask() == 101
+    assert book.get_cumulative_depth(Direction.LONG, 2) == 3
+    assert book.get_cumulative_depth(Direction.SHORT) == 6
+
+
+def test_get_fill_price_walks_levels():
+    book = build_book()
+    average, worst = book.get_fill_price(Direction.LONG, 1)
+    assert average == 101
+    assert worst == 101
+
+    average, worst = book.get_fill_price(Direction.LONG, 2)
+    assert average == pytest.approx((101 + 102) / 2)
+    assert worst == 102
+
+    average, worst = book.get_fill_price(Direction.SHORT, [0.5, 3, 6])
+    assert average.tolist() == pytest.approx([99, (99 + 98 * 2) / 3, (99 + 98 * 2 + 97 * 3) / 6])
+    assert worst.tolist() == [99, 98, 97]
+
+
+def test_get_fill_price_returns_nan_when_depth_is_insufficient():
+    book = build_book()
+    average, worst = book.get_fill_price(Direction.LONG, [4, 4.5])
+    assert average[0] == pytest.approx((101 + 102 * 2 + 104) / 4)
+    assert np.isnan(average[1]) and np.isnan(worst[1])
+
+    empty = OrderBook("BTC", Exchange.HYPE)
+    average, worst = empty.get_fill_price(Direction.SHORT, 1)
+    assert np.isnan(average) and np.isnan(worst)
+
+
+def test_get_slippage_is_relative_to_best_price():
+    book = build_book()
+    slippage = book.get_slippage(Direction.LONG, [1, 3])
+    assert slippage.tolist() == pytest.approx([0, ((101 + 102 * 2) / 3 - 101) / 101])
+    assert book.get_slippage(Direction.SHORT, 3) == pytest.approx((99 - (99 + 98 * 2) / 3) / 99)
+    assert np.isnan(OrderBook("BTC", Exchange.HYPE).get_slippage(Direction.LONG, 1))
@@ -0,0 +1,118 @@
+from threading import Event
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy_hyperliquid.hyperliquid_gateway import LATENCY_LABELS, OrderSubmitter  # noqa: E402
+
+
+def blocking_request(started, release):
+    def request():
+        started.set()
+        assert release.wait(5)
+        return {"status": "ok"}
+
+    return request
+
+
+def test_submit_rejects_when_inflight_limit_reached():
+    submitter = OrderSubmitter(print, 2, 2)
+    started, release = Event(), Event()
+    done = []
+    try:
+        for _ in range(2):
+            assert submitter.submit("send_order", blocking_request(started, release), done.append, pytest.fail)
+        assert not submitter.submit("send_order", lambda: pytest.fail("超过在途上限的请求不执行"), done.append, pytest.fail)
+        stats = submitter.get_stats()
+        assert (stats["inflight"], stats["rejected"]) == (2, 1)
+    finally:
+        release.set()
+        submitter.stop()
+        submitter.executor.shutdown(wait=True)
+    assert done == [{"status": "ok"}] * 2
+    assert submitter.get_stats()["inflight"] == 0
+
+
+def test_request_exception_calls_on_error_and_releases_slot():
+    submitter = OrderSubmitter(print, 1, 1)
+    errors = []
+    finished = Event()
+
+    def request():
+        raise ConnectionError("timeout")
+
+    def on_error(ex):
+        errors.append(ex)
+        finished.set()
+
+    try:
+        assert submitter.submit("send_order", request, lambda data: pytest.fail("请求失败不回调回报"), on_error)
+        assert finished.wait(5)
+    finally:
+        submitter.stop()
+        submitter.executor.shutdown(wait=True)
+    assert isinstance(errors[0], ConnectionError)
+    stats = submitter.get_stats()
+    assert stats["inflight"] == 0
+    assert (stats["requests"]["send_order"]["count"], stats["requests"]["send_order"]["error"]) == (1, 1)
+
+
+def test_callback_exception_is_logged():
+    logs = []
+    submitter = OrderSubmitter(logs.append, 1, 1)
+
+    def callback(data):
+        raise KeyError("statuses")
+
+    try:
+        assert submitter.submit("send_orders", lambda: {}, callback, pytest.fail)
+    finally:
+        submitter.executor.shutdown(wait=True)
+    assert len(logs) == 1
+    assert "send_orders" in logs[0]
+    assert submitter.get_stats()["requests"]["send_orders"]["error"] == 0
+
+
+def test_stop_cancels_queued_requests_and_calls_on_error():
+    submitter = OrderSubmitter(print, 1, 4)
+    started, release = Event(), Event()
+    errors = []
+    done = []
+    assert submitter.submit("send_order", blocking_request(started, release), done.append, pytest.fail)
+    assert started.wait(5)
+    for _ in range(2):
+        assert submitter.submit("send_order", lambda: pytest.fail("已取消的请求不执行"), done.append, errors.append)
+
+    submitter.stop()
+    # 未开始执行的请求取消后立即回调失败，正在执行的请求照常完成
+    assert len(errors) == 2
+    assert all(isinstance(ex, RuntimeError) for ex in errors)
+    assert submitter.get_stats()["inflight"] == 1
+    release.set()
+    submitter.executor.shutdown(wait=True)
+    assert done == [{"status": "ok"}]
+    assert submitter.get_stats()["inflight"] == 0
+    # 停止后不再接受请求
+    assert not submitter.submit("send_order", lambda: {}, done.append, errors.append)
+    assert submitter.get_stats()["inflight"] == 0
+
+
+def test_latency_histogram_buckets():
+    submitter = OrderSubmitter(print, 1, 1)
+    try:
+        # 桶上限包含边界值
+        for request_time in (0.0005, 0.001, 0.0015, 0.25, 20):
+            submitter.record("cancel_orders", 0.002, request_time, True)
+        stats = submitter.get_stats()["requests"]["cancel_orders"]
+    finally:
+        submitter.stop()
+    histogram = stats["histogram"]
+    assert list(histogram) == list(LATENCY_LABELS)
+    assert histogram["<=1ms"] == 2
+    assert histogram["<=2ms"] == 1
+    assert histogram["<=500ms"] == 1
+    assert histogram[">10000ms"] == 1
+    assert sum(histogram.values()) == stats["count"] == 5
+    assert stats["queue_ms_mean"] == pytest.approx(2)
+    assert stats["request_ms_max"] == pytest.approx(20000)
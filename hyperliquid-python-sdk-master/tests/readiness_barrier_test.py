@@ -0,0 +1,78 @@
+import time
+from threading import Timer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy_hyperliquid.hyperliquid_gateway import (  # noqa: E402
+    READY_CONTRACTS,
+    READY_SPOT,
+    READY_STAGES,
+    READY_WS,
+    HyperliquidWebsocketApi,
+    ReadinessBarrier,
+)
+
+
+def test_ready_stages_return_without_counting_wait():
+    barrier = ReadinessBarrier(READY_STAGES)
+    barrier.set(READY_CONTRACTS)
+    barrier.set(READY_SPOT)
+    assert barrier.wait((READY_CONTRACTS, READY_SPOT), 0)
+    stats = barrier.get_stats()
+    assert stats[READY_CONTRACTS]["ready"]
+    assert stats[READY_CONTRACTS]["ready_ms"] is not None
+    assert stats[READY_CONTRACTS]["wait_count"] == 0
+    assert not stats[READY_WS]["ready"]
+
+
+def test_timeout_is_shared_across_stages():
+    barrier = ReadinessBarrier(READY_STAGES)
+    timer = Timer(0.1, barrier.set, (READY_CONTRACTS,))
+    timer.start()
+    start = time.monotonic()
+    try:
+        assert not barrier.wait((READY_CONTRACTS, READY_SPOT), 0.3)
+    finally:
+        timer.cancel()
+    # 第一个阶段用掉的等待时间从总超时中扣除，不是每个阶段各等0.3秒
+    assert 0.25 <= time.monotonic() - start < 0.45
+
+    stats = barrier.get_stats()
+    assert (stats[READY_CONTRACTS]["wait_count"], stats[READY_CONTRACTS]["timeout"]) == (1, 0)
+    assert (stats[READY_SPOT]["wait_count"], stats[READY_SPOT]["timeout"]) == (1, 1)
+    assert stats[READY_SPOT]["wait_ms_max"] >= 250
+    assert stats[READY_WS]["wait_count"] == 0
+
+
+def test_timeout_stops_at_first_pending_stage():
+    barrier = ReadinessBarrier(READY_STAGES)
+    assert not barrier.wait((READY_CONTRACTS, READY_SPOT), 0.05)
+    assert not barrier.wait((READY_CONTRACTS, READY_SPOT), 0.05)
+    stats = barrier.get_stats()
+    assert (stats[READY_CONTRACTS]["wait_count"], stats[READY_CONTRACTS]["timeout"]) == (2, 2)
+    assert stats[READY_SPOT]["wait_count"] == 0
+
+
+def test_websocket_disconnect_clears_ready_stage():
+    barrier = ReadinessBarrier(READY_STAGES)
+    gateway = SimpleNamespace(gateway_name="HYPERLIQUID", readiness=barrier, write_log=lambda msg: None)
+    ws_api = HyperliquidWebsocketApi(gateway)
+    ws_api.subscribe_private = lambda: None
+
+    ws_api.on_connected()
+    assert barrier.is_ready(READY_WS)
+    ws_api.on_disconnected()
+    assert not barrier.is_ready(READY_WS)
+    assert not barrier.wait((READY_WS,), 0.01)
+
+    # 重连后再次就绪，首次就绪耗时保持不变
+    ready_ms = barrier.get_stats()[READY_WS]["ready_ms"]
+    ws_api.on_connected()
+    stats = barrier.get_stats()[READY_WS]
+    assert stats["ready"]
+    assert stats["ready_count"] == 2
+    assert stats["ready_ms"] == ready_ms
+    assert stats["timeout"] == 1
@@ -0,0 +1,378 @@
+from copy import copy
+from threading import Event
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Direction, Exchange, OrderType, Status  # noqa: E402
+from vnpy.trader.object import OrderData, OrderRequest  # noqa: E402
+
+from vnpy_hyperliquid import hyperliquid_gateway  # noqa: E402
+from vnpy_hyperliquid.hyperliquid_gateway import HyperliquidRestApi, ModifyRequest, OrderSubmitter  # noqa: E402
+
+CLOID = "0x" + "1".rjust(32, "0")
+
+
+class FakeGateway:
+    def __init__(self, responses=()):
+        self.gateway_name = "HYPERLIQUID"
+        self.orders = {}
+        self.system_local_orderid_map = {}
+        self.pushed = []
+        self.logs = []
+        self.ready = True
+        # 交易请求按调用顺序返回预置回报，并记录每次请求
+        self.requests = []
+        self.responses = list(responses)
+        self.exchange_info = SimpleNamespace(bulk_orders=self.request, bulk_modify_orders_new=self.request)
+
+    def request(self, requests):
+        self.requests.append(requests)
+        return self.responses.pop(0)
+
+    def on_order(self, order):
+        self.orders[order.orderid] = copy(order)
+        self.pushed.append(copy(order))
+
+    def write_log(self, msg):
+        self.logs.append(msg)
+
+    def wait_ready(self, stages, action):
+        return self.ready
+
+
+def build_order(orderid, symbol="BTC"):
+    return OrderData(
+        symbol=symbol,
+        exchange=Exchange.HYPE,
+        orderid=orderid,
+        direction=Direction.LONG,
+        price=100,
+        volume=1,
+        gateway_name="HYPERLIQUID",
+    )
+
+
+def build_api(responses=()):
+    gateway = FakeGateway(responses)
+    return HyperliquidRestApi(gateway), gateway
+
+
+def submit(api, orders):
+    # 先推送提交中委托，与create_order一致
+    for order in orders:
+        api.gateway.on_order(order)
+    api.submit_orders([{"coin": order.symbol} for order in orders], orders)
+
+
+def ok(statuses):
+    return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+
+@pytest.mark.parametrize(
+    "data, msg",
+    [
+        ({"error": "timeout"}, "timeout"),
+        ({"status": "err", "response": "Insufficient margin"}, "Insufficient margin"),
+        (None, "无返回数据"),
+    ],
+)
+def test_request_error_rejects_every_order(data, msg):
+    api, gateway = build_api([data])
+    orders = [build_order("0x1"), build_order("0x2")]
+    submit(api, orders)
+
+    assert len(gateway.requests) == 1
+    assert [order.status for order in gateway.pushed[2:]] == [Status.REJECTED, Status.REJECTED]
+    assert len(gateway.logs) == 2
+    assert all(msg in log for log in gateway.logs)
+    assert gateway.system_local_orderid_map == {}
+
+
+def test_statuses_map_back_to_orders_in_request_order():
+    statuses = [
+        {"resting": {"oid": 11}},
+        {"filled": {"totalSz": "1", "avgPx": "100", "oid": 12}},
+        {"error": "Order must have minimum value of $10"},
+    ]
+    api, gateway = build_api([ok(statuses)])
+    orders = [build_order("0x1"), build_order("0x2"), build_order("0x3")]
+    submit(api, orders)
+
+    assert gateway.system_local_orderid_map == {11: "0x1", 12: "0x2"}
+    # 挂单立即推送未成交，成交委托等websocket推送成交状态，错误委托推送拒单
+    assert gateway.orders["0x1"].status == Status.NOTTRADED
+    assert gateway.orders["0x2"].status == Status.SUBMITTING
+    assert gateway.orders["0x3"].status == Status.REJECTED
+    assert "minimum value" in gateway.logs[0]
+
+
+def test_missing_statuses_reject_remaining_orders():
+    api, gateway = build_api([ok([{"resting": {"oid": 11}}])])
+    orders = [build_order("0x1"), build_order("0x2"), build_order("0x3")]
+    submit(api, orders)
+
+    assert gateway.orders["0x1"].status == Status.NOTTRADED
+    assert gateway.orders["0x2"].status == Status.REJECTED
+    assert gateway.orders["0x3"].status == Status.REJECTED
+    assert len(gateway.logs) == 2
+
+
+def test_string_status_rejects_order():
+    api, gateway = build_api([ok(["waitingForFill"])])
+    submit(api, [build_order("0x1")])
+
+    assert gateway.orders["0x1"].status == Status.REJECTED
+    assert "waitingForFill" in gateway.logs[0]
+
+
+def test_resting_does_not_override_websocket_status():
+    api, gateway = build_api()
+    order = build_order("0x1")
+    gateway.on_order(order)
+    # websocket在REST回报前已推送部分成交
+    traded = copy(order)
+    traded.status = Status.PARTTRADED
+    gateway.on_order(traded)
+
+    api.on_order_status({"resting": {"oid": 11}}, order)
+    assert gateway.system_local_orderid_map == {11: "0x1"}
+    assert gateway.orders["0x1"].status == Status.PARTTRADED
+    assert len(gateway.pushed) == 2
+
+
+def test_reject_skips_orders_websocket_moved_past_submitting():
+    api, gateway = build_api()
+    orders = [build_order("0x1"), build_order("0x2")]
+    for order in orders:
+        gateway.on_order(order)
+    filled = copy(orders[0])
+    filled.status = Status.ALLTRADED
+    gateway.on_order(filled)
+
+    api.reject_orders(orders, "委托请求异常：timeout")
+    assert gateway.orders["0x1"].status == Status.ALLTRADED
+    assert gateway.orders["0x2"].status == Status.REJECTED
+    assert len(gateway.logs) == 1
+    assert "BTC" in gateway.logs[0]
+
+
+@pytest.fixture
+def btc_price_decimal(monkeypatch):
+    monkeypatch.setitem(hyperliquid_gateway.PRICE_DECIMAL_MAP, "BTC_HYPE", 1)
+
+
+def place(gateway, orderid, status=Status.NOTTRADED):
+    order = build_order(orderid)
+    order.status = status
+    gateway.on_order(order)
+    return order
+
+
+def test_modify_keeps_cloid_and_uses_int_oid(btc_price_decimal):
+    api, gateway = build_api([ok([{"resting": {"oid": 21}}, {"resting": {"oid": 22}}])])
+    place(gateway, CLOID)
+    place(gateway, 7)
+    api.modify_orders([ModifyRequest(CLOID, 101.04, 2), ModifyRequest(7, 99, 3)])
+
+    cloid_modify, oid_modify = gateway.requests[0]
+    # 自定义委托单id改单时新委托沿用同一个cloid
+    assert cloid_modify["oid"].to_raw() == CLOID
+    assert cloid_modify["order"]["cloid"].to_raw() == CLOID
+    assert cloid_modify["order"]["limit_px"] == 101.0
+    assert cloid_modify["order"]["sz"] == 2
+    assert oid_modify["oid"] == 7
+    assert oid_modify["order"]["cloid"] is None
+
+    # 交易所分配的新系统委托单id映射回本地委托单号
+    assert gateway.system_local_orderid_map == {21: CLOID, 22: 7}
+    assert (gateway.orders[CLOID].price, gateway.orders[CLOID].volume) == (101.0, 2)
+    assert (gateway.orders[7].price, gateway.orders[7].volume) == (99, 3)
+
+
+def test_modify_skips_unknown_and_finished_orders(btc_price_decimal):
+    api, gateway = build_api()
+    place(gateway, CLOID, Status.ALLTRADED)
+    api.modify_orders([ModifyRequest(CLOID, 101, 2), ModifyRequest("0x2", 101, 2)])
+
+    assert gateway.requests == []
+    assert len(gateway.logs) == 2
+
+
+def test_order_finished_during_modify_request_is_not_reopened(btc_price_decimal):
+    api, gateway = build_api()
+    place(gateway, CLOID)
+
+    def bulk_modify_orders_new(requests):
+        # 改单请求期间websocket推送全部成交
+        filled = copy(gateway.orders[CLOID])
+        filled.status = Status.ALLTRADED
+        gateway.on_order(filled)
+        return ok([{"filled": {"totalSz": "1", "avgPx": "100", "oid": 21}}])
+
+    gateway.exchange_info.bulk_modify_orders_new = bulk_modify_orders_new
+    api.modify_orders([ModifyRequest(CLOID, 101, 2)])
+
+    assert gateway.system_local_orderid_map == {21: CLOID}
+    assert gateway.orders[CLOID].status == Status.ALLTRADED
+    assert (gateway.orders[CLOID].price, gateway.orders[CLOID].volume) == (100, 1)
+
+
+def test_modify_partial_errors_keep_original_orders():
+    api, gateway = build_api()
+    first = place(gateway, CLOID)
+    second = place(gateway, 7)
+    pushed = len(gateway.pushed)
+    modified = [copy(first), copy(second)]
+    modified[0].price = modified[1].price = 105
+
+    api.on_modify_orders(ok([{"error": "Order was never placed"}, {"resting": {"oid": 22}}]), modified)
+    assert gateway.orders[CLOID].price == 100
+    assert gateway.orders[7].price == 105
+    assert gateway.system_local_orderid_map == {22: 7}
+    assert len(gateway.pushed) == pushed + 1
+    assert "never placed" in gateway.logs[0]
+
+
+@pytest.mark.parametrize(
+    "data, msg",
+    [({"error": "timeout"}, "timeout"), ({"status": "err", "response": "Invalid nonce"}, "Invalid nonce")],
+)
+def test_modify_request_error_keeps_every_order(data, msg):
+    api, gateway = build_api()
+    orders = [place(gateway, CLOID), place(gateway, 7)]
+    pushed = len(gateway.pushed)
+
+    api.on_modify_orders(data, orders)
+    assert len(gateway.pushed) == pushed
+    assert len(gateway.logs) == 2
+    assert all(msg in log for log in gateway.logs)
+
+
+def test_submit_rejects_orders_when_submitter_is_full():
+    api, gateway = build_api()
+    api.submitter = OrderSubmitter(gateway.write_log, 1, 1)
+    started, release = Event(), Event()
+
+    def bulk_orders(order_requests):
+        started.set()
+        assert release.wait(5)
+        return ok([{"resting": {"oid": 11}}])
+
+    gateway.exchange_info.bulk_orders = bulk_orders
+    try:
+        submit(api, [build_order("0x1")])
+        assert started.wait(5)
+        submit(api, [build_order("0x2")])
+        assert gateway.orders["0x2"].status == Status.REJECTED
+        assert "上限" in gateway.logs[0]
+    finally:
+        release.set()
+        api.submitter.executor.shutdown(wait=True)
+    assert gateway.orders["0x1"].status == Status.NOTTRADED
+
+
+def test_stop_submitter_rejects_queued_orders():
+    api, gateway = build_api()
+    api.submitter = OrderSubmitter(gateway.write_log, 1, 4)
+    started, release = Event(), Event()
+
+    def bulk_orders(order_requests):
+        started.set()
+        assert release.wait(5)
+        return ok([{"resting": {"oid": 11}}])
+
+    gateway.exchange_info.bulk_orders = bulk_orders
+    submit(api, [build_order("0x1")])
+    assert started.wait(5)
+    submit(api, [build_order("0x2"), build_order("0x3")])
+
+    api.submitter.stop()
+    assert gateway.orders["0x2"].status == Status.REJECTED
+    assert gateway.orders["0x3"].status == Status.REJECTED
+    release.set()
+    api.submitter.executor.shutdown(wait=True)
+    assert gateway.orders["0x1"].status == Status.NOTTRADED
+
+
+def test_send_order_rejects_when_contracts_not_ready():
+    api, gateway = build_api()
+    gateway.ready = False
+    req = OrderRequest(
+        symbol="BTC", exchange=Exchange.HYPE, direction=Direction.LONG, type=OrderType.LIMIT, volume=1, price=100
+    )
+
+    vt_orderid = api.send_order(req)
+    vt_orderids = api.send_orders([req, req])
+    assert gateway.requests == []
+    assert len(set([vt_orderid] + vt_orderids)) == 3
+    assert [order.vt_orderid for order in gateway.pushed] == [vt_orderid] + vt_orderids
+    assert all(order.status == Status.REJECTED for order in gateway.pushed)
+    assert len(gateway.logs) == 3
+
+
+def build_cancel_api(cloid_response, oid_response):
+    api, gateway = build_api()
+    cancels = {}
+
+    def bulk_cancel_by_cloid(cancel_requests):
+        cancels["cloid"] = cancel_requests
+        return cloid_response
+
+    def bulk_cancel(cancel_requests):
+        cancels["oid"] = cancel_requests
+        return oid_response
+
+    gateway.exchange_info.bulk_cancel_by_cloid = bulk_cancel_by_cloid
+    gateway.exchange_info.bulk_cancel = bulk_cancel
+    return api, gateway, cancels
+
+
+def test_cancel_splits_cloid_and_oid_groups_and_maps_statuses():
+    cloid_2 = "0x" + "2".rjust(32, "0")
+    api, gateway, cancels = build_cancel_api(
+        ok(["success", {"error": "Order was never placed, already canceled, or filled."}]),
+        ok([{"error": "Order was never placed, already canceled, or filled."}, "success"]),
+    )
+    orders = [place(gateway, CLOID), place(gateway, 7), place(gateway, cloid_2), place(gateway, 8)]
+    pushed = len(gateway.pushed)
+    api.cancel_orders([order.create_cancel_request() for order in orders])
+
+    assert [cancel["cloid"].to_raw() for cancel in cancels["cloid"]] == [CLOID, cloid_2]
+    assert cancels["oid"] == [{"coin": "BTC", "oid": 7}, {"coin": "BTC", "oid": 8}]
+    # 每组statuses按请求顺序对应，撤单失败的委托推送已撤销
+    assert [order.orderid for order in gateway.pushed[pushed:]] == [cloid_2, 7]
+    assert gateway.orders[cloid_2].status == Status.CANCELLED
+    assert gateway.orders[7].status == Status.CANCELLED
+    assert gateway.orders[CLOID].status == Status.NOTTRADED
+    assert gateway.orders[8].status == Status.NOTTRADED
+    assert len(gateway.logs) == 2
+
+
+def test_cancel_group_request_error_only_logs():
+    api, gateway, cancels = build_cancel_api({"status": "err", "response": "Invalid nonce"}, None)
+    orders = [place(gateway, CLOID), place(gateway, 7)]
+    pushed = len(gateway.pushed)
+    api.cancel_orders([order.create_cancel_request() for order in orders])
+
+    assert set(cancels) == {"cloid", "oid"}
+    assert len(gateway.pushed) == pushed
+    assert "Invalid nonce" in gateway.logs[0]
+    assert "无返回数据" in gateway.logs[1]
+
+
+def test_cancel_all_filters_active_orders_by_symbol():
+    api, gateway, cancels = build_cancel_api(ok(["success"]), ok(["success"]))
+    place(gateway, CLOID)
+    place(gateway, 7, Status.ALLTRADED)
+    gateway.on_order(build_order(8, "ETH"))
+
+    api.cancel_all("BTC_HYPE/HYPERLIQUID")
+    assert [cancel["cloid"].to_raw() for cancel in cancels.pop("cloid")] == [CLOID]
+    assert cancels == {}
+
+    api.cancel_all()
+    assert cancels["cloid"][0]["cloid"].to_raw() == CLOID
+    assert cancels["oid"] == [{"coin": "ETH", "oid": 8}]
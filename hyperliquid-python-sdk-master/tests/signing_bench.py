@@ -0,0 +1,144 @@
+"""L1 action签名性能基准
+
+运行：python -m tests.signing_bench
+对比完整EIP-712结构化数据签名和缓存域分隔符的L1Signer每秒签名数，并用signing_test中的向量校验结果一致；
+对比50笔委托的批量委托action按原Decimal规范化和当前float_to_wire的每秒编码次数。
+"""
+import time
+from decimal import Decimal
+
+import eth_account
+
+from hyperliquid.utils.signing import (
+    OrderRequest,
+    float_to_int_for_hashing,
+    float_to_wire,
+    get_l1_signer,
+    order_request_to_order_wire,
+    order_wires_to_order_action,
+    sign_l1_action,
+    sign_l1_action_typed_data,
+)
+
+ROUNDS = 500
+BULK_LEGS = 50
+REPEAT = 5
+PRIVATE_KEY = "0x0123456789012345678901234567890123456789012345678901234567890123"
+
+# signing_test中的签名向量：(action, vault_address, is_mainnet, r, s, v)
+VECTORS = [
+    (
+        {"type": "dummy", "num": float_to_int_for_hashing(1000)},
+        None,
+        True,
+        "0x53749d5b30552aeb2fca34b530185976545bb22d0b3ce6f62e31be961a59298",
+        "0x755c40ba9bf05223521753995abb2f73ab3229be8ec921f350cb447e384d8ed8",
+        27,
+    ),
+    (
+        {"type": "dummy", "num": float_to_int_for_hashing(1000)},
+        "0x1719884eb866cb12b2287399b15f7db5e7d775ea",
+        False,
+        "0xe281d2fb5c6e25ca01601f878e4d69c965bb598b88fac58e475dd1f5e56c362b",
+        "0x7ddad27e9a238d045c035bc606349d075d5c5cd00a6cd1da23ab5c39d4ef0f60",
+        27,
+    ),
+]
+
+
+def build_order_action():
+    order_request: OrderRequest = {
+        "coin": "ETH",
+        "is_buy": True,
+        "sz": 100,
+        "limit_px": 100,
+        "reduce_only": False,
+        "order_type": {"limit": {"tif": "Gtc"}},
+        "cloid": None,
+    }
+    return order_wires_to_order_action([order_request_to_order_wire(order_request, 1)])
+
+
+def build_bulk_requests():
+    """50笔ETH阶梯挂单"""
+    return [
+        {
+            "coin": "ETH",
+            "is_buy": index % 2 == 0,
+            "sz": round(0.0147 + index * 0.0011, 4),
+            "limit_px": round(1670.1 + index * 0.3, 1),
+            "reduce_only": False,
+            "order_type": {"limit": {"tif": "Gtc"}},
+            "cloid": None,
+        }
+        for index in range(BULK_LEGS)
+    ]
+
+
+def legacy_float_to_wire(x):
+    """按Decimal规范化生成wire字符串的原实现"""
+    rounded = f"{x:.8f}"
+    if abs(float(rounded) - x) >= 1e-12:
+        raise ValueError("float_to_wire causes rounding", x)
+    if rounded == "-0":
+        rounded = "0"
+    normalized = Decimal(rounded).normalize()
+    return f"{normalized:f}"
+
+
+def legacy_order_wires(order_requests):
+    return [
+        {
+            "a": 1,
+            "b": order["is_buy"],
+            "p": legacy_float_to_wire(order["limit_px"]),
+            "s": legacy_float_to_wire(order["sz"]),
+            "r": order["reduce_only"],
+            "t": order["order_type"],
+        }
+        for order in order_requests
+    ]
+
+
+def check_vectors(wallet):
+    for action, vault_address, is_mainnet, r, s, v in VECTORS:
+        for sign in [sign_l1_action, sign_l1_action_typed_data]:
+            signature = sign(wallet, action, vault_address, 0, None, is_mainnet)
+            assert signature == {"r": r, "s": s, "v": v}, sign.__name__
+
+
+def measure(func):
+    """取REPEAT次中的最好成绩，降低调度抖动影响"""
+    best = 0.0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for nonce in range(ROUNDS):
+            func(nonce)
+        elapsed = time.perf_counter() - start
+        best = max(best, ROUNDS / elapsed)
+    return best
+
+
+def main():
+    wallet = eth_account.Account.from_key(PRIVATE_KEY)
+    check_vectors(wallet)
+    action = build_order_action()
+    signer = get_l1_signer(wallet, True)
+
+    typed_data_rate = measure(lambda nonce: sign_l1_action_typed_data(wallet, action, None, nonce, None, True))
+    cached_rate = measure(lambda nonce: signer.sign(action, None, nonce, None))
+    print(f"typed data sign_l1_action: {typed_data_rate:,.0f} sig/s")
+    print(f"cached L1Signer:           {cached_rate:,.0f} sig/s")
+    print(f"speedup: {cached_rate / typed_data_rate:.2f}x")
+
+    order_requests = build_bulk_requests()
+    assert legacy_order_wires(order_requests) == [order_request_to_order_wire(order, 1) for order in order_requests]
+    legacy_rate = measure(lambda _: legacy_order_wires(order_requests))
+    float_rate = measure(lambda _: [order_request_to_order_wire(order, 1) for order in order_requests])
+    print(f"Decimal normalize {BULK_LEGS}-leg encode: {legacy_rate:,.0f} actions/s")
+    print(f"float_to_wire {BULK_LEGS}-leg encode:     {float_rate:,.0f} actions/s")
+    print(f"speedup: {float_rate / legacy_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,15 @@ from hyperliquid.utils.signing import (
     ScheduleCancelAction,
     action_hash,
     construct_phantom_agent,
+    get_l1_signer,
+    get_timestamp_ms,
     float_to_int_for_hashing,
+    float_to_wire,
+    recover_agent_or_user_from_l1_action,
     order_request_to_order_wire,
     order_wires_to_order_action,
     sign_l1_action,
+    sign_l1_action_typed_data,
     sign_usd_transfer_action,
     sign_withdraw_from_bridge_action,
 )
@@ -138,6 +143,23 @@ def test_l1_action_signing_matches_with_vault():
     assert signature_testnet["v"] == 27
 
 
+def test_cached_l1_signer_matches_typed_data_signing():
+    wallet = eth_account.Account.from_key("0x0123456789012345678901234567890123456789012345678901234567890123")
+    action = {"type": "dummy", "num": float_to_int_for_hashing(1000)}
+    for is_mainnet in [True, False]:
+        for vault_address in [None, "0x1719884eb866cb12b2287399b15f7db5e7d775ea"]:
+            for expires_after in [None, 1700000000000]:
+                signature = sign_l1_action(wallet, action, vault_address, 1, expires_after, is_mainnet)
+                expected = sign_l1_action_typed_data(wallet, action, vault_address, 1, expires_after, is_mainnet)
+                assert signature == expected
+                address = recover_agent_or_user_from_l1_action(
+                    action, signature, vault_address, 1, expires_after, is_mainnet
+                )
+                assert address == wallet.address
+    assert get_l1_signer(wallet, True) is get_l1_signer(wallet, True)
+    assert get_l1_signer(wallet, True) is not get_l1_signer(wallet, False)
+
+
 def test_l1_action_signing_tpsl_order_matches():
     wallet = eth_account.Account.from_key("0x0123456789012345678901234567890123456789012345678901234567890123")
     order_request: OrderRequest = {
@@ -177,6 +199,45 @@ def test_l1_action_signing_tpsl_order_matches():
     assert signature_testnet["v"] == 28
 
 
+def legacy_float_to_wire(x: float) -> str:
+    from decimal import Decimal
+
+    rounded = f"{x:.8f}"
+    if abs(float(rounded) - x) >= 1e-12:
+        raise ValueError("float_to_wire causes rounding", x)
+    if rounded == "-0":
+        rounded = "0"
+    normalized = Decimal(rounded).normalize()
+    return f"{normalized:f}"
+
+
+def test_float_to_wire_matches_decimal_normalize():
+    values = [0, -0.0, 100, 1670.1, 0.0147, 0.1 + 0.2, 103, 123456.789, 1e-8, -2.5, 100000000.0, 0.00001234]
+    values += [123456789.1, 67121153.170078, -98765432.12345678, 99999999.99999999, 12345678.9]
+    for value in values:
+        assert float_to_wire(value) == legacy_float_to_wire(value)
+
+
+def test_float_to_wire_matches_decimal_normalize_random_prices():
+    import random
+
+    rng = random.Random(7)
+    for _ in range(20000):
+        value = round(rng.uniform(0, 10 ** rng.randint(0, 9)), rng.randint(0, 8))
+        assert float_to_wire(value) == legacy_float_to_wire(value)
+    with pytest.raises(ValueError):
+        float_to_wire(0.000000001)
+
+
+def test_timestamp_nonce_is_strictly_increasing_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        nonces = list(executor.map(lambda _: get_timestamp_ms(), range(2000)))
+    assert len(set(nonces)) == len(nonces)
+    assert get_timestamp_ms() > max(nonces)
+
+
 def test_float_to_int_for_hashing():
     assert float_to_int_for_hashing(123123123123) == 12312312312300000000
     assert float_to_int_for_hashing(0.00001231) == 1231
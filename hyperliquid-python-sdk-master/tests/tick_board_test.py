@@ -0,0 +1,103 @@
+import itertools
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Exchange  # noqa: E402
+from vnpy.trader.object import TickData  # noqa: E402
+from vnpy.trader.utility import TZ_INFO  # noqa: E402
+
+from vnpy_hyperliquid import tick_board  # noqa: E402
+from vnpy_hyperliquid.tick_board import TickBoard  # noqa: E402
+
+
+BOARD_IDS = itertools.count()
+
+
+@pytest.fixture
+def board():
+    board = TickBoard.create(f"hltb_{os.getpid()}_{next(BOARD_IDS)}", 2)
+    yield board
+    board.close()
+
+
+def build_tick(price):
+    tick = TickData(symbol="BTC", exchange=Exchange.HYPE, datetime=datetime(2024, 1, 1, tzinfo=TZ_INFO), gateway_name="HYPERLIQUID")
+    tick.last_price = price
+    tick.bid_price_1 = price - 1
+    tick.ask_volume_5 = 5
+    return tick
+
+
+# 读取方复制槽位期间写入方完成一次写入
+class CopyDuringWrite:
+    def __init__(self, board):
+        self.board = board
+        self.slots = board.slots
+        self.calls = 0
+
+    def __getitem__(self, index):
+        self.calls += 1
+        record = self.slots[index]
+        if self.calls == 1:
+            self.board.seqs[index] += 2
+        return record
+
+
+def test_write_then_read_returns_consistent_record(board):
+    assert board.read("BTC_HYPE") is None
+    board.write("BTC_HYPE", build_tick(100))
+    record = board.read("BTC_HYPE")
+    assert record["symbol"] == b"BTC_HYPE"
+    assert record["last_price"] == 100
+    assert record["bid_price"][0] == 99
+    assert record["ask_volume"][4] == 5
+    assert record["datetime"] == int(datetime(2024, 1, 1, tzinfo=TZ_INFO).timestamp() * 1000)
+    # 每次写入序号加2，写入完成后为偶数
+    assert board.get_sequence("BTC_HYPE") == 2
+    board.write("BTC_HYPE", build_tick(101))
+    assert board.get_sequence("BTC_HYPE") == 4
+
+
+def test_attached_reader_sees_published_slots(board):
+    board.write("BTC_HYPE", build_tick(100))
+    reader = TickBoard.attach(board.shm.name)
+    try:
+        assert reader.read("BTC_HYPE")["last_price"] == 100
+        board.write("ETH_HYPE", build_tick(10))
+        # 读取方按需刷新新注册合约的槽位
+        assert reader.read("ETH_HYPE")["last_price"] == 10
+    finally:
+        reader.close()
+
+
+def test_read_retries_when_write_completes_during_copy(board):
+    board.write("BTC_HYPE", build_tick(100))
+    proxy = CopyDuringWrite(board)
+    board.slots = proxy
+    assert board.read("BTC_HYPE")["last_price"] == 100
+    assert proxy.calls == 2
+    board.slots = proxy.slots
+
+
+def test_read_gives_up_while_writer_holds_slot(board, monkeypatch):
+    board.write("BTC_HYPE", build_tick(100))
+    monkeypatch.setattr(tick_board, "MAX_READ_RETRY", 5)
+    index = board.slot_map["BTC_HYPE"]
+    # 奇数序号表示写入中
+    board.seqs[index] += 1
+    assert board.read("BTC_HYPE") is None
+    board.seqs[index] += 1
+    assert board.read("BTC_HYPE")["last_price"] == 100
+
+
+def test_full_board_skips_publishing(board):
+    assert board.register("BTC_HYPE") == 0
+    assert board.register("ETH_HYPE") == 1
+    assert board.register("SOL_HYPE") is None
+    board.write("SOL_HYPE", build_tick(100))
+    assert board.read("SOL_HYPE") is None
+    assert "SOL_HYPE" not in board.slot_map
@@ -0,0 +1,146 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Exchange  # noqa: E402
+from vnpy.trader.object import TickData  # noqa: E402
+
+from vnpy_hyperliquid.hyperliquid_gateway import (  # noqa: E402
+    EVENT_CONFLATION_MARK,
+    HyperliquidWebsocketApi,
+    TickConflator,
+)
+
+
+class FakeEventEngine:
+    def __init__(self):
+        self.events = []
+        self.handlers = {}
+
+    def register(self, type, handler):
+        self.handlers[type] = handler
+
+    def unregister(self, type, handler):
+        self.handlers.pop(type, None)
+
+    def put(self, event):
+        self.events.append(event)
+
+    def process(self):
+        events, self.events = self.events, []
+        for event in events:
+            self.handlers[event.type](event)
+
+
+def build_tick(price):
+    tick = TickData(symbol="BTC", exchange=Exchange.HYPE, datetime=datetime(2024, 1, 1), gateway_name="HYPERLIQUID")
+    tick.bid_price_1 = price
+    return tick
+
+
+def test_interval_mode_conflates_updates_and_flushes_latest_copy():
+    pushed = []
+    conflator = TickConflator(pushed.append, FakeEventEngine(), "interval", 60)
+    tick = build_tick(100)
+    conflator.on_tick(tick)
+    assert pushed == [tick]
+
+    for price in (101, 102, 103):
+        tick.bid_price_1 = price
+        conflator.on_tick(tick)
+    assert len(pushed) == 1
+    # Websocket线程继续修改同一个tick不影响等待补推的副本
+    tick.bid_price_1 = 999
+    assert conflator.pending[tick.vt_symbol].bid_price_1 == 103
+
+    conflator.flush()
+    assert len(pushed) == 1
+    conflator.last_push_time[tick.vt_symbol] = 0
+    conflator.flush()
+    assert len(pushed) == 2
+    assert pushed[1] is not tick
+    assert pushed[1].bid_price_1 == 103
+    assert conflator.get_stats() == {tick.vt_symbol: {"pushed": 2, "conflated": 2}}
+
+
+def test_flush_without_pending_tick_pushes_nothing():
+    pushed = []
+    conflator = TickConflator(pushed.append, FakeEventEngine(), "interval", 0)
+    conflator.on_tick(build_tick(100))
+    conflator.flush()
+    assert len(pushed) == 1
+
+
+def test_busy_mode_holds_ticks_until_mark_event_is_processed():
+    pushed = []
+    event_engine = FakeEventEngine()
+    conflator = TickConflator(pushed.append, event_engine, "busy", 0.01)
+    conflator.start()
+    assert event_engine.handlers[EVENT_CONFLATION_MARK] == conflator.on_mark
+
+    conflator.on_tick(build_tick(100))
+    assert len(pushed) == 1
+    assert conflator.is_busy()
+    assert len(event_engine.events) == 1
+
+    conflator.on_tick(build_tick(101))
+    conflator.on_tick(build_tick(102))
+    conflator.flush()
+    assert len(pushed) == 1
+
+    event_engine.process()
+    assert not conflator.is_busy()
+    conflator.flush()
+    assert [tick.bid_price_1 for tick in pushed] == [100, 102]
+    assert conflator.get_stats() == {pushed[0].vt_symbol: {"pushed": 2, "conflated": 1}}
+
+    conflator.stop()
+    assert EVENT_CONFLATION_MARK not in event_engine.handlers
+
+
+def build_ws_api(conflator):
+    tick = build_tick(0)
+    tick.last_price = 100
+    api = SimpleNamespace(
+        ticks={f"BTC_{Exchange.HYPE.value}": tick},
+        is_spot_symbol=lambda symbol: False,
+        tick_board=None,
+        order_books={},
+        conflator=conflator,
+        gateway=SimpleNamespace(on_tick=lambda tick: pytest.fail("启用合并推送时不直接推送tick")),
+    )
+    api.push_tick = lambda tick: HyperliquidWebsocketApi.push_tick(api, tick)
+    return api
+
+
+def depth_packet(time, price):
+    levels = [[{"px": str(price), "sz": "1", "n": 1}], [{"px": str(price + 1), "sz": "1", "n": 1}]]
+    return {"data": {"coin": "BTC", "time": time, "levels": levels}}
+
+
+def test_trade_push_discards_older_pending_depth():
+    pushed = []
+    conflator = TickConflator(
+        lambda tick: pushed.append((tick.datetime, tick.last_price, tick.bid_price_1)),
+        FakeEventEngine(),
+        "interval",
+        60,
+    )
+    api = build_ws_api(conflator)
+    HyperliquidWebsocketApi.on_depth(api, depth_packet(1700000000000, 99))
+    # 合并间隔内的深度更新等待补推
+    HyperliquidWebsocketApi.on_depth(api, depth_packet(1700000001000, 98))
+    assert len(pushed) == 1
+    HyperliquidWebsocketApi.on_public_trade(api, {"data": [{"coin": "BTC", "time": 1700000002000, "px": "101"}]})
+    assert len(pushed) == 2
+    # 成交tick已包含最新深度，补推线程不会再推送更早的深度tick
+    conflator.last_push_time.clear()
+    conflator.flush()
+    assert len(pushed) == 2
+    times = [item[0] for item in pushed]
+    assert times == sorted(times)
+    assert pushed[-1][1:] == (101, 98)
+    assert conflator.get_stats()[api.ticks[f"BTC_{Exchange.HYPE.value}"].vt_symbol] == {"pushed": 2, "conflated": 1}
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("vnpy")
+
+from vnpy.trader.constant import Direction, Exchange, Offset  # noqa: E402
+
+from vnpy_hyperliquid import hyperliquid_gateway  # noqa: E402
+from vnpy_hyperliquid.hyperliquid_gateway import (  # noqa: E402
+    HyperliquidRestApi,
+    HyperliquidWebsocketApi,
+    TradeIdFilter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(hyperliquid_gateway, "monotonic", clock)
+    return clock
+
+
+def test_duplicate_ids_are_counted_as_hits(clock):
+    trade_filter = TradeIdFilter(10, 60)
+    assert trade_filter.add(1)
+    assert trade_filter.add(2)
+    assert not trade_filter.add(1)
+    assert not trade_filter.add(1)
+    assert 1 in trade_filter
+    assert trade_filter.get_stats() == {"size": 2, "capacity": 10, "hit": 2, "capacity_evict": 0, "ttl_evict": 0}
+
+
+def test_capacity_evicts_oldest_id(clock):
+    trade_filter = TradeIdFilter(3, 60)
+    for trade_id in range(5):
+        assert trade_filter.add(trade_id)
+    assert len(trade_filter) == 3
+    assert 0 not in trade_filter and 1 not in trade_filter
+    # 被淘汰的id再次出现视为新成交
+    assert trade_filter.add(0)
+    assert 2 not in trade_filter
+    assert trade_filter.get_stats()["capacity_evict"] == 3
+
+
+def test_ttl_evicts_expired_ids(clock):
+    trade_filter = TradeIdFilter(10, 60)
+    trade_filter.add(1)
+    clock.now += 30
+    trade_filter.add(2)
+    clock.now += 31
+    # 写入时淘汰超过有效期的id，未过期的id仍然去重
+    assert trade_filter.add(3)
+    assert 1 not in trade_filter
+    assert not trade_filter.add(2)
+    assert trade_filter.add(1)
+    stats = trade_filter.get_stats()
+    assert (stats["size"], stats["hit"], stats["ttl_evict"]) == (3, 1, 1)
+
+
+def build_fill(tid, oid=7, cloid=None):
+    raw = {
+        "coin": "BTC",
+        "px": "100.5",
+        "sz": "0.1",
+        "side": "B",
+        "time": 1700000000000 + tid,
+        "dir": "Open Long",
+        "oid": oid,
+        "tid": tid,
+    }
+    if cloid:
+        raw["cloid"] = cloid
+    return raw
+
+
+def build_gateway(fills):
+    trades = []
+    gateway = SimpleNamespace(
+        gateway_name="HYPERLIQUID",
+        trade_filter=TradeIdFilter(100, 60),
+        system_local_orderid_map={},
+        on_trade=trades.append,
+    )
+    gateway.rest_api = HyperliquidRestApi(gateway)
+    gateway.rest_api.trade_address = "0x0"
+    gateway.rest_api.rest_info = SimpleNamespace(user_fills=lambda address: fills)
+    gateway.ws_api = HyperliquidWebsocketApi(gateway)
+    gateway.ws_api.is_spot_symbol = gateway.rest_api.is_spot_symbol
+    return gateway, trades
+
+
+def test_rest_query_and_websocket_share_dedup():
+    fills = [build_fill(2, cloid="0xabc"), build_fill(1)]
+    gateway, trades = build_gateway(fills)
+    gateway.ws_api.on_trade({"data": {"fills": [build_fill(1)]}})
+    assert len(trades) == 1
+
+    # REST补查按成交时间顺序推送，websocket已推送的成交被过滤
+    gateway.rest_api.query_trade()
+    assert [trade.tradeid for trade in trades] == [1, 2]
+    assert trades[1].orderid == "0xabc"
+    assert (trades[1].direction, trades[1].offset, trades[1].price) == (Direction.LONG, Offset.OPEN, 100.5)
+    assert trades[1].exchange == Exchange.HYPE
+    assert gateway.system_local_orderid_map == {7: "0xabc"}
+
+    # websocket重连后重推的成交也被过滤
+    gateway.ws_api.on_trade({"data": {"fills": fills}})
+    assert len(trades) == 2
+    assert gateway.trade_filter.get_stats()["hit"] == 3
@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.exceptions import ConnectionError
+
+from hyperliquid import api as api_module
+from hyperliquid.api import API
+from hyperliquid.transport import HttpTransport, get_shared_transport, httpx, is_connect_failure
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    head_count = 0
+
+    def do_HEAD(self):
+        Handler.head_count += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_clients_share_transport_per_base_url():
+    server, base_url = start_server()
+    try:
+        first = API(base_url)
+        second = API(base_url)
+        assert first.transport is second.transport
+        assert first.transport is get_shared_transport(base_url)
+        assert first.post("/info", {"type": "meta"}) == {"ok": True}
+
+        transport = HttpTransport(base_url, warm_interval=0)
+        assert API(base_url, transport=transport).transport is transport
+        transport.close()
+        first.transport.close()
+        assert get_shared_transport(base_url) is not first.transport
+        get_shared_transport(base_url).close()
+    finally:
+        server.shutdown()
+
+
+def test_idle_transport_is_warmed():
+    server, base_url = start_server()
+    try:
+        Handler.head_count = 0
+        transport = HttpTransport(base_url, pool_size=2, warm_interval=0.1)
+        time.sleep(0.5)
+        transport.close()
+        assert transport.warm_count >= 1
+        assert Handler.head_count >= transport.warm_count
+    finally:
+        server.shutdown()
+
+
+def test_shared_transport_does_not_warm_by_default():
+    server, base_url = start_server()
+    try:
+        transport = API(base_url).transport
+        assert transport.warm_thread is None
+        transport.close()
+    finally:
+        server.shutdown()
+
+
+def test_connect_failures_mark_connection_lost(monkeypatch):
+    statuses = []
+    monkeypatch.setattr(api_module, "save_connection_status", lambda *args: statuses.append(args))
+    monkeypatch.setattr(api_module, "write_log", lambda *args: None)
+    api = API("http://127.0.0.1:1", transport=HttpTransport("http://127.0.0.1:1"))
+    api.handle_exception("/info", ConnectionError("HTTPConnectionPool: Max retries exceeded with url: /info"))
+    assert len(statuses) == 1
+    api.handle_exception("/info", ConnectionError("Connection reset by peer"))
+    assert len(statuses) == 1
+    if httpx is not None:
+        # httpx连接失败转换后的异常不含Max retries exceeded
+        try:
+            raise ConnectionError("[Errno 111] Connection refused") from httpx.ConnectError("refused")
+        except ConnectionError as ex:
+            assert is_connect_failure(ex)
+            api.handle_exception("/info", ex)
+        assert len(statuses) == 2
+    api.transport.close()
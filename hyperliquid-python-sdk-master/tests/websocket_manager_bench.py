@@ -0,0 +1,191 @@
+"""WebsocketManager.on_message 分发性能基准
+
+运行：python -m tests.websocket_manager_bench
+回放l2Book/trades/activeAssetCtx/bbo推送帧，对比旧版if/elif标识符分发和分发表的每秒消息数。
+"""
+import json
+import time
+from collections import defaultdict
+
+from hyperliquid.utils.constants import MAINNET_API_URL
+from hyperliquid.utils.types import Optional, Subscription, WsMsg
+from hyperliquid.websocket_manager import ActiveSubscription, WebsocketManager
+
+COIN_COUNT = 120
+ROUNDS = 10
+REPEAT = 5
+
+
+def build_frames(coins):
+    frames = []
+    for index, coin in enumerate(coins):
+        levels = [
+            [{"px": f"{100 - i * 0.1:.1f}", "sz": "1.5", "n": 3} for i in range(20)],
+            [{"px": f"{100 + i * 0.1:.1f}", "sz": "2.5", "n": 2} for i in range(20)],
+        ]
+        frames.append({"channel": "l2Book", "data": {"coin": coin, "time": 1700000000000 + index, "levels": levels}})
+        frames.append(
+            {
+                "channel": "trades",
+                "data": [{"coin": coin, "side": "B", "px": "100.1", "sz": "0.5", "hash": "0x0", "time": 1700000000000}],
+            }
+        )
+        frames.append(
+            {
+                "channel": "activeAssetCtx",
+                "data": {"coin": coin, "ctx": {"dayBaseVlm": "1000.0", "prevDayPx": "99.0", "openInterest": "10.0"}},
+            }
+        )
+        frames.append(
+            {
+                "channel": "bbo",
+                "data": {
+                    "coin": coin,
+                    "time": 1700000000000,
+                    "bbo": [{"px": "100.0", "sz": "1.0", "n": 1}, {"px": "100.1", "sz": "1.0", "n": 1}],
+                },
+            }
+        )
+    return [json.dumps(frame) for frame in frames]
+
+
+def build_subscriptions(coins):
+    subscriptions = []
+    for coin in coins:
+        for subscription_type in ["l2Book", "trades", "activeAssetCtx", "bbo"]:
+            subscriptions.append({"type": subscription_type, "coin": coin})
+    return subscriptions
+
+
+# 基线：改用分发表之前按if/elif逐类型生成分发标识符的实现
+def subscription_to_identifier(subscription: Subscription) -> str:
+    if subscription["type"] == "allMids":
+        return "allMids"
+    elif subscription["type"] == "l2Book":
+        return f'l2Book:{subscription["coin"].lower()}'
+    elif subscription["type"] == "trades":
+        return f'trades:{subscription["coin"].lower()}'
+    elif subscription["type"] == "userEvents":
+        return "userEvents"
+    elif subscription["type"] == "userFills":
+        return f'userFills:{subscription["user"].lower()}'
+    elif subscription["type"] == "candle":
+        return f'candle:{subscription["coin"].lower()},{subscription["interval"]}'
+    elif subscription["type"] == "orderUpdates":
+        return "orderUpdates"
+    elif subscription["type"] == "userFundings":
+        return f'userFundings:{subscription["user"].lower()}'
+    elif subscription["type"] == "userNonFundingLedgerUpdates":
+        return f'userNonFundingLedgerUpdates:{subscription["user"].lower()}'
+    elif subscription["type"] == "webData2":
+        return f'webData2:{subscription["user"].lower()}'
+    elif subscription["type"] == "bbo":
+        return f'bbo:{subscription["coin"].lower()}'
+    elif subscription["type"] == "activeAssetCtx":
+        return f'activeAssetCtx:{subscription["coin"].lower()}'
+    elif subscription["type"] == "activeAssetData":
+        return f'activeAssetData:{subscription["coin"].lower()},{subscription["user"].lower()}'
+    elif subscription["type"] == "clearinghouseState":
+        return f"clearinghouseState:{subscription["dex"].lower()}"
+    elif subscription["type"] == "openOrders":
+        return f"openOrders:{subscription["dex"].lower()}"
+
+
+def ws_msg_to_identifier(ws_msg: WsMsg) -> Optional[str]:
+    if ws_msg["channel"] == "pong":
+        return "pong"
+    elif ws_msg["channel"] == "allMids":
+        return "allMids"
+    elif ws_msg["channel"] == "l2Book":
+        return f'l2Book:{ws_msg["data"]["coin"].lower()}'
+    elif ws_msg["channel"] == "trades":
+        trades = ws_msg["data"]
+        if len(trades) == 0:
+            return None
+        else:
+            return f'trades:{trades[0]["coin"].lower()}'
+    elif ws_msg["channel"] == "user":
+        return "userEvents"
+    elif ws_msg["channel"] == "userFills":
+        return f'userFills:{ws_msg["data"]["user"].lower()}'
+    elif ws_msg["channel"] == "candle":
+        return f'candle:{ws_msg["data"]["s"].lower()},{ws_msg["data"]["i"]}'
+    elif ws_msg["channel"] == "orderUpdates":
+        return "orderUpdates"
+    elif ws_msg["channel"] == "userFundings":
+        return f'userFundings:{ws_msg["data"]["user"].lower()}'
+    elif ws_msg["channel"] == "userNonFundingLedgerUpdates":
+        return f'userNonFundingLedgerUpdates:{ws_msg["data"]["user"].lower()}'
+    elif ws_msg["channel"] == "webData2":
+        return f'webData2:{ws_msg["data"]["user"].lower()}'
+    elif ws_msg["channel"] == "bbo":
+        return f'bbo:{ws_msg["data"]["coin"].lower()}'
+    elif ws_msg["channel"] == "activeAssetCtx" or ws_msg["channel"] == "activeSpotAssetCtx":
+        return f'activeAssetCtx:{ws_msg["data"]["coin"].lower()}'
+    elif ws_msg["channel"] == "activeAssetData":
+        return f'activeAssetData:{ws_msg["data"]["coin"].lower()},{ws_msg["data"]["user"].lower()}'
+    elif ws_msg["channel"] == "clearinghouseState":
+        return f"clearinghouseState:{ws_msg["data"]["dex"].lower()}"
+    elif ws_msg["channel"] == "openOrders":
+        return f"openOrders:{ws_msg["data"]["dex"].lower()}"
+
+
+def legacy_on_message(active_subscriptions, message):
+    """基线：改用分发表之前的on_message分发路径"""
+    if message == "Websocket connection established.":
+        return
+    ws_msg = json.loads(message)
+    identifier = ws_msg_to_identifier(ws_msg)
+    if identifier == "pong":
+        return
+    if identifier is None:
+        return
+    active_subscriptions = active_subscriptions[identifier]
+    if len(active_subscriptions) == 0:
+        return
+    for active_subscription in active_subscriptions:
+        active_subscription.callback(ws_msg)
+
+
+def measure(func, messages):
+    """取REPEAT次中的最好成绩，降低调度抖动影响"""
+    best = 0.0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for message in messages:
+                func(message)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(messages) * ROUNDS / elapsed)
+    return best
+
+
+def main():
+    coins = [f"COIN{index}" for index in range(COIN_COUNT)] + ["xyz:NVDA", "@107"]
+    messages = build_frames(coins)
+    subscriptions = build_subscriptions(coins)
+
+    def callback(ws_msg):
+        pass
+
+    legacy_subscriptions = defaultdict(list)
+    for subscription_id, subscription in enumerate(subscriptions):
+        identifier = subscription_to_identifier(subscription)
+        legacy_subscriptions[identifier].append(ActiveSubscription(callback, subscription_id))
+
+    manager = WebsocketManager(MAINNET_API_URL, async_dispatch=False)
+    for subscription in subscriptions:
+        manager.subscribe(subscription, callback)
+    # 未连接时订阅进入队列，这里直接注册分发表
+    for subscription, active_subscription in manager.queued_subscriptions:
+        manager.active_subscriptions[manager._register_key(subscription)].append(active_subscription)
+
+    before = measure(lambda message: legacy_on_message(legacy_subscriptions, message), messages)
+    after = measure(lambda message: manager.on_message(None, message), messages)
+    print(f"frames: {len(messages)} x {ROUNDS}, best of {REPEAT}")
+    print(f"before (if/elif identifier): {before:,.0f} msg/s")
+    print(f"after  (dispatch table):     {after:,.0f} msg/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
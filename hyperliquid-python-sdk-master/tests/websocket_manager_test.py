@@ -0,0 +1,125 @@
+import threading
+import time
+
+from hyperliquid.utils.constants import MAINNET_API_URL
+from hyperliquid.websocket_manager import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_OLDEST,
+    ChannelQueue,
+    WebsocketManager,
+    subscription_to_key,
+)
+
+
+def build_manager(subscriptions, received):
+    manager = WebsocketManager(MAINNET_API_URL, async_dispatch=False)
+    for subscription in subscriptions:
+        manager.subscribe(subscription, received.append)
+    for subscription, active_subscription in manager.queued_subscriptions:
+        manager.active_subscriptions[manager._register_key(subscription)].append(active_subscription)
+    return manager
+
+
+def test_subscription_to_key():
+    assert subscription_to_key({"type": "l2Book", "coin": "BTC"}) == ("l2Book", "btc")
+    assert subscription_to_key({"type": "candle", "coin": "BTC", "interval": "1M"}) == ("candle", "btc,1M")
+    assert subscription_to_key({"type": "orderUpdates", "user": "0xABC"}) == ("orderUpdates", "")
+    assert subscription_to_key({"type": "clearinghouseState", "user": "0xABC", "dex": "xyz"}) == (
+        "clearinghouseState",
+        "xyz",
+    )
+
+
+def test_on_message_dispatches_by_channel_and_coin():
+    received = []
+    manager = build_manager(
+        [
+            {"type": "l2Book", "coin": "xyz:NVDA"},
+            {"type": "trades", "coin": "BTC"},
+            {"type": "activeAssetCtx", "coin": "@107"},
+            {"type": "userFills", "user": "0xAbC"},
+        ],
+        received,
+    )
+    manager.on_message(None, '{"channel": "l2Book", "data": {"coin": "xyz:NVDA", "levels": [[], []], "time": 0}}')
+    manager.on_message(None, '{"channel": "trades", "data": [{"coin": "BTC", "px": "1"}]}')
+    manager.on_message(None, '{"channel": "activeSpotAssetCtx", "data": {"coin": "@107", "ctx": {}}}')
+    manager.on_message(None, '{"channel": "userFills", "data": {"user": "0xabc", "fills": []}}')
+    manager.on_message(None, '{"channel": "pong"}')
+    manager.on_message(None, '{"channel": "trades", "data": []}')
+    assert [ws_msg["channel"] for ws_msg in received] == ["l2Book", "trades", "activeSpotAssetCtx", "userFills"]
+
+
+def test_channel_queue_drop_oldest():
+    queue = ChannelQueue("market", 2, OVERFLOW_DROP_OLDEST)
+    stop_event = threading.Event()
+    for item in range(3):
+        queue.put(item, stop_event)
+    assert queue.get(0) == 1
+    assert queue.get(0) == 2
+    assert queue.get(0) is None
+    stats = queue.get_stats()
+    assert stats["dropped"] == 1
+    assert stats["max_depth"] == 2
+
+
+def test_channel_queue_block_never_drops():
+    queue = ChannelQueue("private", 1, OVERFLOW_BLOCK)
+    stop_event = threading.Event()
+    queue.put(0, stop_event)
+    producer = threading.Thread(target=queue.put, args=(1, stop_event))
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive()
+    assert queue.get(0) == 0
+    producer.join(1)
+    assert queue.get(0) == 1
+    assert queue.get_stats()["dropped"] == 0
+    assert queue.get_stats()["blocked"] == 1
+
+
+def test_async_dispatch_keeps_private_order():
+    received = []
+    manager = WebsocketManager(MAINNET_API_URL)
+    try:
+        manager.subscribe({"type": "orderUpdates", "user": "0xabc"}, received.append)
+        for subscription, active_subscription in manager.queued_subscriptions:
+            manager.active_subscriptions[manager._register_key(subscription)].append(active_subscription)
+        for index in range(100):
+            manager.on_message(None, '{"channel": "orderUpdates", "data": [%d]}' % index)
+        deadline = time.time() + 2
+        while len(received) < 100 and time.time() < deadline:
+            time.sleep(0.01)
+        assert [ws_msg["data"][0] for ws_msg in received] == list(range(100))
+        assert manager.get_queue_stats()["private"]["processed"] == 100
+    finally:
+        manager.stop()
+
+
+def test_partial_queue_config_keeps_default_queues():
+    manager = WebsocketManager(MAINNET_API_URL, queue_config={"market": (5, OVERFLOW_BLOCK)})
+    try:
+        assert set(manager.channel_queues) == {"market", "private"}
+        assert manager.channel_queues["market"].overflow == OVERFLOW_BLOCK
+        assert manager.channel_queues["private"].overflow == OVERFLOW_BLOCK
+        assert manager.channel_queues["private"].capacity == 10000
+    finally:
+        manager.stop()
+
+
+def test_active_asset_data_uses_private_queue():
+    received = []
+    manager = WebsocketManager(MAINNET_API_URL)
+    try:
+        manager.subscribe({"type": "activeAssetData", "coin": "BTC", "user": "0xAbC"}, received.append)
+        for subscription, active_subscription in manager.queued_subscriptions:
+            manager.active_subscriptions[manager._register_key(subscription)].append(active_subscription)
+        manager.on_message(None, '{"channel": "activeAssetData", "data": {"coin": "BTC", "user": "0xAbC"}}')
+        deadline = time.time() + 2
+        while not received and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(received) == 1
+        assert manager.get_queue_stats()["private"]["processed"] == 1
+        assert manager.get_queue_stats()["market"]["processed"] == 0
+    finally:
+        manager.stop()
@@ -1 +1,2 @@
-from .hyperliquid_gateway import HyperliquidGateway
+from .hyperliquid_gateway import HyperliquidGateway, ModifyRequest
+from .tick_board import TickBoard
@@ -0,0 +1,109 @@
+import os
+import re
+from pathlib import Path
+from threading import Lock
+from typing import List, Tuple
+
+import numpy as np
+
+from .history_engine import CANDLE_DTYPE, merge_candles
+
+# 缓存文件格式版本，字段变更时递增，版本不一致的缓存文件直接丢弃
+CANDLE_CACHE_VERSION = 1
+# ----------------------------------------------------------------------------------------------------
+def add_range(ranges: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    把[start, end]合并到已覆盖区间列表，相邻或重叠区间合并为一个
+    """
+    merged: List[Tuple[int, int]] = []
+    for range_start, range_end in sorted(ranges + [(start, end)]):
+        if merged and range_start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+# ----------------------------------------------------------------------------------------------------
+def subtract_ranges(start: int, end: int, ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    返回[start, end]中未被已覆盖区间包含的部分
+    """
+    missing: List[Tuple[int, int]] = []
+    for range_start, range_end in sorted(ranges):
+        if range_end < start:
+            continue
+        if range_start > end:
+            break
+        if range_start > start:
+            missing.append((start, range_start - 1))
+        start = max(start, range_end + 1)
+    if start <= end:
+        missing.append((start, end))
+    return missing
+# ----------------------------------------------------------------------------------------------------
+class CandleCache:
+    """
+    本地列式K线缓存
+    * 每个币种和K线周期一个npz文件，保存CANDLE_DTYPE列式K线和已完整下载的时间区间
+    * 已覆盖区间只包含已走完的K线，未走完的K线每次重新下载
+    * 重复或重叠的历史数据请求只下载未覆盖的区间
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, folder: Path) -> None:
+        """
+        构造函数
+        """
+        self.folder = folder
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+    # ----------------------------------------------------------------------------------------------------
+    def get_path(self, coin: str, interval: str) -> Path:
+        """
+        获取缓存文件路径，第三方交易所和现货币种名称中的特殊字符替换为下划线
+        """
+        return self.folder.joinpath(f"{re.sub(r'[^0-9A-Za-z]', '_', coin)}_{interval}.npz")
+    # ----------------------------------------------------------------------------------------------------
+    def read(self, coin: str, interval: str) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """
+        读取缓存的列式K线和已覆盖区间，缓存不存在或版本不一致时返回空数据
+        """
+        path = self.get_path(coin, interval)
+        if not path.exists():
+            return np.empty(0, dtype=CANDLE_DTYPE), []
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != CANDLE_CACHE_VERSION or data["candles"].dtype != CANDLE_DTYPE:
+                    return np.empty(0, dtype=CANDLE_DTYPE), []
+                return data["candles"], [tuple(item) for item in data["ranges"].tolist()]
+        except (OSError, ValueError, KeyError):
+            return np.empty(0, dtype=CANDLE_DTYPE), []
+    # ----------------------------------------------------------------------------------------------------
+    def query(self, coin: str, interval: str, start: int, end: int) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """
+        查询[start, end]内的缓存K线和需要下载的区间
+        """
+        with self.lock:
+            candles, ranges = self.read(coin, interval)
+        missing = subtract_ranges(start, end, ranges)
+        times = candles["t"]
+        cached = candles[(times >= start) & (times <= end)]
+        return cached, missing
+    # ----------------------------------------------------------------------------------------------------
+    def update(self, coin: str, interval: str, candles: np.ndarray, start: int, end: int) -> None:
+        """
+        合并新下载的K线并把[start, end]标记为已覆盖，end之后的未走完K线只保存不标记
+        """
+        with self.lock:
+            cached, ranges = self.read(coin, interval)
+            if start <= end:
+                ranges = add_range(ranges, start, end)
+            candles = merge_candles([cached, candles])
+            path = self.get_path(coin, interval)
+            temp_path = path.with_suffix(".tmp.npz")
+            np.savez(
+                temp_path,
+                version=np.int64(CANDLE_CACHE_VERSION),
+                candles=candles,
+                ranges=np.array(ranges, dtype=np.int64).reshape(-1, 2),
+            )
+            # 写入完成后替换，避免进程中断留下不完整的缓存文件
+            os.replace(temp_path, path)
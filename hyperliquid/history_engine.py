@@ -0,0 +1,477 @@
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from threading import Event, Lock
+from time import monotonic, sleep, time
+from typing import Any, Callable, Dict, Iterator, List
+
+import numpy as np
+
+from vnpy.trader.constant import Interval
+from vnpy.trader.object import BarData, HistoryRequest
+from vnpy.trader.utility import TZ_INFO, get_local_datetime
+
+# 交易所K线周期:K线毫秒数
+CANDLE_INTERVAL_MS = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "2h": 2 * 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "8h": 8 * 60 * 60 * 1000,
+    "12h": 12 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+}
+# vnpy K线周期:交易所K线周期
+INTERVAL_VT2HYPERLIQUID = {
+    Interval.MINUTE: "1m",
+    Interval.HOUR: "1h",
+    Interval.DAILY: "1d",
+}
+INTERVAL_HYPERLIQUID2VT = {v: k for k, v in INTERVAL_VT2HYPERLIQUID.items()}
+# candleSnapshot请求基础权重，返回每60条K线额外增加1权重
+CANDLE_BASE_WEIGHT = 20
+CANDLE_ITEMS_PER_WEIGHT = 60
+# 单个分片请求失败(返回非列表)时的重试次数
+MAX_SLICE_RETRY = 2
+# candleSnapshot列式K线，t为K线开始时间(毫秒)，n为成交笔数
+CANDLE_DTYPE = np.dtype(
+    [
+        ("t", np.int64),
+        ("o", np.float64),
+        ("h", np.float64),
+        ("l", np.float64),
+        ("c", np.float64),
+        ("v", np.float64),
+        ("n", np.int64),
+    ]
+)
+# ----------------------------------------------------------------------------------------------------
+def parse_candles(data: list) -> np.ndarray:
+    """
+    一次遍历把candleSnapshot回报转换为列式K线，价格和成交量字符串由numpy直接转换为float
+    """
+    return np.array(
+        [(raw["t"], raw["o"], raw["h"], raw["l"], raw["c"], raw["v"], raw["n"]) for raw in data],
+        dtype=CANDLE_DTYPE,
+    )
+# ----------------------------------------------------------------------------------------------------
+def merge_candles(chunks: List[np.ndarray]) -> np.ndarray:
+    """
+    合并多个分片的K线并按开始时间排序去重，开始时间相同时保留后面分片的K线
+    """
+    if not chunks:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    candles = np.concatenate(chunks)
+    candles = candles[np.argsort(candles["t"], kind="stable")]
+    times = candles["t"]
+    keep = np.append(times[1:] != times[:-1], True)
+    return candles[keep]
+# ----------------------------------------------------------------------------------------------------
+def candles_to_bars(candles: np.ndarray, req: HistoryRequest, gateway_name: str) -> Iterator[BarData]:
+    """
+    按需把列式K线转换为BarData
+    """
+    for t, open_price, high_price, low_price, close_price, volume in zip(
+        candles["t"].tolist(),
+        candles["o"].tolist(),
+        candles["h"].tolist(),
+        candles["l"].tolist(),
+        candles["c"].tolist(),
+        candles["v"].tolist(),
+    ):
+        yield BarData(
+            symbol=req.symbol,
+            exchange=req.exchange,
+            datetime=get_local_datetime(t),
+            interval=req.interval,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=close_price,
+            volume=volume,
+            gateway_name=gateway_name,
+        )
+# ----------------------------------------------------------------------------------------------------
+def candle_weight(bars: int) -> float:
+    """
+    估算candleSnapshot请求权重
+    """
+    return CANDLE_BASE_WEIGHT + ceil(bars / CANDLE_ITEMS_PER_WEIGHT)
+# ----------------------------------------------------------------------------------------------------
+def split_window(start_ms: int, end_ms: int, slice_ms: int) -> List[tuple[int, int]]:
+    """
+    把[start_ms, end_ms]切分为首尾相接的分片，相邻分片不重叠
+    """
+    slices = []
+    while start_ms <= end_ms:
+        slice_end = min(start_ms + slice_ms - 1, end_ms)
+        slices.append((start_ms, slice_end))
+        start_ms = slice_end + 1
+    return slices
+# ----------------------------------------------------------------------------------------------------
+class RateBudget:
+    """
+    全局请求权重预算(令牌桶)
+    * 所有下载线程共用，按每分钟权重上限匀速补充，最多积累10秒的权重用于突发
+    * 权重不足时预占权重后在锁外等待，先到先得
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, weight_per_minute: float) -> None:
+        """
+        构造函数
+        """
+        self.rate = weight_per_minute / 60
+        self.capacity = max(weight_per_minute / 6, CANDLE_BASE_WEIGHT)
+        self.tokens = self.capacity
+        self.last_time = monotonic()
+        self.lock = Lock()
+    # ----------------------------------------------------------------------------------------------------
+    def acquire(self, weight: float) -> float:
+        """
+        获取请求权重，返回等待秒数
+        """
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            self.tokens -= weight
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait_time > 0:
+            sleep(wait_time)
+        return wait_time
+# ----------------------------------------------------------------------------------------------------
+class HistoryJob:
+    """
+    单个合约的历史数据下载任务
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, req: HistoryRequest, coin: str, interval: str) -> None:
+        """
+        构造函数
+        """
+        self.req = req
+        self.coin = coin
+        self.interval = interval
+        self.bar_ms = CANDLE_INTERVAL_MS[interval]
+        # 本次下载的时间区间(毫秒)
+        self.window: tuple[int, int] = (0, -1)
+        self.slices: List[tuple[int, int]] = []
+        self.pending = 0
+        # 所有重试都失败的分片数量和区间，有失败分片时不写入数据库，也不更新本地缓存的已覆盖区间
+        self.failed = 0
+        self.failed_slices: List[tuple[int, int]] = []
+        self.cached_bars = 0
+        # 各分片的列式K线，全部分片完成后合并去重到candles
+        self.chunks: List[np.ndarray] = []
+        self.candles: np.ndarray = np.empty(0, dtype=CANDLE_DTYPE)
+        self.requests = 0
+        self.errors = 0
+        self.status = "running"
+        self.start_time = monotonic()
+        self.end_time = 0.0
+        self.done = Event()
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> dict:
+        """
+        获取下载进度和吞吐量
+        """
+        elapsed = (self.end_time or monotonic()) - self.start_time
+        bars = len(self.candles) if self.done.is_set() else sum(len(chunk) for chunk in self.chunks)
+        return {
+            "status": self.status,
+            "interval": self.interval,
+            "slices": len(self.slices),
+            "done_slices": len(self.slices) - self.pending,
+            "requests": self.requests,
+            "errors": self.errors,
+            "bars": bars,
+            "cached_bars": self.cached_bars,
+            "elapsed": round(elapsed, 3),
+            "bars_per_second": round(bars / elapsed, 1) if elapsed else 0.0,
+        }
+    # ----------------------------------------------------------------------------------------------------
+    def get_bars(self, gateway_name: str) -> List[BarData]:
+        """
+        把下载结果转换为BarData列表
+        """
+        return list(candles_to_bars(self.candles, self.req, gateway_name))
+# ----------------------------------------------------------------------------------------------------
+class HistoryEngine:
+    """
+    后台历史数据下载引擎
+    * 每个合约的请求区间按slice_bars根K线切分为分片，所有合约的分片在有界线程池中并发下载
+    * 所有请求共用一个按权重计算的全局令牌桶，避免批量回补触发交易所IP限频
+    * 分片回报直接解析为列式K线，同一合约所有分片完成后按K线开始时间合并去重，列式数据一次交给批量写入函数
+    * 增量模式从数据库最新K线续传，已是最新的合约直接跳过，停机超过请求窗口时补齐整个缺口(最多max_bars根K线)
+    * 下载失败或写入出错的任务记录缺口起始时间，下次增量续传从缺口重新下载，完整写入后清除
+    * 支持交易所1m到1d的K线周期，启用本地缓存时已缓存的区间直接从缓存读取，只下载未覆盖的区间
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(
+        self,
+        gateway_name: str,
+        candles_snapshot: Callable[[str, str, int, int], Any],
+        save_candles: Callable[[HistoryRequest, np.ndarray], None],
+        load_newest_bar: Callable[[HistoryRequest], BarData | None],
+        write_log: Callable[[str], None],
+        workers: int,
+        weight_per_minute: float,
+        slice_bars: int,
+        max_bars: int,
+        cache: "CandleCache | None" = None,
+    ) -> None:
+        """
+        构造函数
+        """
+        self.gateway_name = gateway_name
+        self.candles_snapshot = candles_snapshot
+        self.save_candles = save_candles
+        self.load_newest_bar = load_newest_bar
+        self.write_log = write_log
+        self.slice_bars = slice_bars
+        self.max_bars = max_bars
+        self.cache = cache
+        self.budget = RateBudget(weight_per_minute)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="HyperliquidHistory")
+        self.lock = Lock()
+        # vt_symbol:最近一次下载任务
+        self.jobs: Dict[str, HistoryJob] = {}
+        # (vt_symbol, K线周期):下载失败或写入出错任务的最早起始时间，增量续传时从这里重新下载补齐缺口
+        self.gaps: Dict[tuple[str, str], int] = {}
+        self.budget_wait = 0.0
+    # ----------------------------------------------------------------------------------------------------
+    def submit(self, req: HistoryRequest, coin: str, incremental: bool = False, interval: str = "") -> HistoryJob | None:
+        """
+        提交合约下载任务，coin为交易所K线接口使用的币种名称，incremental为True时从数据库最新K线续传
+        interval为交易所K线周期，为空时按req.interval转换，不支持的周期返回None
+        """
+        interval = interval or INTERVAL_VT2HYPERLIQUID.get(req.interval, "")
+        if interval not in CANDLE_INTERVAL_MS:
+            self.write_log(f"合约：{req.vt_symbol}不支持K线周期：{req.interval}")
+            return None
+        job = HistoryJob(req, coin, interval)
+        with self.lock:
+            self.jobs[req.vt_symbol] = job
+        if incremental:
+            # 查询数据库在下载线程执行，不阻塞调用线程
+            try:
+                self.executor.submit(self.resume, job)
+            except RuntimeError:
+                self.cancel(job)
+        else:
+            self.schedule(job, int(req.start.timestamp() * 1000))
+        return job
+    # ----------------------------------------------------------------------------------------------------
+    def resume(self, job: HistoryJob) -> None:
+        """
+        根据数据库最新K线确定增量下载的起始时间，数据库没有数据时使用请求的起始时间
+        之前的任务没有完整写入时从缺口起始时间重新下载
+        """
+        req = job.req
+        key = (req.vt_symbol, job.interval)
+        start_ms = int(req.start.timestamp() * 1000)
+        end_ms = int(req.end.timestamp() * 1000)
+        with self.lock:
+            gap_ms = self.gaps.get(key)
+        try:
+            bar = self.load_newest_bar(req)
+        except Exception as ex:
+            bar = None
+            self.write_log(f"合约：{req.vt_symbol}查询数据库最新K线出错，错误信息：{ex}")
+        if bar:
+            newest = bar.datetime if bar.datetime.tzinfo else bar.datetime.replace(tzinfo=TZ_INFO)
+            newest_ms = int(newest.timestamp() * 1000)
+            # 最新K线已覆盖请求终止时间且没有未补齐的缺口
+            if newest_ms + job.bar_ms > end_ms and gap_ms is None:
+                job.status = "current"
+                job.end_time = monotonic()
+                job.done.set()
+                return
+            # 从最新K线重新下载，覆盖写入时未走完的K线
+            start_ms = max(newest_ms, end_ms - (self.max_bars - 1) * job.bar_ms)
+            if gap_ms is not None and gap_ms < start_ms:
+                limit_ms = end_ms - (self.max_bars - 1) * job.bar_ms
+                if gap_ms < limit_ms:
+                    self.write_log(
+                        f"合约：{req.vt_symbol}历史数据缺口起始时间{get_local_datetime(gap_ms)}超过单次下载上限，"
+                        f"从{get_local_datetime(limit_ms)}开始补齐"
+                    )
+                    gap_ms = limit_ms
+                    with self.lock:
+                        self.gaps[key] = gap_ms
+                start_ms = gap_ms
+        self.schedule(job, start_ms)
+    # ----------------------------------------------------------------------------------------------------
+    def schedule(self, job: HistoryJob, start_ms: int) -> None:
+        """
+        切分下载区间并提交分片，启用本地缓存时只下载缓存未覆盖的区间
+        """
+        start_ms = start_ms // job.bar_ms * job.bar_ms
+        end_ms = int(job.req.end.timestamp() * 1000)
+        job.window = (start_ms, end_ms)
+        missing = [(start_ms, end_ms)] if start_ms <= end_ms else []
+        if self.cache and missing:
+            try:
+                cached, missing = self.cache.query(job.coin, job.interval, start_ms, end_ms)
+            except Exception as ex:
+                self.write_log(f"合约：{job.req.vt_symbol}读取本地K线缓存出错，错误信息：{ex}")
+            else:
+                job.chunks.append(cached)
+                job.cached_bars = len(cached)
+        slices = []
+        for missing_start, missing_end in missing:
+            slices.extend(split_window(missing_start, missing_end, self.slice_bars * job.bar_ms))
+        with self.lock:
+            job.slices = slices
+            job.pending = len(slices)
+        if not slices:
+            self.finish(job)
+            return
+        try:
+            for start, end in slices:
+                self.executor.submit(self.download_slice, job, start, end)
+        except RuntimeError:
+            # 线程池已停止
+            self.cancel(job)
+    # ----------------------------------------------------------------------------------------------------
+    def download_slice(self, job: HistoryJob, start_ms: int, end_ms: int) -> None:
+        """
+        下载单个分片，请求异常或返回非列表时重试
+        """
+        chunk = None
+        error: Any = None
+        weight = candle_weight((end_ms - start_ms) // job.bar_ms + 1)
+        for _ in range(MAX_SLICE_RETRY + 1):
+            wait_time = self.budget.acquire(weight)
+            try:
+                data = self.candles_snapshot(job.coin, job.interval, start_ms, end_ms)
+                chunk = parse_candles(data) if isinstance(data, list) else None
+                error = None if chunk is not None else data
+            except Exception as ex:
+                error = ex
+            with self.lock:
+                self.budget_wait += wait_time
+                job.requests += 1
+                if chunk is not None:
+                    job.chunks.append(chunk)
+                    break
+                job.errors += 1
+        with self.lock:
+            if chunk is None:
+                job.failed += 1
+                job.failed_slices.append((start_ms, end_ms))
+            job.pending -= 1
+            finished = job.pending == 0
+        if chunk is None:
+            self.write_log(
+                f"合约：{job.req.vt_symbol}历史数据分片{get_local_datetime(start_ms)}至{get_local_datetime(end_ms)}"
+                f"下载失败，错误信息：{error}"
+            )
+        if finished:
+            self.finish(job)
+    # ----------------------------------------------------------------------------------------------------
+    def finish(self, job: HistoryJob) -> None:
+        """
+        合并去重分片数据并批量写入
+        """
+        if job.done.is_set():
+            return
+        req = job.req
+        job.candles = merge_candles(job.chunks)
+        job.chunks = []
+        job.status = "finished"
+        if self.cache and job.slices:
+            self.update_cache(job)
+        if job.failed:
+            # 部分分片失败时不写入数据库，避免数据库中间留下缺口，下次同步重新下载整个区间
+            job.status = "error"
+            self.write_log(f"合约：{req.vt_symbol}有{job.failed}个历史数据分片下载失败，本次数据不写入数据库")
+        elif len(job.candles):
+            try:
+                self.save_candles(req, job.candles)
+            except Exception as err:
+                job.status = "error"
+                self.write_log(f"获取历史数据出错，错误信息：{err}")
+        self.update_gap(job)
+        job.end_time = monotonic()
+        job.done.set()
+        stats = job.get_stats()
+        if job.failed:
+            return
+        if len(job.candles):
+            start = get_local_datetime(int(job.candles["t"][0]))
+            end = get_local_datetime(int(job.candles["t"][-1]))
+            msg = (
+                f"载入{req.vt_symbol}:bar数据，开始时间：{start}，结束时间：{end}，"
+                f"数据量：{stats['bars']}，请求数：{stats['requests']}，耗时:{stats['elapsed']}秒"
+            )
+        else:
+            msg = f"未获取到合约：{req.vt_symbol}历史数据"
+        self.write_log(msg)
+    # ----------------------------------------------------------------------------------------------------
+    def update_gap(self, job: HistoryJob) -> None:
+        """
+        任务出错时记录缺口起始时间，完整写入且覆盖缺口时清除
+        """
+        key = (job.req.vt_symbol, job.interval)
+        start_ms = job.window[0]
+        with self.lock:
+            gap_ms = self.gaps.get(key)
+            if job.status == "error":
+                self.gaps[key] = start_ms if gap_ms is None else min(gap_ms, start_ms)
+            elif gap_ms is not None and start_ms <= gap_ms:
+                self.gaps.pop(key)
+    # ----------------------------------------------------------------------------------------------------
+    def update_cache(self, job: HistoryJob) -> None:
+        """
+        下载的K线写入本地缓存，只有全部分片成功时才把已走完的K线区间标记为已覆盖
+        """
+        start_ms, end_ms = job.window
+        if job.failed:
+            end_ms = start_ms - 1
+        else:
+            # 当前未走完K线开始时间之前的K线都已走完
+            end_ms = min(end_ms, int(time() * 1000) // job.bar_ms * job.bar_ms - 1)
+        try:
+            self.cache.update(job.coin, job.interval, job.candles, start_ms, end_ms)
+        except Exception as ex:
+            self.write_log(f"合约：{job.req.vt_symbol}写入本地K线缓存出错，错误信息：{ex}")
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> dict:
+        """
+        获取每个合约的下载进度和整体吞吐量
+        """
+        with self.lock:
+            jobs = {vt_symbol: job.get_stats() for vt_symbol, job in self.jobs.items()}
+            budget_wait = self.budget_wait
+        return {
+            "jobs": jobs,
+            "running": sum(1 for stats in jobs.values() if stats["status"] == "running"),
+            "current": sum(1 for stats in jobs.values() if stats["status"] == "current"),
+            "requests": sum(stats["requests"] for stats in jobs.values()),
+            "bars": sum(stats["bars"] for stats in jobs.values()),
+            "budget_wait": round(budget_wait, 3),
+        }
+    # ----------------------------------------------------------------------------------------------------
+    def cancel(self, job: HistoryJob) -> None:
+        """
+        结束未完成的下载任务，唤醒等待结果的线程
+        """
+        if job.done.is_set():
+            return
+        job.status = "cancelled"
+        job.end_time = monotonic()
+        job.done.set()
+    # ----------------------------------------------------------------------------------------------------
+    def stop(self) -> None:
+        """
+        停止下载线程池，未开始执行的分片直接丢弃，未完成的下载任务标记为已取消
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            self.cancel(job)
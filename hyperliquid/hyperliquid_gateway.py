@@ -3,21 +3,27 @@ import csv
 import hashlib
 import hmac
 import json
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import copy
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from inspect import signature
 from pathlib import Path
-from threading import Lock
-from time import sleep, time
-from typing import Any, Dict, List
+from threading import BoundedSemaphore, Event as ThreadEvent, Lock, Thread
+from time import monotonic, time
+from typing import Any, Callable, Dict, List
 from urllib.parse import urlencode
 from hyperliquid.info import Info,Cloid
 from hyperliquid.utils import constants
 from hyperliquid.exchange import Exchange as HyperliquidExchange
+from hyperliquid.transport import HttpTransport
+from hyperliquid.utils.meta_cache import is_valid_meta, shared_meta_cache
 import eth_account
 from eth_account.signers.local import LocalAccount
+import numpy as np
 
 from peewee import chunked
 from vnpy.api.rest import Request, RestClient
@@ -44,10 +50,15 @@ from vnpy.trader.object import (
     TradeData,
 )
 from vnpy.trader.setting import hyperliquid_account_main  # 导入账户字典
+from .candle_cache import CandleCache
+from .history_engine import INTERVAL_HYPERLIQUID2VT, HistoryEngine, candles_to_bars
+from .meta_snapshot import MetaSnapshot
+from .tick_board import TickBoard
 from vnpy.trader.utility import (
     TZ_INFO,
     GetFilePath,
     extract_vt_symbol,
+    get_folder_path,
     get_symbol_mark,
     get_local_datetime,
     get_uuid,
@@ -124,8 +135,58 @@ OPPOSITE_DIRECTION = {
 class Security(Enum):
     NONE: int = 0
     SIGNED: int = 1
+# ----------------------------------------------------------------------------------------------------
+@dataclass
+class ModifyRequest:
+    """
+    改单请求，改单后委托单号(cloid)不变，volume为改单后的委托数量
+    """
+    orderid: str
+    price: float
+    volume: float
 SPOT_INDEX_NAME_MAP = {}
 PRICE_DECIMAL_MAP = {}
+# TickData五档深度字段名，预先生成避免逐条推送格式化字符串
+DEPTH_LEVELS = 5
+BID_PRICE_FIELDS = tuple(f"bid_price_{index}" for index in range(1, DEPTH_LEVELS + 1))
+BID_VOLUME_FIELDS = tuple(f"bid_volume_{index}" for index in range(1, DEPTH_LEVELS + 1))
+ASK_PRICE_FIELDS = tuple(f"ask_price_{index}" for index in range(1, DEPTH_LEVELS + 1))
+ASK_VOLUME_FIELDS = tuple(f"ask_volume_{index}" for index in range(1, DEPTH_LEVELS + 1))
+# 列式K线批量写入数据库时每批转换的BarData数量
+BAR_WRITE_CHUNK = 10000
+# 实时K线走完事件，vnpy.trader.event没有定义K线事件
+EVENT_BAR = "eBar."
+# 深度行情合并推送busy模式检测事件引擎积压的标记事件
+EVENT_CONFLATION_MARK = "eConflationMark"
+# 启动就绪阶段：永续合约信息、现货合约信息、websocket连接
+READY_CONTRACTS = "contracts"
+READY_SPOT = "spot"
+READY_WS = "ws"
+READY_STAGES = (READY_CONTRACTS, READY_SPOT, READY_WS)
+# ----------------------------------------------------------------------------------------------------
+def update_tick_depth(tick: TickData, bids: list, asks: list) -> None:
+    """
+    写入tick买卖五档深度，深度不足五档时剩余档位置0
+    TickData为普通dataclass，直接写__dict__省去setattr查找
+    """
+    values = tick.__dict__
+    bid_count = min(len(bids), DEPTH_LEVELS)
+    for index in range(bid_count):
+        level = bids[index]
+        values[BID_PRICE_FIELDS[index]] = float(level["px"])
+        values[BID_VOLUME_FIELDS[index]] = float(level["sz"])
+    for index in range(bid_count, DEPTH_LEVELS):
+        values[BID_PRICE_FIELDS[index]] = 0
+        values[BID_VOLUME_FIELDS[index]] = 0
+
+    ask_count = min(len(asks), DEPTH_LEVELS)
+    for index in range(ask_count):
+        level = asks[index]
+        values[ASK_PRICE_FIELDS[index]] = float(level["px"])
+        values[ASK_VOLUME_FIELDS[index]] = float(level["sz"])
+    for index in range(ask_count, DEPTH_LEVELS):
+        values[ASK_PRICE_FIELDS[index]] = 0
+        values[ASK_VOLUME_FIELDS[index]] = 0
 # ----------------------------------------------------------------------------------------------------
 class HyperliquidGateway(BaseGateway):
     """
@@ -152,6 +213,8 @@ class HyperliquidGateway(BaseGateway):
         """
         super().__init__(event_engine, gateway_name)
 
+        # 成交id去重，websocket成交推送和REST成交补查共用
+        self.trade_filter: TradeIdFilter = TradeIdFilter(capacity=10000, ttl=86400)
         self.ws_api: "HyperliquidWebsocketApi" = HyperliquidWebsocketApi(self)
         self.rest_api: "HyperliquidRestApi" = HyperliquidRestApi(self)
         self.orders: Dict[str, OrderData] = {}
@@ -160,6 +223,8 @@ class HyperliquidGateway(BaseGateway):
         self.recording_list = [vt_symbol for vt_symbol in self.recording_list if is_target_contract(vt_symbol, self.gateway_name)]
         # 查询历史数据合约列表
         self.history_contracts = copy(self.recording_list)
+        # 设置杠杆合约列表
+        self.leverage_contracts = copy(self.recording_list)
         # 下载历史数据状态
         self.history_status = True
         # 识别mmap发布进程状态
@@ -176,6 +241,53 @@ class HyperliquidGateway(BaseGateway):
         self.use_api_agent:bool = True
         # 是否创建代理api
         self.generate_agent_api = False
+        # l2Book和trades推送是否直接解码为结构体(安装msgspec时由msgspec解码，价格数量为float)
+        self.typed_decode: bool = False
+        # 深度行情合并推送模式，""不合并，"interval"同一合约最小推送间隔为conflation_interval秒，"busy"事件引擎积压时只推送最新深度
+        self.depth_conflation: str = ""
+        self.conflation_interval: float = 0.1
+        # 是否在本地维护全深度委托簿(最多20档)，供策略通过get_order_book计算滑点
+        self.full_depth: bool = False
+        # 共享内存tick快照板名称，mmap发布进程设置后写入，同机其他进程用TickBoard.attach读取，空字符串不启用
+        self.tick_board_name: str = ""
+        self.tick_board_capacity: int = 1024
+        # 是否异步提交委托，开启后签名和HTTP请求在提交线程池执行，send_order推送提交中委托后立即返回
+        self.async_submit: bool = True
+        # 提交线程数和在途请求上限，在途请求达到上限时新委托直接拒单
+        self.submit_workers: int = 4
+        self.submit_max_inflight: int = 64
+        # REST连接池大小，安装httpx和h2时使用HTTP/2多路复用，空闲超过http_warm_interval秒时发送保活请求
+        self.http_pool_size: int = 10
+        self.http2: bool = True
+        self.http_warm_interval: float = 30
+        self.transport: HttpTransport | None = None
+        # 按perp_dexs并发查询合约、资金持仓和活动委托的线程数，0为逐个交易所串行查询
+        self.dex_query_workers: int = 8
+        # 本地合约元数据快照文件名，启动时从快照加载合约元数据后台再校验更新，空字符串不启用
+        self.meta_snapshot_file: str = "hyperliquid_meta_snapshot.json"
+        self.meta_snapshot: MetaSnapshot | None = None
+        # 合约元数据后台校验出错或请求失败时的重试间隔(秒)和最大尝试次数
+        self.meta_revalidate_interval: float = 60
+        self.meta_revalidate_attempts: int = 5
+        # 下单、撤单和订阅等待合约信息和websocket就绪的超时时间(秒)，超时后放弃本次请求
+        self.ready_timeout: float = 30
+        self.readiness: ReadinessBarrier = ReadinessBarrier(READY_STAGES)
+        # 历史数据下载线程数、每分钟请求权重预算(交易所IP限频为1200)和单个分片K线数量
+        self.history_workers: int = 4
+        self.history_weight_per_minute: float = 600
+        self.history_slice_bars: int = 1000
+        # 增量同步历史数据，从数据库最新K线续传到当前时间，数据库没有数据时下载最近history_minutes分钟
+        # 停机后的缺口最多补齐history_max_bars根K线(交易所只保留最近5000根K线)
+        self.history_incremental: bool = True
+        self.history_minutes: int = 100
+        self.history_max_bars: int = 5000
+        # 本地列式K线缓存文件夹名称，重复请求已缓存的区间不再访问网络，空字符串不启用
+        self.history_cache_folder: str = "hyperliquid_candles"
+        # 是否订阅录制合约的实时K线(candle频道)，K线走完时推送EVENT_BAR并批量写入数据库，周期支持1m、1h和1d
+        # 超过收盘时间live_bar_close_delay秒仍未收到下一根K线推送时判定K线走完
+        self.live_bar: bool = False
+        self.live_bar_interval: str = "1m"
+        self.live_bar_close_delay: float = 2
     # ----------------------------------------------------------------------------------------------------
     def connect(self, log_account: dict = {}) -> None:
         """
@@ -199,9 +311,23 @@ class HyperliquidGateway(BaseGateway):
             vault_address = log_account["vault_address"]
         else:
             vault_address = ""
-        self.exchange_info = HyperliquidExchange(account, REST_HOST, perp_dexs=self.perp_dexs, account_address=account_address,vault_address = vault_address, timeout=60)
+        self.readiness.start()
+        # 本地快照写入元数据缓存，Info构造和合约查询直接使用快照数据
+        snapshot_loaded = False
+        if self.meta_snapshot_file:
+            self.meta_snapshot = MetaSnapshot(self.meta_snapshot_file, REST_HOST, self.perp_dexs)
+            snapshot_loaded = self.meta_snapshot.load(shared_meta_cache)
+            if snapshot_loaded:
+                self.write_log(f"交易接口：{self.gateway_name}，从本地快照加载合约元数据")
+        # exchange_info、rest_info和ws_info共用一个连接池
+        self.transport = HttpTransport(REST_HOST, self.http_pool_size, self.http2, self.http_warm_interval)
+        self.exchange_info = HyperliquidExchange(account, REST_HOST, perp_dexs=self.perp_dexs, account_address=account_address,vault_address = vault_address, timeout=60, transport=self.transport)
         self.rest_api.connect(account_address,vault_address,private_address,proxy_host,proxy_port)
         self.ws_api.connect(account_address,vault_address,private_address,proxy_host,proxy_port)
+        # 补查最近成交，避免重启期间遗漏成交
+        self.rest_api.query_trade()
+        if self.meta_snapshot:
+            Thread(target=self.rest_api.run_revalidate_meta, args=(snapshot_loaded,), daemon=True).start()
         self.init_query()
 
         if self.generate_agent_api:
@@ -230,12 +356,42 @@ class HyperliquidGateway(BaseGateway):
         """
         return self.rest_api.send_order(req)
     # ----------------------------------------------------------------------------------------------------
+    def send_orders(self, reqs: List[OrderRequest]) -> List[str]:
+        """
+        批量委托下单，一次签名和一次请求发送所有委托
+        """
+        return self.rest_api.send_orders(reqs)
+    # ----------------------------------------------------------------------------------------------------
     def cancel_order(self, req: CancelRequest) -> None:
         """
         委托撤单
         """
         self.rest_api.cancel_order(req)
     # ----------------------------------------------------------------------------------------------------
+    def modify_order(self, req: ModifyRequest) -> None:
+        """
+        委托改单
+        """
+        self.rest_api.modify_order(req)
+    # ----------------------------------------------------------------------------------------------------
+    def modify_orders(self, reqs: List[ModifyRequest]) -> None:
+        """
+        批量改单，一次签名和一次请求发送所有改单
+        """
+        self.rest_api.modify_orders(reqs)
+    # ----------------------------------------------------------------------------------------------------
+    def cancel_orders(self, reqs: List[CancelRequest]) -> None:
+        """
+        批量撤单
+        """
+        self.rest_api.cancel_orders(reqs)
+    # ----------------------------------------------------------------------------------------------------
+    def cancel_all(self, symbol: str | None = None) -> None:
+        """
+        撤销全部活动委托，symbol为None时撤销所有合约
+        """
+        self.rest_api.cancel_all(symbol)
+    # ----------------------------------------------------------------------------------------------------
     def query_account(self) -> None:
         """
         查询永续账户资金
@@ -261,40 +417,104 @@ class HyperliquidGateway(BaseGateway):
         self.orders[order.orderid] = copy(order)
         super().on_order(order)
     # ----------------------------------------------------------------------------------------------------
+    def on_bar(self, bar: BarData) -> None:
+        """
+        推送走完的实时K线
+        """
+        self.on_event(EVENT_BAR, bar)
+        self.on_event(EVENT_BAR + bar.vt_symbol, bar)
+    # ----------------------------------------------------------------------------------------------------
+    def get_live_bar(self, vt_symbol: str) -> BarData | None:
+        """
+        查询合约正在走的实时K线，需设置live_bar为True
+        """
+        if not self.ws_api.live_bars:
+            return None
+        symbol, exchange, gateway_name = extract_vt_symbol(vt_symbol)
+        return self.ws_api.live_bars.get_bar(f"{symbol}_{exchange.value}")
+    # ----------------------------------------------------------------------------------------------------
     def get_order(self, orderid: str) -> OrderData:
         """
         查询委托数据
         """
         return self.orders.get(orderid, None)
     # ----------------------------------------------------------------------------------------------------
+    def get_query_stats(self) -> dict:
+        """
+        获取按交易所并发查询的耗时统计
+        """
+        if not self.rest_api.dex_fanout:
+            return {}
+        return self.rest_api.dex_fanout.get_stats()
+    # ----------------------------------------------------------------------------------------------------
+    def get_submit_stats(self) -> dict:
+        """
+        获取异步委托提交统计，包含在途请求数、拒绝数和各类请求延迟直方图
+        """
+        if not self.rest_api.submitter:
+            return {}
+        return self.rest_api.submitter.get_stats()
+    # ----------------------------------------------------------------------------------------------------
+    def get_ready_stats(self) -> dict:
+        """
+        获取各启动阶段的就绪耗时和等待统计
+        """
+        return self.readiness.get_stats()
+    # ----------------------------------------------------------------------------------------------------
+    def wait_ready(self, stages: tuple[str, ...], action: str) -> bool:
+        """
+        等待启动阶段就绪，超时返回False并记录日志
+        """
+        if self.readiness.wait(stages, self.ready_timeout):
+            return True
+        pending = [stage for stage in stages if not self.readiness.is_ready(stage)]
+        self.write_log(f"交易接口：{self.gateway_name}，等待{pending}就绪超时({self.ready_timeout}秒)，{action}失败")
+        return False
+    # ----------------------------------------------------------------------------------------------------
+    def get_history_stats(self) -> dict:
+        """
+        获取历史数据下载进度，包含每个合约的分片进度、K线数量和吞吐量
+        """
+        if not self.rest_api.history_engine:
+            return {}
+        return self.rest_api.history_engine.get_stats()
+    # ----------------------------------------------------------------------------------------------------
+    def get_order_book(self, vt_symbol: str) -> "OrderBook | None":
+        """
+        查询本地全深度委托簿，需设置full_depth为True
+        """
+        symbol, exchange, gateway_name = extract_vt_symbol(vt_symbol)
+        return self.ws_api.order_books.get(f"{symbol}_{exchange.value}")
+    # ----------------------------------------------------------------------------------------------------
     def query_history(self, event: Event):
         """
-        查询合约历史数据
+        查询合约历史数据，所有合约一次提交给后台历史数据引擎并发下载，定时器逐个设置合约杠杆
         """
-        if len(self.history_contracts) > 0:
-            symbol, exchange, gateway_name = extract_vt_symbol(self.history_contracts.pop(0))
-            req = HistoryRequest(
-                symbol=symbol,
-                exchange=exchange,
-                interval=Interval.MINUTE,
-                start=datetime.now(TZ_INFO) - timedelta(minutes=100),
-                end=datetime.now(TZ_INFO),
-                gateway_name=self.gateway_name,
-            )
+        if self.history_contracts:
+            reqs = []
+            for vt_symbol in self.history_contracts:
+                symbol, exchange, gateway_name = extract_vt_symbol(vt_symbol)
+                req = HistoryRequest(
+                    symbol=symbol,
+                    exchange=exchange,
+                    interval=Interval.MINUTE,
+                    start=datetime.now(TZ_INFO) - timedelta(minutes=self.history_minutes),
+                    end=datetime.now(TZ_INFO),
+                    gateway_name=self.gateway_name,
+                )
+                reqs.append(req)
+            self.history_contracts = []
             # 只在mmap发布进程运行或者手动设置history_status为True时才下载历史数据
             if self.history_status:
-                self.rest_api.query_history(req)
+                self.rest_api.download_history(reqs, self.history_incremental)
+        if self.leverage_contracts:
+            symbol, exchange, gateway_name = extract_vt_symbol(self.leverage_contracts.pop(0))
             self.rest_api.set_leverage(symbol,exchange)
     # ----------------------------------------------------------------------------------------------------
     def process_timer_event(self, event) -> None:
         """
         处理定时事件
         """
-        # 删除过期trade_ids
-        trade_ids = self.ws_api.trade_ids
-        if len(trade_ids) > 200:
-            trade_ids.pop(0)
-
         # 5秒轮训一次查询
         self.count += 1
         if self.count < 5:
@@ -320,8 +540,23 @@ class HyperliquidGateway(BaseGateway):
         关闭连接
         """
         self.rest_api.stop()
+        self.rest_api.meta_revalidate_stop.set()
+        if self.rest_api.submitter:
+            self.rest_api.submitter.stop()
         self.ws_api.stop()
+        # 先断开websocket并停止分发线程，避免行情回调继续写入已关闭的共享内存
         self.ws_api.ws_info.disconnect_websocket()
+        if self.ws_api.conflator:
+            self.ws_api.conflator.stop()
+        if self.ws_api.tick_board:
+            self.ws_api.tick_board.close()
+            self.ws_api.tick_board = None
+        if self.rest_api.dex_fanout:
+            self.rest_api.dex_fanout.stop()
+        if self.rest_api.history_engine:
+            self.rest_api.history_engine.stop()
+        if self.transport:
+            self.transport.close()
 # ----------------------------------------------------------------------------------------------------
 class HyperliquidRestApi(RestClient):
     """
@@ -349,6 +584,13 @@ class HyperliquidRestApi(RestClient):
         self.spot_inited = False # 现货信息查询状态
         self.spot_symbol_name_map = {}
         self.spot_name_symbol_map = {}
+        # 异步委托提交器
+        self.submitter: OrderSubmitter | None = None
+        # 按交易所并发查询执行器
+        self.dex_fanout: DexFanout | None = None
+        self.meta_revalidate_stop: ThreadEvent = ThreadEvent()     # 停止合约元数据后台校验
+        # 历史数据下载引擎
+        self.history_engine: HistoryEngine | None = None
     # ----------------------------------------------------------------------------------------------------
     def sign(self, request: Request) -> Request:
         """
@@ -379,8 +621,25 @@ class HyperliquidRestApi(RestClient):
         # 账户字典有金库带单地址，则交易带单账户，否则走主账户
         self.trade_address = self.vault_address or self.account_address
         self.init(REST_HOST, proxy_host, proxy_port, gateway_name=self.gateway_name)
-        self.rest_info = Info(REST_HOST,perp_dexs=self.gateway.perp_dexs, skip_ws=True, timeout=60)
+        self.rest_info = Info(REST_HOST,perp_dexs=self.gateway.perp_dexs, skip_ws=True, timeout=60, transport=self.gateway.transport)
         self.start()
+        if self.gateway.async_submit and not self.submitter:
+            self.submitter = OrderSubmitter(self.gateway.write_log, self.gateway.submit_workers, self.gateway.submit_max_inflight)
+        if self.gateway.dex_query_workers > 0 and not self.dex_fanout:
+            self.dex_fanout = DexFanout(self.gateway.write_log, self.gateway.dex_query_workers)
+        if not self.history_engine:
+            self.history_engine = HistoryEngine(
+                self.gateway_name,
+                self.rest_info.candles_snapshot,
+                self.save_candles,
+                lambda req: database_manager.get_newest_bar_data(req.symbol, req.exchange, req.interval),
+                self.gateway.write_log,
+                self.gateway.history_workers,
+                self.gateway.history_weight_per_minute,
+                self.gateway.history_slice_bars,
+                self.gateway.history_max_bars,
+                CandleCache(get_folder_path(self.gateway.history_cache_folder)) if self.gateway.history_cache_folder else None,
+            )
         self.gateway.write_log(f"交易接口：{self.gateway_name}，REST API启动成功")
         # mmap发布进程和订阅进程都必须获取合约数据，有的交易所发送委托单需要合约数据
         self.query_contract()
@@ -389,9 +648,11 @@ class HyperliquidRestApi(RestClient):
         """
         查询永续账户资金
         """
-        for dex in self.gateway.perp_dexs:
-            data = self.rest_info.user_state(self.trade_address ,dex)
-            self.on_query_account(data,dex)
+        self.query_dexs(
+            "account",
+            lambda dex: self.rest_info.user_state(self.trade_address,dex),
+            self.on_query_account,
+        )
     # ----------------------------------------------------------------------------------------------------        
     def query_spot_account(self) -> None:
         """
@@ -407,18 +668,106 @@ class HyperliquidRestApi(RestClient):
         """
         查询活动委托单
         """
+        self.query_dexs(
+            "order",
+            lambda dex: self.rest_info.frontend_open_orders(self.trade_address,dex),
+            lambda data, dex: self.on_query_order(data),
+        )
+    # ----------------------------------------------------------------------------------------------------
+    def run_revalidate_meta(self, snapshot_loaded: bool) -> None:
+        """
+        后台校验合约元数据，出错或请求失败时间隔meta_revalidate_interval秒重试
+        """
+        for attempt in range(1, self.gateway.meta_revalidate_attempts + 1):
+            try:
+                if self.revalidate_meta(snapshot_loaded):
+                    return
+            except Exception as ex:
+                self.gateway.write_log(f"交易接口：{self.gateway_name}，第{attempt}次校验合约元数据出错，错误信息：{ex}")
+            if self.meta_revalidate_stop.wait(self.gateway.meta_revalidate_interval):
+                return
+        self.gateway.write_log(f"交易接口：{self.gateway_name}，合约元数据校验多次失败，继续使用本地快照")
+    # ----------------------------------------------------------------------------------------------------
+    def revalidate_meta(self, snapshot_loaded: bool) -> bool:
+        """
+        重新请求合约元数据并更新本地快照，从快照启动时推送变更合约并重建SDK合约映射，请求失败时返回False
+        """
+        if snapshot_loaded:
+            self.rest_info.meta_cache.invalidate()
+        perp_dexs = self.rest_info.perp_dexs()
+        metas: Dict[str, dict] = {}
+        self.query_dexs("meta_revalidate", self.rest_info.meta, lambda data, dex: metas.__setitem__(dex, data))
+        spot_meta = self.rest_info.spot_meta()
+        valid = (
+            is_valid_meta(perp_dexs)
+            and all(is_valid_meta(metas.get(dex)) and "universe" in metas[dex] for dex in self.gateway.perp_dexs)
+            and is_valid_meta(spot_meta)
+            and "universe" in spot_meta
+        )
+        if not valid:
+            self.gateway.write_log(f"交易接口：{self.gateway_name}，合约元数据校验请求失败")
+            return False
+        diffs = self.gateway.meta_snapshot.update(perp_dexs, metas, spot_meta)
+        # 未加载快照时启动查询的已经是最新数据
+        if not snapshot_loaded:
+            return True
+        if not diffs["perp"] and not diffs["spot"]:
+            self.gateway.write_log(f"交易接口：{self.gateway_name}，本地合约元数据快照校验一致")
+            return True
+        # 合约列表变化会改变资产编号，重建所有Info的合约映射
+        for info in (self.gateway.exchange_info.info, self.rest_info, self.gateway.ws_api.ws_info):
+            info.load_meta(perp_dexs=self.gateway.perp_dexs)
+        for dex, (added, removed, changed) in diffs["perp"].items():
+            if added or changed:
+                self.on_query_perp_contract({"universe": added + changed},dex)
+            msg = (
+                f"交易接口：{self.gateway_name}，{dex or '加密货币'}合约更新，"
+                f"新增：{[raw['name'] for raw in added]}，下架：{removed}，变更：{[raw['name'] for raw in changed]}"
+            )
+            self.gateway.write_log(msg)
+        if diffs["spot"]:
+            self.on_query_spot_contract(spot_meta)
+        return True
+    # ----------------------------------------------------------------------------------------------------
+    def query_dexs(self, name: str, request: Callable[[str], Any], callback: Callable[[Any, str], None]) -> None:
+        """
+        按perp_dexs查询所有永续交易所，回调按perp_dexs顺序执行
+        """
+        if self.dex_fanout:
+            self.dex_fanout.run(name, self.gateway.perp_dexs, request, callback)
+            return
         for dex in self.gateway.perp_dexs:
-            data = self.rest_info.frontend_open_orders(self.trade_address,dex)
-            self.on_query_order(data)
+            callback(request(dex),dex)
     # ----------------------------------------------------------------------------------------------------
-    def query_contract(self) -> None:
+    def query_trade(self) -> None:
         """
-        查询合约信息
+        补查最近成交，与websocket成交推送共用去重
         """
+        data = self.rest_info.user_fills(self.trade_address)
+        if not isinstance(data, list):
+            return
+        for raw in sorted(data, key=lambda raw: raw["time"]):
+            self.gateway.ws_api.on_fill(raw)
+    # ----------------------------------------------------------------------------------------------------
+    def query_contract(self, refresh: bool = False) -> None:
+        """
+        查询合约信息，合约元数据与exchange_info、ws_info共用进程内缓存，refresh为True时失效缓存重新请求
+        """
+        if refresh:
+            self.rest_info.meta_cache.invalidate()
         # 查询加密货币和股票代币合约信息
-        for dex in self.gateway.perp_dexs:
-            perp_data = self.rest_info.meta(dex)
-            self.on_query_perp_contract(perp_data,dex)
+        loaded_dexs = set()
+        def on_contract(data: dict, dex: str) -> None:
+            if data and "universe" in data:
+                loaded_dexs.add(dex)
+            self.on_query_perp_contract(data, dex)
+        self.query_dexs("contract", self.rest_info.meta, on_contract)
+        # 所有永续交易所合约信息都加载后才允许下单改单
+        missing_dexs = [dex or "main" for dex in self.gateway.perp_dexs if dex not in loaded_dexs]
+        if missing_dexs:
+            self.gateway.write_log(f"交易接口：{self.gateway_name}，交易所：{missing_dexs}合约信息查询失败")
+        else:
+            self.gateway.readiness.set(READY_CONTRACTS)
         spot_data = self.rest_info.spot_meta()
         self.on_query_spot_contract(spot_data)
     # ----------------------------------------------------------------------------------------------------
@@ -452,54 +801,154 @@ class HyperliquidRestApi(RestClient):
             if acquired:
                 self.order_count_lock.release()
     # ----------------------------------------------------------------------------------------------------
-    def send_order(self, req: OrderRequest) -> str:
+    def round_price(self, symbol: str, exchange: Exchange, price: float) -> float:
         """
-        委托下单
+        委托价格按5位有效数字和合约价格精度取整
+        """
+        if price > 100000:
+            return round(price)
+        return round(float(f"{price:.5g}"), PRICE_DECIMAL_MAP[f"{symbol}_{exchange.value}"])
+    # ----------------------------------------------------------------------------------------------------
+    def new_orderid(self) -> str:
+        """
+        生成本地委托单号，同时作为交易所自定义委托单id(cloid)
         """
-        # 等待合约价格精度推送完成
-        while not PRICE_DECIMAL_MAP:
-            sleep(1)
         self.count_datetime = int(datetime.now().strftime("%Y%m%d%H%M%S"))
-
-        # 生成本地委托号
         new_order_id = str(self._new_order_id()).rjust(18, '0')
-        orderid: str = "0x" + str(self.count_datetime) + new_order_id
-
+        return "0x" + str(self.count_datetime) + new_order_id
+    # ----------------------------------------------------------------------------------------------------
+    def create_order(self, req: OrderRequest) -> tuple[OrderData, dict]:
+        """
+        生成本地委托单号并推送提交中委托，返回委托数据和SDK委托请求
+        """
         # 推送提交中事件
-        order: OrderData = req.create_order_data(orderid, self.gateway_name)
+        order: OrderData = req.create_order_data(self.new_orderid(), self.gateway_name)
         self.gateway.on_order(order)
         is_buy = True if order.direction == Direction.LONG else False
         # 现货不支持reduce_only
         reduce_only = (req.offset == Offset.CLOSE and req.exchange == Exchange.HYPE)
-        if req.price > 100000:
-            price = round(req.price)
-        else:
-            price = round(float(f"{req.price:.5g}"), PRICE_DECIMAL_MAP[f"{req.symbol}_{req.exchange.value}"])
+        price = self.round_price(req.symbol, req.exchange, req.price)
         if req.exchange == Exchange.HYPESPOT:
             symbol = self.spot_symbol_name_map[req.symbol]
         else:
             symbol = req.symbol
-        data = self.gateway.exchange_info.order(symbol, is_buy, req.volume, price, {"limit": {"tif": "Gtc"}},reduce_only,cloid=Cloid(orderid))
-        self.on_send_order(data,order)
+        order_request = {
+            "coin": symbol,
+            "is_buy": is_buy,
+            "sz": req.volume,
+            "limit_px": price,
+            "order_type": {"limit": {"tif": "Gtc"}},
+            "reduce_only": reduce_only,
+            "cloid": Cloid(orderid),
+        }
+        return order, order_request
+    # ----------------------------------------------------------------------------------------------------
+    def send_order(self, req: OrderRequest) -> str:
+        """
+        委托下单
+        """
+        # 等待合约价格精度推送完成
+        if not self.gateway.wait_ready((READY_CONTRACTS, READY_SPOT), f"委托{req.symbol}"):
+            return self.reject_requests([req])[0]
+        order, order_request = self.create_order(req)
+        self.submit_orders([order_request],[order])
         return order.vt_orderid
     # ----------------------------------------------------------------------------------------------------
+    def send_orders(self, reqs: List[OrderRequest]) -> List[str]:
+        """
+        批量委托下单，所有委托合并为一次签名和一次bulk_orders请求
+        """
+        if not reqs:
+            return []
+        # 等待合约价格精度推送完成
+        if not self.gateway.wait_ready((READY_CONTRACTS, READY_SPOT), "批量委托"):
+            return self.reject_requests(reqs)
+        orders: List[OrderData] = []
+        order_requests: List[dict] = []
+        for req in reqs:
+            order, order_request = self.create_order(req)
+            orders.append(order)
+            order_requests.append(order_request)
+        self.submit_orders(order_requests,orders)
+        return [order.vt_orderid for order in orders]
+    # ----------------------------------------------------------------------------------------------------
+    def reject_requests(self, reqs: List[OrderRequest]) -> List[str]:
+        """
+        合约信息未就绪时生成本地委托单号并直接推送拒单，不发送委托请求
+        """
+        orders: List[OrderData] = [req.create_order_data(self.new_orderid(), self.gateway_name) for req in reqs]
+        self.reject_orders(orders,"等待合约信息就绪超时")
+        return [order.vt_orderid for order in orders]
+    # ----------------------------------------------------------------------------------------------------
+    def submit_orders(self, order_requests: List[dict],orders:List[OrderData]) -> None:
+        """
+        提交委托请求，开启异步提交时交给提交线程池执行，回报通过on_send_orders推送
+        """
+        if not self.submitter:
+            data = self.gateway.exchange_info.bulk_orders(order_requests)
+            self.on_send_orders(data,orders)
+            return
+        name = "send_order" if len(orders) == 1 else "send_orders"
+        submitted = self.submitter.submit(
+            name,
+            lambda: self.gateway.exchange_info.bulk_orders(order_requests),
+            lambda data: self.on_send_orders(data,orders),
+            lambda ex: self.reject_orders(orders,f"委托请求异常：{ex}"),
+        )
+        if not submitted:
+            self.reject_orders(orders,f"在途委托请求数已达上限：{self.submitter.max_inflight}")
+    # ----------------------------------------------------------------------------------------------------
     def cancel_order(self, req: CancelRequest) -> None:
         """
         委托撤单
         """
-        while not self.spot_symbol_name_map:
-            sleep(1)
-        if req.exchange == Exchange.HYPESPOT:
-            symbol = self.spot_symbol_name_map[req.symbol]
-        else:
-            symbol = req.symbol
-        # 自定义委托单id撤单
-        if isinstance(req.orderid,str):
-            data = self.gateway.exchange_info.cancel_by_cloid(symbol,Cloid(req.orderid))
-        else:
-            # 系统委托单id撤单
-            data = self.gateway.exchange_info.cancel(symbol,req.orderid)
-        self.on_cancel_order(data,req)
+        self.cancel_orders([req])
+    # ----------------------------------------------------------------------------------------------------
+    def cancel_orders(self, reqs: List[CancelRequest]) -> None:
+        """
+        批量撤单，按自定义委托单id和系统委托单id分组，每组一次签名和一次请求
+        """
+        if not reqs:
+            return
+        # 等待现货合约名称映射完成
+        if not self.gateway.wait_ready((READY_SPOT,), "撤单"):
+            return
+        cloid_reqs: List[CancelRequest] = []
+        cloid_cancels: List[dict] = []
+        oid_reqs: List[CancelRequest] = []
+        oid_cancels: List[dict] = []
+        for req in reqs:
+            if req.exchange == Exchange.HYPESPOT:
+                symbol = self.spot_symbol_name_map[req.symbol]
+            else:
+                symbol = req.symbol
+            # 自定义委托单id撤单
+            if isinstance(req.orderid,str):
+                cloid_reqs.append(req)
+                cloid_cancels.append({"coin": symbol, "cloid": Cloid(req.orderid)})
+            else:
+                # 系统委托单id撤单
+                oid_reqs.append(req)
+                oid_cancels.append({"coin": symbol, "oid": req.orderid})
+        if cloid_cancels:
+            data = self.gateway.exchange_info.bulk_cancel_by_cloid(cloid_cancels)
+            self.on_cancel_orders(data,cloid_reqs)
+        if oid_cancels:
+            data = self.gateway.exchange_info.bulk_cancel(oid_cancels)
+            self.on_cancel_orders(data,oid_reqs)
+    # ----------------------------------------------------------------------------------------------------
+    def cancel_all(self, symbol: str | None = None) -> None:
+        """
+        撤销全部活动委托，symbol可传入合约名称或vt_symbol，为None时撤销所有合约的活动委托
+        """
+        reqs: List[CancelRequest] = []
+        for order in list(self.gateway.orders.values()):
+            if not order.is_active():
+                continue
+            if symbol and symbol not in (order.symbol, order.vt_symbol):
+                continue
+            reqs.append(order.create_cancel_request())
+        self.cancel_orders(reqs)
     # -------------------------------------------------------------------------------------------------------
     def create_position_pair(self, symbol: str, exchange: Exchange, volume: float, avg_price: float, unrealized_pnl: float):
         """
@@ -786,6 +1235,7 @@ class HyperliquidRestApi(RestClient):
             self.gateway.on_contract(contract)
         self.spot_name_symbol_map = {v:k for k,v in self.spot_symbol_name_map.items()}
         self.spot_inited = True
+        self.gateway.readiness.set(READY_SPOT)
         self.gateway.write_log(f"交易接口：{self.gateway_name}，现货信息查询成功")
     # ----------------------------------------------------------------------------------------------------
     def on_query_perp_contract(self, data: dict,dex:str):
@@ -819,97 +1269,212 @@ class HyperliquidRestApi(RestClient):
             msg = dex
         self.gateway.write_log(f"交易接口：{self.gateway_name}，{msg}信息查询成功")
     # ----------------------------------------------------------------------------------------------------
+    def modify_order(self, req: ModifyRequest) -> None:
+        """
+        委托改单
+        """
+        self.modify_orders([req])
+    # ----------------------------------------------------------------------------------------------------
+    def modify_orders(self, reqs: List[ModifyRequest]) -> None:
+        """
+        批量改单，所有改单合并为一次签名和一次batchModify请求，改单保留委托在交易所的原委托单号(cloid)
+        """
+        if not reqs:
+            return
+        # 等待合约价格精度推送完成
+        if not self.gateway.wait_ready((READY_CONTRACTS, READY_SPOT), "改单"):
+            return
+        orders: List[OrderData] = []
+        modify_requests: List[dict] = []
+        for req in reqs:
+            order = self.gateway.orders.get(req.orderid)
+            if not order or not order.is_active():
+                self.gateway.write_log(f"委托单：{req.orderid}不存在或已结束，无法改单")
+                continue
+            # 改单价格和数量
+            order = copy(order)
+            order.price = self.round_price(order.symbol, order.exchange, req.price)
+            order.volume = req.volume
+            if order.exchange == Exchange.HYPESPOT:
+                symbol = self.spot_symbol_name_map[order.symbol]
+            else:
+                symbol = order.symbol
+            # 自定义委托单id改单时保持cloid不变
+            if isinstance(order.orderid,str):
+                oid = Cloid(order.orderid)
+                cloid = oid
+            else:
+                oid = order.orderid
+                cloid = None
+            modify_requests.append(
+                {
+                    "oid": oid,
+                    "order": {
+                        "coin": symbol,
+                        "is_buy": order.direction == Direction.LONG,
+                        "sz": order.volume,
+                        "limit_px": order.price,
+                        "order_type": {"limit": {"tif": "Gtc"}},
+                        "reduce_only": (order.offset == Offset.CLOSE and order.exchange == Exchange.HYPE),
+                        "cloid": cloid,
+                    },
+                }
+            )
+            orders.append(order)
+        if not modify_requests:
+            return
+        data = self.gateway.exchange_info.bulk_modify_orders_new(modify_requests)
+        self.on_modify_orders(data,orders)
+    # ----------------------------------------------------------------------------------------------------
+    def on_modify_orders(self, data: dict,orders:List[OrderData]) -> None:
+        """
+        批量改单回报，改单成功后更新仍活动的缓存委托的价格和数量，改单失败时原委托保持不变
+        """
+        if not data or "error" in data or data["status"] == "err":
+            msg = (data.get("error") or data.get("response")) if data else "无返回数据"
+            for order in orders:
+                self.gateway.write_log(f"合约：{order.vt_symbol}改单失败，错误信息：{msg}")
+            return
+        statuses = data["response"]["data"]["statuses"]
+        for order, response in zip(orders,statuses):
+            if not isinstance(response, dict) or "error" in response:
+                msg = response["error"] if isinstance(response, dict) else response
+                self.gateway.write_log(f"合约：{order.vt_symbol}改单失败，错误信息：{msg}")
+                continue
+            # 改单后交易所分配新的系统委托单id
+            for key in ("resting", "filled"):
+                if key in response:
+                    self.gateway.system_local_orderid_map[response[key]["oid"]] = order.orderid
+            # 改单请求期间委托可能已经成交或撤销，以最新缓存委托为准，只更新仍活动委托的价格和数量
+            current = self.gateway.orders.get(order.orderid)
+            if not current or not current.is_active():
+                continue
+            current = copy(current)
+            current.price = order.price
+            current.volume = order.volume
+            self.gateway.on_order(current)
+    # ----------------------------------------------------------------------------------------------------
     def on_send_order(self, data: dict,order:OrderData) -> None:
         """
         委托下单回报
         """
-        if "error" in data:
-            msg = data["error"]
-            order.status = Status.REJECTED
-            self.gateway.on_order(order)
-            self.gateway.write_log(f"合约：{order.vt_symbol}发送委托单失败，错误信息：{msg}")
+        self.on_send_orders(data,[order])
+    # ----------------------------------------------------------------------------------------------------
+    def on_send_orders(self, data: dict,orders:List[OrderData]) -> None:
+        """
+        批量委托下单回报，statuses与委托请求顺序一一对应
+        """
+        if not data or "error" in data:
+            msg = data["error"] if data else "无返回数据"
+            self.reject_orders(orders,msg)
             return
         if data["status"] == "err":
-            msg = data["response"]
-            self.gateway.write_log(f"合约：{order.vt_symbol}发送委托单失败，错误信息：{msg}")
-            order.status = Status.REJECTED
-            self.gateway.on_order(order)
+            self.reject_orders(orders,data["response"])
             return
 
-        response = data["response"]["data"]["statuses"][0]
-        if "error" in response:
-            msg = response["error"]
+        statuses = data["response"]["data"]["statuses"]
+        for index, order in enumerate(orders):
+            if index >= len(statuses):
+                self.reject_orders([order],"委托回报缺少该委托状态")
+                continue
+            self.on_order_status(statuses[index],order)
+    # ----------------------------------------------------------------------------------------------------
+    def on_order_status(self, response: dict | str,order:OrderData) -> None:
+        """
+        处理单个委托状态回报
+        """
+        if not isinstance(response, dict) or "error" in response:
+            msg = response["error"] if isinstance(response, dict) else response
+            self.reject_orders([order],msg)
+        elif "filled" in response:
+            self.gateway.system_local_orderid_map[response["filled"]["oid"]] = order.orderid
+        elif "resting" in response:
+            self.gateway.system_local_orderid_map[response["resting"]["oid"]] = order.orderid
+            # 立即推送挂单状态，websocket已推送更新的委托状态时以orderUpdates推送为准
+            cached_order = self.gateway.orders.get(order.orderid)
+            if not cached_order or cached_order.status == Status.SUBMITTING:
+                order.status = Status.NOTTRADED
+                self.gateway.on_order(order)
+    # ----------------------------------------------------------------------------------------------------
+    def reject_orders(self, orders: List[OrderData],msg: Any) -> None:
+        """
+        推送委托拒单
+        """
+        for order in orders:
+            # 异步提交时websocket可能已推送委托状态，已有交易所状态的委托不再推送拒单
+            cached_order = self.gateway.orders.get(order.orderid)
+            if cached_order and cached_order.status != Status.SUBMITTING:
+                continue
             order.status = Status.REJECTED
             self.gateway.on_order(order)
             self.gateway.write_log(f"合约：{order.vt_symbol}发送委托单失败，错误信息：{msg}")
-        else:
-            if "filled" in response:
-                self.gateway.system_local_orderid_map[response["filled"]["oid"]] = order.orderid
-            else:
-                self.gateway.system_local_orderid_map[response["resting"]["oid"]] = order.orderid
     # ----------------------------------------------------------------------------------------------------
     def on_cancel_order(self, data:dict,req:CancelRequest) -> None:
         """
         委托撤单回报
         """
-        status = data["response"]["data"]["statuses"][0]
-        if 'error' in status:
-            msg = status["error"]
-            order = self.gateway.orders[req.orderid]
+        self.on_cancel_orders(data,[req])
+    # ----------------------------------------------------------------------------------------------------
+    def on_cancel_orders(self, data:dict,reqs:List[CancelRequest]) -> None:
+        """
+        批量撤单回报，statuses与撤单请求顺序一一对应
+        """
+        if not data or "error" in data or data["status"] == "err":
+            msg = (data.get("error") or data.get("response")) if data else "无返回数据"
+            for req in reqs:
+                self.gateway.write_log(f"合约：{req.symbol}撤单失败，错误信息：{msg}")
+            return
+        statuses = data["response"]["data"]["statuses"]
+        for req, status in zip(reqs,statuses):
+            self.on_cancel_status(status,req)
+    # ----------------------------------------------------------------------------------------------------
+    def on_cancel_status(self, status: dict | str,req:CancelRequest) -> None:
+        """
+        处理单个撤单状态回报
+        """
+        if not isinstance(status, dict) or 'error' not in status:
+            return
+        msg = status["error"]
+        order = self.gateway.orders.get(req.orderid)
+        if order:
             order.status = Status.CANCELLED
             self.gateway.on_order(order)
-            self.gateway.write_log(f"合约：{req.symbol}撤单失败，错误信息：{msg}")
+        self.gateway.write_log(f"合约：{req.symbol}撤单失败，错误信息：{msg}")
     # ----------------------------------------------------------------------------------------------------
-    def query_history(self, req: HistoryRequest):
+    def download_history(self, reqs: List[HistoryRequest], incremental: bool = False) -> list:
         """
-        查询历史数据
+        提交历史数据下载任务，后台并发下载并批量写入数据库，立即返回下载任务列表
         """
-        history = []
-        limit = 200
-        start_time = req.start
-        time_consuming_start = time()
-        if req.exchange == Exchange.HYPESPOT:
-            symbol = self.spot_symbol_name_map[req.symbol]
-        else:
-            symbol = req.symbol
-        # 已经获取了所有可用的历史数据或者start已经到了请求的终止时间则终止循环
-        while start_time < req.end:
-            end_time = start_time + timedelta(minutes=limit)
-            candle = self.rest_info.candles_snapshot(symbol,"1m",int(start_time.timestamp()*1000),int(end_time.timestamp()*1000))
-            buf = []
-            for raw_data in candle:
-                volume = float(raw_data["v"])
-                bar = BarData(
-                    symbol=req.symbol,
-                    exchange=req.exchange,
-                    datetime=get_local_datetime(raw_data["t"]),
-                    interval=req.interval,
-                    open_price=raw_data["o"],
-                    high_price=raw_data["h"],
-                    low_price=raw_data["l"],
-                    close_price=raw_data["c"],
-                    volume=volume,
-                    gateway_name=self.gateway_name,
-                )
-                buf.append(bar)
-            history.extend(buf)
-            start_time = end_time + timedelta(minutes=1)
-            # 等待100毫秒防止请求过载
-            #sleep(0.1)
-        if history:
-            try:
-                database_manager.save_bar_data(history, False)
-            except Exception as err:
-                self.gateway.write_log(f"获取历史数据出错，错误信息：{err}")
-                return
-
-            time_consuming_end = time()
-            query_time = round(time_consuming_end - time_consuming_start, 3)
-            msg = f"载入{req.vt_symbol}:bar数据，开始时间：{history[0].datetime}，结束时间：{history[-1].datetime}，数据量：{len(history)}，耗时:{query_time}秒"
-            self.gateway.write_log(msg)
-        else:
-            msg = f"未获取到合约：{req.vt_symbol}历史数据"
-            self.gateway.write_log(msg)
+        jobs = []
+        for req in reqs:
+            if req.exchange == Exchange.HYPESPOT:
+                symbol = self.spot_symbol_name_map.get(req.symbol)
+                if not symbol:
+                    self.gateway.write_log(f"未找到现货合约：{req.vt_symbol}，无法下载历史数据")
+                    continue
+            else:
+                symbol = req.symbol
+            job = self.history_engine.submit(req, symbol, incremental)
+            if job:
+                jobs.append(job)
+        return jobs
+    # ----------------------------------------------------------------------------------------------------
+    def query_history(self, req: HistoryRequest) -> List[BarData]:
+        """
+        查询历史数据，等待后台下载完成后返回合并去重的K线数据
+        """
+        jobs = self.download_history([req])
+        if not jobs:
+            return []
+        jobs[0].done.wait()
+        return jobs[0].get_bars(self.gateway_name)
+    # ----------------------------------------------------------------------------------------------------
+    def save_candles(self, req: HistoryRequest, candles: np.ndarray) -> None:
+        """
+        列式K线批量写入数据库，每批只创建BAR_WRITE_CHUNK个BarData
+        """
+        for bars in chunked(candles_to_bars(candles, req, self.gateway_name), BAR_WRITE_CHUNK):
+            database_manager.save_bar_data(bars, False)
 # ----------------------------------------------------------------------------------------------------
 class HyperliquidWebsocketApi(WebsocketClient):
     """
@@ -930,21 +1495,40 @@ class HyperliquidWebsocketApi(WebsocketClient):
         self.trade_id: int = 0
         self.ws_connected: bool = False
         self.ping_count = 0
-        self.trade_ids = [] # trade_id过滤
         self.max_volume_map:Dict[str,float] = {}  # symbol最大合约委托量映射
         self.account_date = None  # 账户日期
         self.accounts_info: Dict[str, dict] = {}
+        self.conflator: TickConflator | None = None   # 深度行情合并推送
+        self.order_books: Dict[str, OrderBook] = {}     # 全深度委托簿
+        self.tick_board: TickBoard | None = None        # 共享内存tick快照板
+        self.live_bars: LiveBarStore | None = None      # 实时K线存储
     # ----------------------------------------------------------------------------------------------------
     def connect(self, account_address: str, vault_address:str, private_address: str, proxy_host: str, proxy_port: int) -> None:
         """
         连接Websocket交易频道
         """
+        if self.gateway.depth_conflation:
+            self.conflator = TickConflator(
+                self.gateway.on_tick,
+                self.gateway.event_engine,
+                self.gateway.depth_conflation,
+                self.gateway.conflation_interval,
+            )
+            self.conflator.start()
+        if self.gateway.publish_status and self.gateway.tick_board_name:
+            self.tick_board = TickBoard.create(self.gateway.tick_board_name, self.gateway.tick_board_capacity)
+        if self.gateway.live_bar and not self.live_bars:
+            if self.gateway.live_bar_interval in INTERVAL_HYPERLIQUID2VT:
+                self.live_bars = LiveBarStore(self.gateway.live_bar_close_delay)
+                self.gateway.event_engine.register(EVENT_TIMER, self.process_live_bars)
+            else:
+                self.gateway.write_log(f"交易接口：{self.gateway_name}，实时K线不支持周期：{self.gateway.live_bar_interval}")
         self.account_address = account_address
         self.vault_address = vault_address
         self.private_address = private_address
         # 账户字典有金库带单地址，则交易带单账户，否则走主账户
         self.trade_address = self.vault_address or self.account_address
-        self.ws_info = Info(REST_HOST,perp_dexs=self.gateway.perp_dexs, skip_ws=False)
+        self.ws_info = Info(REST_HOST,perp_dexs=self.gateway.perp_dexs, skip_ws=False, typed_decode=self.gateway.typed_decode, transport=self.gateway.transport)
         self.init(WEBSOCKET_HOST, proxy_host, proxy_port, gateway_name=self.gateway_name)
         self.start()
         self.is_spot_symbol = self.gateway.rest_api.is_spot_symbol
@@ -965,6 +1549,7 @@ class HyperliquidWebsocketApi(WebsocketClient):
         连接成功回报
         """
         self.ws_connected = True
+        self.gateway.readiness.set(READY_WS)
         self.gateway.write_log(f"交易接口：{self.gateway_name}，Websocket API连接成功")
 
         for req in list(self.subscribed.values()):
@@ -977,16 +1562,18 @@ class HyperliquidWebsocketApi(WebsocketClient):
         连接断开回报
         """
         self.ws_connected = False
+        self.gateway.readiness.clear(READY_WS)
         self.gateway.write_log(f"交易接口：{self.gateway_name}，Websocket API连接断开")
     # ----------------------------------------------------------------------------------------------------
     def subscribe(self, req: SubscribeRequest) -> None:
         """
         订阅行情
         """
-        # 等待ws连接成功和现货信息查询完成后再订阅行情
-        while (not self.ws_connected or not self.gateway.rest_api.spot_inited):
-            sleep(1)
         symbol_exchange = f"{req.symbol}_{req.exchange.value}"
+        # 等待ws连接成功和现货信息查询完成后再订阅行情，超时的订阅在ws重连成功后重新发送
+        if not self.gateway.wait_ready((READY_WS, READY_SPOT), f"订阅{req.symbol}"):
+            self.subscribed[symbol_exchange] = req
+            return
         self.ticks[symbol_exchange] = TickData(
             symbol=req.symbol,
             name=req.symbol,
@@ -995,6 +1582,12 @@ class HyperliquidWebsocketApi(WebsocketClient):
             datetime=datetime.now(TZ_INFO),
         )
         self.subscribed[symbol_exchange] = req
+        if self.tick_board and self.tick_board.register(symbol_exchange) is None:
+            self.gateway.write_log(
+                f"tick快照板槽位已满，容量：{self.gateway.tick_board_capacity}，合约：{req.vt_symbol}不发布到快照板"
+            )
+        if self.gateway.full_depth and symbol_exchange not in self.order_books:
+            self.order_books[symbol_exchange] = OrderBook(req.symbol, req.exchange)
         if req.exchange == Exchange.HYPESPOT:
             subscribe_symbol = self.gateway.rest_api.spot_symbol_name_map[req.symbol]
         else:
@@ -1009,6 +1602,12 @@ class HyperliquidWebsocketApi(WebsocketClient):
             if self.gateway.book_trade_status:
                 # 逐笔委托簿
                 self.ws_info.subscribe({"type": "bbo", "coin": subscribe_symbol}, self.on_bbo)
+            # 录制合约订阅实时K线
+            if self.live_bars and req.vt_symbol in self.gateway.recording_list:
+                self.ws_info.subscribe(
+                    {"type": "candle", "coin": subscribe_symbol, "interval": self.gateway.live_bar_interval},
+                    self.on_candle,
+                )
     # ----------------------------------------------------------------------------------------------------
     def subscribe_private(self) -> None:
         """
@@ -1070,11 +1669,23 @@ class HyperliquidWebsocketApi(WebsocketClient):
             exchange = Exchange.HYPE
         bid_price_1,bid_volume_1 = float(bbo[0]["px"]),float(bbo[0]["sz"])
         ask_price_1,ask_volume_1 = float(bbo[1]["px"]),float(bbo[1]["sz"])
-        tick = self.ticks[f"{symbol}_{exchange.value}"]
+        symbol_exchange = f"{symbol}_{exchange.value}"
+        tick = self.ticks[symbol_exchange]
         tick.datetime = get_local_datetime(data["time"])
         tick.bid_price_1,tick.bid_volume_1 = bid_price_1,bid_volume_1
         tick.ask_price_1,tick.ask_volume_1 = ask_price_1,ask_volume_1
-        self.gateway.on_tick(tick)
+        if self.tick_board:
+            self.tick_board.write(symbol_exchange, tick)
+        self.push_tick(tick)
+    # ----------------------------------------------------------------------------------------------------
+    def push_tick(self, tick: TickData) -> None:
+        """
+        立即推送成交和一档行情tick，启用深度合并推送时丢弃等待补推的旧深度tick
+        """
+        if self.conflator:
+            self.conflator.push_now(tick)
+        else:
+            self.gateway.on_tick(tick)
     # ----------------------------------------------------------------------------------------------------
     def on_public_trade(self,packet:dict):
         """
@@ -1088,10 +1699,54 @@ class HyperliquidWebsocketApi(WebsocketClient):
                 exchange = Exchange.HYPESPOT
             else:
                 exchange = Exchange.HYPE
-            tick = self.ticks[f"{symbol}_{exchange.value}"]
+            symbol_exchange = f"{symbol}_{exchange.value}"
+            tick = self.ticks[symbol_exchange]
             tick.datetime = get_local_datetime(data["time"])
             tick.last_price = float(data["px"])
-            self.gateway.on_tick(tick)
+            if self.tick_board:
+                self.tick_board.write(symbol_exchange, tick)
+            self.push_tick(tick)
+    # ----------------------------------------------------------------------------------------------------
+    def on_candle(self, packet: dict):
+        """
+        收到实时K线推送，开始时间变化时推送上一根走完的K线
+        """
+        data = packet["data"]
+        symbol = data["s"]
+        if self.is_spot_symbol(symbol):
+            symbol = self.gateway.rest_api.spot_name_symbol_map[symbol]
+            exchange = Exchange.HYPESPOT
+        else:
+            exchange = Exchange.HYPE
+        bar = BarData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=get_local_datetime(data["t"]),
+            interval=INTERVAL_HYPERLIQUID2VT[data["i"]],
+            open_price=float(data["o"]),
+            high_price=float(data["h"]),
+            low_price=float(data["l"]),
+            close_price=float(data["c"]),
+            volume=float(data["v"]),
+            gateway_name=self.gateway_name,
+        )
+        finished = self.live_bars.update(f"{symbol}_{exchange.value}", bar, data["T"])
+        if finished:
+            self.gateway.on_bar(finished)
+    # ----------------------------------------------------------------------------------------------------
+    def process_live_bars(self, event: Event) -> None:
+        """
+        推送超过收盘时间仍未收到下一根K线推送的K线，并批量写入已走完的K线
+        """
+        for bar in self.live_bars.check_closed(int(time() * 1000)):
+            self.gateway.on_bar(bar)
+        bars = self.live_bars.pop_finished()
+        if not bars:
+            return
+        try:
+            database_manager.save_bar_data(bars, False)
+        except Exception as err:
+            self.gateway.write_log(f"保存实时K线数据出错，错误信息：{err}")
     # ----------------------------------------------------------------------------------------------------
     def on_depth(self, packet: dict):
         """
@@ -1104,22 +1759,21 @@ class HyperliquidWebsocketApi(WebsocketClient):
             exchange = Exchange.HYPESPOT
         else:
             exchange = Exchange.HYPE
-        tick = self.ticks[f"{symbol}_{exchange.value}"]
+        symbol_exchange = f"{symbol}_{exchange.value}"
+        tick = self.ticks[symbol_exchange]
         order_book = data["levels"]
-        bids,asks = order_book[0],order_book[1]
-        # 封装更新order book的逻辑到一个辅助函数
-        def update_order_book(order_books, type_prefix):
-            for index, data in enumerate(order_books, start=1):
-                setattr(tick, f"{type_prefix}_price_{index}", float(data["px"]))
-                setattr(tick, f"{type_prefix}_volume_{index}", float(data["sz"]))
-
-        # 更新买单和卖单的order book
-        update_order_book(bids, "bid")
-        update_order_book(asks, "ask")
-
+        update_tick_depth(tick, order_book[0], order_book[1])
         tick.datetime = get_local_datetime(data["time"])
+        full_book = self.order_books.get(symbol_exchange)
+        if full_book:
+            full_book.update(order_book[0], order_book[1], tick.datetime)
+        if self.tick_board:
+            self.tick_board.write(symbol_exchange, tick)
         if tick.last_price:
-            self.gateway.on_tick(tick)
+            if self.conflator:
+                self.conflator.on_tick(tick)
+            else:
+                self.gateway.on_tick(tick)
     # ----------------------------------------------------------------------------------------------------
     def on_trade(self,packet:dict):
         """
@@ -1127,41 +1781,46 @@ class HyperliquidWebsocketApi(WebsocketClient):
         """
         data = packet["data"]["fills"]
         for raw in data:
-            trade_id = raw["tid"]
-            # 过滤重复trade_id
-            if trade_id  in self.trade_ids:
-                continue
-            self.trade_ids.append(trade_id)
-            if "cloid" in raw:
-                orderid = raw["cloid"]
-                self.gateway.system_local_orderid_map[raw["oid"]] = orderid
-            else:
-                orderid = self.gateway.system_local_orderid_map.get(raw["oid"],raw["oid"])
-            symbol = raw["coin"]
-            if self.is_spot_symbol(symbol):
-                symbol = self.gateway.rest_api.spot_name_symbol_map[symbol]
-                exchange = Exchange.HYPESPOT
-            else:
-                exchange = Exchange.HYPE
-            # 现货dir可能返回Spot Dust Conversion，此时用raw["side"]获取开平仓方向
-            if raw["dir"] == "Spot Dust Conversion":
-                direction_convert = raw["side"]
-            else:
-                direction_convert = raw["dir"]
-            direction,offset = TRADE_DIRECTION_HYPERLIQUID2VT[direction_convert]
-            trade_data = TradeData(
-                symbol = symbol,
-                exchange= exchange,
-                gateway_name=self.gateway_name,
-                price = float(raw["px"]),
-                volume = float(raw["sz"]),
-                direction = direction,
-                offset = offset,
-                orderid=orderid,
-                tradeid=trade_id,
-                datetime = get_local_datetime(raw["time"]),
-            )
-            self.gateway.on_trade(trade_data)
+            self.on_fill(raw)
+    # ----------------------------------------------------------------------------------------------------
+    def on_fill(self,raw:dict):
+        """
+        处理单条成交数据，websocket成交推送和REST成交补查共用
+        """
+        trade_id = raw["tid"]
+        # 过滤重复trade_id
+        if not self.gateway.trade_filter.add(trade_id):
+            return
+        if "cloid" in raw:
+            orderid = raw["cloid"]
+            self.gateway.system_local_orderid_map[raw["oid"]] = orderid
+        else:
+            orderid = self.gateway.system_local_orderid_map.get(raw["oid"],raw["oid"])
+        symbol = raw["coin"]
+        if self.is_spot_symbol(symbol):
+            symbol = self.gateway.rest_api.spot_name_symbol_map[symbol]
+            exchange = Exchange.HYPESPOT
+        else:
+            exchange = Exchange.HYPE
+        # 现货dir可能返回Spot Dust Conversion，此时用raw["side"]获取开平仓方向
+        if raw["dir"] == "Spot Dust Conversion":
+            direction_convert = raw["side"]
+        else:
+            direction_convert = raw["dir"]
+        direction,offset = TRADE_DIRECTION_HYPERLIQUID2VT[direction_convert]
+        trade_data = TradeData(
+            symbol = symbol,
+            exchange= exchange,
+            gateway_name=self.gateway_name,
+            price = float(raw["px"]),
+            volume = float(raw["sz"]),
+            direction = direction,
+            offset = offset,
+            orderid=orderid,
+            tradeid=trade_id,
+            datetime = get_local_datetime(raw["time"]),
+        )
+        self.gateway.on_trade(trade_data)
     # ----------------------------------------------------------------------------------------------------
     def on_order(self, packet: dict):
         """
@@ -1351,4 +2010,760 @@ class HyperliquidWebsocketApi(WebsocketClient):
             if "reduceOnly" in raw and raw["reduceOnly"]:
                 order.offset = Offset.CLOSE
             self.gateway.on_order(order)
-            
+# ----------------------------------------------------------------------------------------------------
+class TickConflator:
+    """
+    深度行情合并推送
+    * interval模式：同一vt_symbol两次推送间隔不小于interval秒
+    * busy模式：事件引擎队列有积压时暂停推送，积压消化后只推送最新深度
+    被合并的tick由后台线程补推，保证下游最终看到最新状态
+    * 等待补推的tick保存收到时的副本，避免补推线程推送Websocket线程正在修改的tick
+    * 同一合约的推送判断和推送在合约锁内完成，补推线程不会在更新的tick之后推送旧tick
+    * 成交和一档行情不合并，通过push_now立即推送并丢弃该合约等待补推的旧tick
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, push_tick: Callable[[TickData], None], event_engine: EventEngine, mode: str, interval: float) -> None:
+        """
+        构造函数
+        """
+        self.push_tick = push_tick
+        self.event_engine = event_engine
+        self.mode = mode
+        self.interval = interval
+        self.pending: Dict[str, TickData] = {}  # 等待补推的最新tick副本
+        self.last_push_time: Dict[str, float] = {}
+        self.conflated_count: Dict[str, int] = defaultdict(int)   # 被合并的深度更新数量
+        self.pushed_count: Dict[str, int] = defaultdict(int)
+        self.lock: Lock = Lock()
+        self.symbol_locks: Dict[str, Lock] = {}
+        # busy模式推送后向事件引擎放入标记事件，标记事件被处理前说明之前的事件还没有消化完
+        self.marking: bool = False
+        self.stop_event: ThreadEvent = ThreadEvent()
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+    # ----------------------------------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        启动补推线程
+        """
+        if self.mode == "busy":
+            self.event_engine.register(EVENT_CONFLATION_MARK, self.on_mark)
+        self.thread.start()
+    # ----------------------------------------------------------------------------------------------------
+    def stop(self) -> None:
+        """
+        停止补推线程
+        """
+        self.stop_event.set()
+        if self.mode == "busy":
+            self.event_engine.unregister(EVENT_CONFLATION_MARK, self.on_mark)
+    # ----------------------------------------------------------------------------------------------------
+    def on_mark(self, event: Event) -> None:
+        """
+        标记事件被处理，之前放入事件引擎的tick已消化完
+        """
+        self.marking = False
+    # ----------------------------------------------------------------------------------------------------
+    def is_busy(self) -> bool:
+        """
+        事件引擎队列是否有积压
+        """
+        return self.marking
+    # ----------------------------------------------------------------------------------------------------
+    def get_symbol_lock(self, vt_symbol: str) -> Lock:
+        """
+        获取合约锁
+        """
+        with self.lock:
+            lock = self.symbol_locks.get(vt_symbol)
+            if not lock:
+                lock = self.symbol_locks[vt_symbol] = Lock()
+            return lock
+    # ----------------------------------------------------------------------------------------------------
+    def can_push(self, vt_symbol: str, now: float) -> bool:
+        """
+        判断当前是否可以推送
+        """
+        if self.mode == "busy":
+            return not self.is_busy()
+        return now - self.last_push_time.get(vt_symbol, 0) >= self.interval
+    # ----------------------------------------------------------------------------------------------------
+    def push(self, tick: TickData) -> None:
+        """
+        推送tick，busy模式推送后放入标记事件
+        """
+        self.push_tick(tick)
+        if self.mode == "busy" and not self.marking:
+            self.marking = True
+            self.event_engine.put(Event(EVENT_CONFLATION_MARK))
+    # ----------------------------------------------------------------------------------------------------
+    def on_tick(self, tick: TickData) -> None:
+        """
+        收到深度更新，可推送时立即推送，否则用tick副本覆盖等待补推的tick
+        """
+        vt_symbol = tick.vt_symbol
+        with self.get_symbol_lock(vt_symbol):
+            now = monotonic()
+            with self.lock:
+                if not self.can_push(vt_symbol, now):
+                    if vt_symbol in self.pending:
+                        self.conflated_count[vt_symbol] += 1
+                    self.pending[vt_symbol] = copy(tick)
+                    return
+                self.pending.pop(vt_symbol, None)
+                self.last_push_time[vt_symbol] = now
+                self.pushed_count[vt_symbol] += 1
+            self.push(tick)
+    # ----------------------------------------------------------------------------------------------------
+    def push_now(self, tick: TickData) -> None:
+        """
+        立即推送不参与合并的tick，推送的tick已包含最新深度，等待补推的旧tick直接丢弃
+        """
+        vt_symbol = tick.vt_symbol
+        with self.get_symbol_lock(vt_symbol):
+            with self.lock:
+                if self.pending.pop(vt_symbol, None):
+                    self.conflated_count[vt_symbol] += 1
+                self.last_push_time[vt_symbol] = monotonic()
+                self.pushed_count[vt_symbol] += 1
+            self.push(tick)
+    # ----------------------------------------------------------------------------------------------------
+    def flush(self) -> None:
+        """
+        补推可推送合约的最新tick副本
+        """
+        if not self.pending:
+            return
+        with self.lock:
+            vt_symbols = list(self.pending)
+        for vt_symbol in vt_symbols:
+            with self.get_symbol_lock(vt_symbol):
+                now = monotonic()
+                with self.lock:
+                    if vt_symbol not in self.pending or not self.can_push(vt_symbol, now):
+                        continue
+                    tick = self.pending.pop(vt_symbol)
+                    self.last_push_time[vt_symbol] = now
+                    self.pushed_count[vt_symbol] += 1
+                self.push(tick)
+    # ----------------------------------------------------------------------------------------------------
+    def run(self) -> None:
+        """
+        补推被合并的最新tick
+        """
+        wait_time = self.interval if self.mode == "interval" else 0.01
+        while not self.stop_event.wait(wait_time):
+            self.flush()
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取每个合约的推送数量和被合并数量
+        """
+        return {
+            vt_symbol: {"pushed": self.pushed_count[vt_symbol], "conflated": self.conflated_count[vt_symbol]}
+            for vt_symbol in self.pushed_count.keys() | self.conflated_count.keys()
+        }
+# ----------------------------------------------------------------------------------------------------
+class OrderBook:
+    """
+    单个合约全深度委托簿
+    * 买卖盘按交易所推送顺序保存(买盘价格降序，卖盘价格升序)，每档包含价格，数量，委托单数量
+    * 每次更新整体替换(买盘，卖盘，更新时间)快照元组，读取方取一次快照解包即可在其他线程无锁读取，买卖盘和时间总是一致
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, symbol: str, exchange: Exchange) -> None:
+        """
+        构造函数
+        """
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        empty = self.build_side([])
+        # (买盘，卖盘，更新时间)，单边深度为(价格，数量，委托单数量，累计数量，累计成交额)
+        self.snapshot: tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...], datetime | None] = (empty, empty, None)
+    # ----------------------------------------------------------------------------------------------------
+    @staticmethod
+    def build_side(levels: list) -> tuple[np.ndarray, ...]:
+        """
+        单边深度转换为numpy数组
+        """
+        if not levels:
+            prices = volumes = counts = np.zeros(0)
+        else:
+            array = np.array([(float(level["px"]), float(level["sz"]), level["n"]) for level in levels], dtype=float)
+            prices, volumes, counts = array[:, 0], array[:, 1], array[:, 2]
+        return prices, volumes, counts, np.cumsum(volumes), np.cumsum(prices * volumes)
+    # ----------------------------------------------------------------------------------------------------
+    def update(self, bids: list, asks: list, dt: datetime) -> None:
+        """
+        收到l2Book快照更新全深度
+        """
+        self.snapshot = (self.build_side(bids), self.build_side(asks), dt)
+    # ----------------------------------------------------------------------------------------------------
+    def get_side(self, direction: Direction) -> tuple[np.ndarray, ...]:
+        """
+        买入吃卖盘，卖出吃买盘
+        """
+        bids, asks, _ = self.snapshot
+        return asks if direction == Direction.LONG else bids
+    # ----------------------------------------------------------------------------------------------------
+    def best_bid(self) -> float:
+        """
+        买一价
+        """
+        bids, _, _ = self.snapshot
+        prices = bids[0]
+        return float(prices[0]) if prices.size else 0
+    # ----------------------------------------------------------------------------------------------------
+    def best_ask(self) -> float:
+        """
+        卖一价
+        """
+        _, asks, _ = self.snapshot
+        prices = asks[0]
+        return float(prices[0]) if prices.size else 0
+    # ----------------------------------------------------------------------------------------------------
+    def get_cumulative_depth(self, direction: Direction, levels: int = 0) -> float:
+        """
+        获取买入(卖盘)或卖出(买盘)前levels档累计数量，levels为0时返回全部深度
+        """
+        cum_volumes = self.get_side(direction)[3]
+        if not cum_volumes.size:
+            return 0
+        index = min(levels, cum_volumes.size) - 1 if levels > 0 else -1
+        return float(cum_volumes[index])
+    # ----------------------------------------------------------------------------------------------------
+    def get_fill_price(self, direction: Direction, volume: float | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        计算吃掉volume数量的成交均价和最差成交价，volume可传入数组批量计算
+        深度不足的数量返回nan
+        """
+        return self.calculate_fill_price(self.get_side(direction), volume)
+    # ----------------------------------------------------------------------------------------------------
+    @staticmethod
+    def calculate_fill_price(side: tuple[np.ndarray, ...], volume: float | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        按单边深度计算成交均价和最差成交价
+        """
+        prices, volumes, counts, cum_volumes, cum_notionals = side
+        volume = np.asarray(volume, dtype=float)
+        if not prices.size:
+            nan = np.full(volume.shape, np.nan)
+            return nan, nan
+        # 最后成交所在档位
+        index = np.searchsorted(cum_volumes, volume, side="left")
+        insufficient = index >= prices.size
+        index = np.minimum(index, prices.size - 1)
+        prev_volumes = np.where(index > 0, cum_volumes[index - 1], 0)
+        prev_notionals = np.where(index > 0, cum_notionals[index - 1], 0)
+        worst_prices = prices[index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_prices = (prev_notionals + (volume - prev_volumes) * worst_prices) / volume
+        average_prices = np.where(insufficient, np.nan, average_prices)
+        worst_prices = np.where(insufficient, np.nan, worst_prices)
+        return average_prices, worst_prices
+    # ----------------------------------------------------------------------------------------------------
+    def get_slippage(self, direction: Direction, volume: float | np.ndarray) -> np.ndarray:
+        """
+        计算吃掉volume数量相对一档价格的滑点比例
+        """
+        side = self.get_side(direction)
+        prices = side[0]
+        average_prices = self.calculate_fill_price(side, volume)[0]
+        if not prices.size:
+            return average_prices
+        return np.abs(average_prices - prices[0]) / prices[0]
+# ----------------------------------------------------------------------------------------------------
+class TradeIdFilter:
+    """
+    成交id去重
+    * 哈希集合O(1)判重，按写入顺序保存的队列淘汰最旧id
+    * 超出容量或超过有效期(秒)的id被淘汰
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, capacity: int, ttl: float) -> None:
+        """
+        构造函数
+        """
+        self.capacity: int = capacity
+        self.ttl: float = ttl
+        self.ids: set = set()
+        self.ring: deque = deque()     # (写入时间，成交id)
+        self.lock: Lock = Lock()
+        self.hit_count: int = 0       # 重复成交id数量
+        self.capacity_evict_count: int = 0
+        self.ttl_evict_count: int = 0
+    # ----------------------------------------------------------------------------------------------------
+    def add(self, trade_id: Any) -> bool:
+        """
+        写入成交id，新成交id返回True，重复成交id返回False
+        """
+        now = monotonic()
+        with self.lock:
+            self.evict(now)
+            if trade_id in self.ids:
+                self.hit_count += 1
+                return False
+            self.ids.add(trade_id)
+            self.ring.append((now, trade_id))
+            if len(self.ring) > self.capacity:
+                self.ids.discard(self.ring.popleft()[1])
+                self.capacity_evict_count += 1
+            return True
+    # ----------------------------------------------------------------------------------------------------
+    def evict(self, now: float) -> None:
+        """
+        淘汰超过有效期的成交id
+        """
+        ring = self.ring
+        expire_time = now - self.ttl
+        while ring and ring[0][0] < expire_time:
+            self.ids.discard(ring.popleft()[1])
+            self.ttl_evict_count += 1
+    # ----------------------------------------------------------------------------------------------------
+    def __contains__(self, trade_id: Any) -> bool:
+        return trade_id in self.ids
+    # ----------------------------------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.ids)
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取去重统计
+        """
+        return {
+            "size": len(self.ids),
+            "capacity": self.capacity,
+            "hit": self.hit_count,
+            "capacity_evict": self.capacity_evict_count,
+            "ttl_evict": self.ttl_evict_count,
+        }
+# ----------------------------------------------------------------------------------------------------
+# 请求延迟直方图分桶上限(毫秒)，超过最后一个分桶的延迟计入溢出桶
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+LATENCY_LABELS = tuple(f"<={bucket}ms" for bucket in LATENCY_BUCKETS) + (f">{LATENCY_BUCKETS[-1]}ms",)
+# ----------------------------------------------------------------------------------------------------
+class OrderSubmitter:
+    """
+    异步委托提交器
+    * 委托签名和HTTP请求在独立线程池执行，策略和事件引擎线程推送提交中委托后立即返回
+    * 在途请求数达到上限时拒绝提交，避免交易所响应变慢时请求无限堆积
+    * 按请求类型统计排队延迟和请求延迟直方图
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, write_log: Callable[[str], None], workers: int, max_inflight: int) -> None:
+        """
+        构造函数
+        """
+        self.write_log = write_log
+        self.max_inflight = max_inflight
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="HyperliquidSubmit")
+        self.inflight_semaphore = BoundedSemaphore(max_inflight)
+        self.inflight: int = 0
+        self.rejected: int = 0
+        self.lock = Lock()
+        # 请求类型:统计数据
+        self.stats: Dict[str, dict] = {}
+        # 未完成请求:失败回调，停止时取消未开始执行的请求并回调失败
+        self.futures: Dict[Future, Callable[[Exception], None]] = {}
+    # ----------------------------------------------------------------------------------------------------
+    def submit(
+        self,
+        name: str,
+        request: Callable[[], Any],
+        callback: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+    ) -> bool:
+        """
+        提交请求，在途请求已达上限或提交器已停止时返回False
+        """
+        if not self.inflight_semaphore.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            return False
+        with self.lock:
+            self.inflight += 1
+        try:
+            future = self.executor.submit(self.run, name, request, callback, on_error, monotonic())
+        except RuntimeError:
+            # 线程池已关闭
+            self.release()
+            return False
+        with self.lock:
+            self.futures[future] = on_error
+        future.add_done_callback(self.remove_future)
+        return True
+    # ----------------------------------------------------------------------------------------------------
+    def remove_future(self, future: Future) -> None:
+        """
+        请求完成后移除
+        """
+        with self.lock:
+            self.futures.pop(future, None)
+    # ----------------------------------------------------------------------------------------------------
+    def run(
+        self,
+        name: str,
+        request: Callable[[], Any],
+        callback: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        submit_time: float,
+    ) -> None:
+        """
+        提交线程执行请求并回调结果
+        """
+        start_time = monotonic()
+        try:
+            data = request()
+        except Exception as ex:
+            self.record(name, start_time - submit_time, monotonic() - start_time, False)
+            self.release()
+            on_error(ex)
+            return
+        self.record(name, start_time - submit_time, monotonic() - start_time, True)
+        self.release()
+        try:
+            callback(data)
+        except Exception as ex:
+            self.write_log(f"委托请求{name}回报处理出错，错误信息：{ex}")
+    # ----------------------------------------------------------------------------------------------------
+    def release(self) -> None:
+        """
+        释放在途请求计数
+        """
+        with self.lock:
+            self.inflight -= 1
+        self.inflight_semaphore.release()
+    # ----------------------------------------------------------------------------------------------------
+    def record(self, name: str, queue_time: float, request_time: float, success: bool) -> None:
+        """
+        记录请求排队延迟和请求延迟
+        """
+        request_ms = request_time * 1000
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = {
+                    "count": 0,
+                    "error": 0,
+                    "queue_ms_total": 0.0,
+                    "request_ms_total": 0.0,
+                    "request_ms_max": 0.0,
+                    "histogram": [0] * len(LATENCY_LABELS),
+                }
+            stats["count"] += 1
+            if not success:
+                stats["error"] += 1
+            stats["queue_ms_total"] += queue_time * 1000
+            stats["request_ms_total"] += request_ms
+            stats["request_ms_max"] = max(stats["request_ms_max"], request_ms)
+            stats["histogram"][bisect_left(LATENCY_BUCKETS, request_ms)] += 1
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> dict:
+        """
+        获取提交统计
+        """
+        with self.lock:
+            requests = {}
+            for name, stats in self.stats.items():
+                count = stats["count"]
+                requests[name] = {
+                    "count": count,
+                    "error": stats["error"],
+                    "queue_ms_mean": stats["queue_ms_total"] / count,
+                    "request_ms_mean": stats["request_ms_total"] / count,
+                    "request_ms_max": stats["request_ms_max"],
+                    "histogram": dict(zip(LATENCY_LABELS, stats["histogram"])),
+                }
+            return {"inflight": self.inflight, "rejected": self.rejected, "requests": requests}
+    # ----------------------------------------------------------------------------------------------------
+    def stop(self) -> None:
+        """
+        停止提交线程池，未开始执行的请求取消后回调失败，对应委托推送拒单
+        """
+        self.executor.shutdown(wait=False)
+        with self.lock:
+            futures = list(self.futures.items())
+        for future, on_error in futures:
+            if not future.cancel():
+                continue
+            self.release()
+            on_error(RuntimeError("提交器已停止，请求未发送"))
+# ----------------------------------------------------------------------------------------------------
+class DexFanout:
+    """
+    按永续交易所并发查询
+    * 每个交易所的请求在有界线程池中并发执行，总耗时接近最慢的单个请求，不再随perp_dexs数量线性增长
+    * 回调在调用线程按交易所列表顺序执行，回调顺序与串行查询一致
+    * 单个交易所请求出错时其余交易所照常回调，全部处理完后抛出第一个错误，与串行查询一样由调用方处理
+    * 按查询类型记录每个交易所的请求耗时(包括出错的请求)和整轮耗时
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, write_log: Callable[[str], None], workers: int) -> None:
+        """
+        构造函数
+        """
+        self.write_log = write_log
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="HyperliquidDexQuery")
+        self.lock = Lock()
+        # 查询类型:统计数据
+        self.stats: Dict[str, dict] = {}
+    # ----------------------------------------------------------------------------------------------------
+    def run(
+        self,
+        name: str,
+        dexs: List[str],
+        request: Callable[[str], Any],
+        callback: Callable[[Any, str], None],
+    ) -> None:
+        """
+        并发请求所有交易所，按dexs顺序等待结果并回调，有交易所请求出错时回调完成后抛出第一个错误
+        """
+        start_time = monotonic()
+        futures = [(dex, self.executor.submit(self.timed_request, request, dex)) for dex in dexs]
+        errors: List[Exception] = []
+        for dex, future in futures:
+            data, elapsed, error = future.result()
+            self.record(name, dex, elapsed, error is None)
+            if error:
+                self.write_log(f"交易所：{dex or 'main'}，{name}查询出错，错误信息：{error}")
+                errors.append(error)
+                continue
+            callback(data, dex)
+        self.record(name, "", monotonic() - start_time, True, total=True)
+        if errors:
+            raise errors[0]
+    # ----------------------------------------------------------------------------------------------------
+    @staticmethod
+    def timed_request(request: Callable[[str], Any], dex: str) -> tuple[Any, float, Exception | None]:
+        """
+        执行单个交易所请求并计时，请求出错时返回错误和出错请求本身的耗时
+        """
+        start_time = monotonic()
+        try:
+            data = request(dex)
+        except Exception as ex:
+            return None, monotonic() - start_time, ex
+        return data, monotonic() - start_time, None
+    # ----------------------------------------------------------------------------------------------------
+    def record(self, name: str, dex: str, elapsed: float, success: bool, total: bool = False) -> None:
+        """
+        记录请求耗时，total为True时记录整轮耗时
+        """
+        elapsed_ms = elapsed * 1000
+        with self.lock:
+            stats = self.stats.setdefault(name, {"rounds": 0, "total_ms_last": 0.0, "total_ms_sum": 0.0, "dexs": {}})
+            if total:
+                stats["rounds"] += 1
+                stats["total_ms_last"] = elapsed_ms
+                stats["total_ms_sum"] += elapsed_ms
+                return
+            dex_stats = stats["dexs"].setdefault(
+                dex, {"count": 0, "error": 0, "last_ms": 0.0, "sum_ms": 0.0, "max_ms": 0.0}
+            )
+            dex_stats["count"] += 1
+            if not success:
+                dex_stats["error"] += 1
+            dex_stats["last_ms"] = elapsed_ms
+            dex_stats["sum_ms"] += elapsed_ms
+            dex_stats["max_ms"] = max(dex_stats["max_ms"], elapsed_ms)
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> dict:
+        """
+        获取各类查询整轮耗时和每个交易所的请求耗时
+        """
+        with self.lock:
+            result = {}
+            for name, stats in self.stats.items():
+                rounds = stats["rounds"]
+                result[name] = {
+                    "rounds": rounds,
+                    "total_ms_last": stats["total_ms_last"],
+                    "total_ms_mean": stats["total_ms_sum"] / rounds if rounds else 0.0,
+                    "dexs": {
+                        dex: {
+                            "count": dex_stats["count"],
+                            "error": dex_stats["error"],
+                            "last_ms": dex_stats["last_ms"],
+                            "mean_ms": dex_stats["sum_ms"] / dex_stats["count"],
+                            "max_ms": dex_stats["max_ms"],
+                        }
+                        for dex, dex_stats in stats["dexs"].items()
+                    },
+                }
+            return result
+    # ----------------------------------------------------------------------------------------------------
+    def stop(self) -> None:
+        """
+        停止查询线程池
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+# ----------------------------------------------------------------------------------------------------
+class ReadinessBarrier:
+    """
+    启动就绪屏障
+    * 每个阶段对应一个threading.Event，阶段完成时立即唤醒所有等待线程，取代逐秒轮询
+    * 记录每个阶段从start到首次就绪的耗时、就绪次数以及调用方的等待次数、等待耗时和超时次数
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, stages: tuple[str, ...]) -> None:
+        """
+        构造函数
+        """
+        self.events: Dict[str, ThreadEvent] = {stage: ThreadEvent() for stage in stages}
+        self.lock = Lock()
+        self.start_time: float = monotonic()
+        self.stats: Dict[str, dict] = {
+            stage: {"ready_ms": None, "ready_count": 0, "wait_count": 0, "wait_ms_sum": 0.0, "wait_ms_max": 0.0, "timeout": 0}
+            for stage in stages
+        }
+    # ----------------------------------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        开始计时，连接交易接口时调用
+        """
+        with self.lock:
+            self.start_time = monotonic()
+            for stats in self.stats.values():
+                stats["ready_ms"] = None
+    # ----------------------------------------------------------------------------------------------------
+    def set(self, stage: str) -> None:
+        """
+        标记阶段就绪并唤醒等待线程
+        """
+        with self.lock:
+            stats = self.stats[stage]
+            if not self.events[stage].is_set():
+                stats["ready_count"] += 1
+            if stats["ready_ms"] is None:
+                stats["ready_ms"] = (monotonic() - self.start_time) * 1000
+        self.events[stage].set()
+    # ----------------------------------------------------------------------------------------------------
+    def clear(self, stage: str) -> None:
+        """
+        取消阶段就绪状态，如websocket断开
+        """
+        self.events[stage].clear()
+    # ----------------------------------------------------------------------------------------------------
+    def is_ready(self, stage: str) -> bool:
+        """
+        查询阶段是否就绪
+        """
+        return self.events[stage].is_set()
+    # ----------------------------------------------------------------------------------------------------
+    def wait(self, stages: tuple[str, ...], timeout: float) -> bool:
+        """
+        等待所有阶段就绪，timeout为所有阶段共用的总超时时间(秒)，超时返回False
+        """
+        # 已就绪时直接返回，不计入等待统计
+        if all(self.events[stage].is_set() for stage in stages):
+            return True
+        start_time = monotonic()
+        deadline = start_time + timeout
+        for stage in stages:
+            ready = self.events[stage].wait(max(deadline - monotonic(), 0))
+            wait_ms = (monotonic() - start_time) * 1000
+            with self.lock:
+                stats = self.stats[stage]
+                stats["wait_count"] += 1
+                stats["wait_ms_sum"] += wait_ms
+                stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+                if not ready:
+                    stats["timeout"] += 1
+            if not ready:
+                return False
+        return True
+    # ----------------------------------------------------------------------------------------------------
+    def get_stats(self) -> dict:
+        """
+        获取各阶段就绪状态、启动耗时和等待统计
+        """
+        with self.lock:
+            return {
+                stage: {
+                    "ready": self.events[stage].is_set(),
+                    "ready_ms": stats["ready_ms"],
+                    "ready_count": stats["ready_count"],
+                    "wait_count": stats["wait_count"],
+                    "wait_ms_mean": stats["wait_ms_sum"] / stats["wait_count"] if stats["wait_count"] else 0.0,
+                    "wait_ms_max": stats["wait_ms_max"],
+                    "timeout": stats["timeout"],
+                }
+                for stage, stats in self.stats.items()
+            }
+# ----------------------------------------------------------------------------------------------------
+class LiveBarStore:
+    """
+    实时K线存储
+    * 按合约保存正在走的K线，收到同一根K线的推送时覆盖更新
+    * 收到开始时间更晚的K线或超过收盘时间仍未收到新推送时判定上一根K线走完，每根K线只推送一次
+    * 走完的K线缓存到pop_finished取出后批量写入数据库，判定走完后收到的同一根K线迟到推送只重新写入数据库
+    * 判定走完后到收到下一根K线推送前，查询正在走的K线返回None
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, close_delay: float) -> None:
+        """
+        构造函数
+        """
+        self.close_delay_ms = int(close_delay * 1000)
+        self.lock = Lock()
+        # symbol_exchange:正在走的K线
+        self.bars: Dict[str, BarData] = {}
+        # symbol_exchange:正在走的K线收盘时间(毫秒)
+        self.close_times: Dict[str, int] = {}
+        # 已推送走完的合约
+        self.closed: set[str] = set()
+        self.finished: List[BarData] = []
+    # ----------------------------------------------------------------------------------------------------
+    def update(self, symbol_exchange: str, bar: BarData, close_time: int) -> BarData | None:
+        """
+        更新正在走的K线，返回走完的上一根K线
+        """
+        with self.lock:
+            current = self.bars.get(symbol_exchange)
+            finished = None
+            if current:
+                if bar.datetime < current.datetime:
+                    return None
+                if bar.datetime == current.datetime and symbol_exchange in self.closed:
+                    # 迟到推送包含判定走完后的成交，覆盖数据库中的K线，不再推送
+                    self.bars[symbol_exchange] = bar
+                    self.finished.append(bar)
+                    return None
+                if bar.datetime > current.datetime and symbol_exchange not in self.closed:
+                    finished = current
+                    self.finished.append(finished)
+            self.bars[symbol_exchange] = bar
+            self.close_times[symbol_exchange] = close_time
+            self.closed.discard(symbol_exchange)
+            return finished
+    # ----------------------------------------------------------------------------------------------------
+    def check_closed(self, now: int) -> List[BarData]:
+        """
+        返回超过收盘时间close_delay仍未收到下一根K线推送的K线
+        """
+        bars = []
+        with self.lock:
+            for symbol_exchange, close_time in self.close_times.items():
+                if symbol_exchange in self.closed or close_time + self.close_delay_ms > now:
+                    continue
+                self.closed.add(symbol_exchange)
+                bar = self.bars[symbol_exchange]
+                self.finished.append(bar)
+                bars.append(bar)
+        return bars
+    # ----------------------------------------------------------------------------------------------------
+    def pop_finished(self) -> List[BarData]:
+        """
+        取出等待写入数据库的走完K线
+        """
+        with self.lock:
+            bars, self.finished = self.finished, []
+        return bars
+    # ----------------------------------------------------------------------------------------------------
+    def get_bar(self, symbol_exchange: str) -> BarData | None:
+        """
+        查询正在走的K线，K线已走完时返回None
+        """
+        with self.lock:
+            if symbol_exchange in self.closed:
+                return None
+            return self.bars.get(symbol_exchange)
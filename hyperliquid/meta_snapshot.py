@@ -0,0 +1,120 @@
+from time import time
+from typing import Any, Dict, List, Tuple
+
+from hyperliquid.utils.meta_cache import MetaCache
+
+from vnpy.trader.utility import load_json, save_json
+
+# 快照格式版本，字段变更时递增，版本不一致的快照直接丢弃
+META_SNAPSHOT_VERSION = 1
+# 快照只保存网关和SDK用到的字段
+PERP_ASSET_FIELDS = ("name", "szDecimals", "maxLeverage", "isDelisted")
+SPOT_UNIVERSE_FIELDS = ("name", "tokens", "index")
+SPOT_TOKEN_FIELDS = ("name", "szDecimals", "index", "evmContract")
+# ----------------------------------------------------------------------------------------------------
+def pick_fields(raw: dict, fields: Tuple[str, ...]) -> dict:
+    """
+    保留指定字段
+    """
+    return {field: raw[field] for field in fields if field in raw}
+# ----------------------------------------------------------------------------------------------------
+def compact_meta(data: dict) -> dict:
+    """
+    精简永续合约元数据
+    """
+    return {"universe": [pick_fields(raw, PERP_ASSET_FIELDS) for raw in data["universe"]]}
+# ----------------------------------------------------------------------------------------------------
+def compact_spot_meta(data: dict) -> dict:
+    """
+    精简现货元数据
+    """
+    return {
+        "universe": [pick_fields(raw, SPOT_UNIVERSE_FIELDS) for raw in data["universe"]],
+        "tokens": [pick_fields(raw, SPOT_TOKEN_FIELDS) for raw in data["tokens"]],
+    }
+# ----------------------------------------------------------------------------------------------------
+def compact_perp_dexs(data: list) -> list:
+    """
+    精简第三方永续交易所列表，第一个元素为原始交易所(None)
+    """
+    return [pick_fields(raw, ("name",)) if raw else raw for raw in data]
+# ----------------------------------------------------------------------------------------------------
+def diff_universe(old: List[dict], new: List[dict]) -> Tuple[List[dict], List[str], List[dict]]:
+    """
+    按名称比较合约列表，返回新增合约、下架合约名称和字段变更合约
+    """
+    old_map = {raw["name"]: raw for raw in old}
+    new_map = {raw["name"]: raw for raw in new}
+    added = [raw for name, raw in new_map.items() if name not in old_map]
+    removed = [name for name in old_map if name not in new_map]
+    changed = [raw for name, raw in new_map.items() if name in old_map and old_map[name] != raw]
+    return added, removed, changed
+# ----------------------------------------------------------------------------------------------------
+class MetaSnapshot:
+    """
+    本地合约元数据快照
+    * 保存perpDexs、各永续交易所meta和spotMeta的精简数据，SDK的coin_to_asset、asset_to_sz_decimals和网关的
+      SPOT_INDEX_NAME_MAP、PRICE_DECIMAL_MAP都由这些数据重建
+    * 启动时写入元数据缓存，Info构造和合约查询不再等待网络请求，随后后台重新请求并比较差异
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, file_name: str, base_url: str, dexs: List[str]) -> None:
+        """
+        构造函数
+        """
+        self.file_name = file_name
+        self.base_url = base_url
+        self.dexs = dexs
+        # 上次保存的精简元数据
+        self.perp_dexs: list = []
+        self.metas: Dict[str, dict] = {}
+        self.spot_meta: dict = {}
+    # ----------------------------------------------------------------------------------------------------
+    def load(self, cache: MetaCache) -> bool:
+        """
+        读取本地快照并写入元数据缓存，快照不存在、版本或地址不一致、缺少交易所时返回False
+        """
+        data = load_json(self.file_name)
+        if not data or data.get("version") != META_SNAPSHOT_VERSION or data.get("base_url") != self.base_url:
+            return False
+        metas = data.get("metas", {})
+        if any(dex not in metas for dex in self.dexs) or not data.get("spot_meta"):
+            return False
+        self.perp_dexs = data["perp_dexs"]
+        self.metas = metas
+        self.spot_meta = data["spot_meta"]
+        cache.put(("perpDexs", self.base_url), self.perp_dexs)
+        for dex, meta in self.metas.items():
+            cache.put(("meta", self.base_url, dex), meta)
+        cache.put(("spotMeta", self.base_url), self.spot_meta)
+        return True
+    # ----------------------------------------------------------------------------------------------------
+    def update(self, perp_dexs: list, metas: Dict[str, dict], spot_meta: dict) -> Dict[str, Any]:
+        """
+        用最新元数据更新快照并保存，返回各永续交易所和现货的合约差异
+        """
+        perp_dexs = compact_perp_dexs(perp_dexs)
+        metas = {dex: compact_meta(meta) for dex, meta in metas.items()}
+        spot_meta = compact_spot_meta(spot_meta)
+        diffs: Dict[str, Any] = {}
+        for dex, meta in metas.items():
+            old_universe = self.metas.get(dex, {}).get("universe", [])
+            added, removed, changed = diff_universe(old_universe, meta["universe"])
+            if added or removed or changed:
+                diffs[dex] = (added, removed, changed)
+        spot_changed = spot_meta != self.spot_meta
+        self.perp_dexs = perp_dexs
+        self.metas = metas
+        self.spot_meta = spot_meta
+        save_json(
+            self.file_name,
+            {
+                "version": META_SNAPSHOT_VERSION,
+                "base_url": self.base_url,
+                "time": int(time()),
+                "perp_dexs": perp_dexs,
+                "metas": metas,
+                "spot_meta": spot_meta,
+            },
+        )
+        return {"perp": diffs, "spot": spot_changed}
@@ -0,0 +1,200 @@
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from vnpy.trader.object import TickData
+
+# 共享内存布局版本，布局变更时递增
+TICK_BOARD_MAGIC = 0x48544B42  # "HTKB"
+TICK_BOARD_VERSION = 1
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([("magic", np.uint32), ("version", np.uint32), ("capacity", np.uint32), ("count", np.uint32)])
+# 单个合约槽位，seq为顺序锁计数，奇数表示正在写入
+TICK_SLOT_DTYPE = np.dtype(
+    [
+        ("seq", np.uint64),
+        ("symbol", "S48"),
+        ("datetime", np.int64),  # 毫秒时间戳
+        ("last_price", np.float64),
+        ("volume", np.float64),
+        ("open_interest", np.float64),
+        ("pre_close", np.float64),
+        ("bid_price", np.float64, 5),
+        ("bid_volume", np.float64, 5),
+        ("ask_price", np.float64, 5),
+        ("ask_volume", np.float64, 5),
+    ],
+    align=True,
+)
+# 读取时等待写入完成的最大重试次数
+MAX_READ_RETRY = 10000
+# ----------------------------------------------------------------------------------------------------
+class TickBoard:
+    """
+    共享内存tick快照板
+    * mmap发布进程调用create创建并写入，同机其他进程调用attach只读访问
+    * 每个合约占用一个固定槽位，写入使用顺序锁(seqlock)，读取无需加锁，读到写入中的槽位时重试
+    """
+    # ----------------------------------------------------------------------------------------------------
+    def __init__(self, shm: SharedMemory, owner: bool) -> None:
+        """
+        构造函数
+        """
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+        capacity = int(self.header["capacity"][0])
+        self.slots = np.ndarray((capacity,), dtype=TICK_SLOT_DTYPE, buffer=shm.buf, offset=HEADER_SIZE)
+        # 各字段视图，写入时免去按字段名查找
+        self.seqs = self.slots["seq"]
+        self.symbols = self.slots["symbol"]
+        self.datetimes = self.slots["datetime"]
+        self.last_prices = self.slots["last_price"]
+        self.volumes = self.slots["volume"]
+        self.open_interests = self.slots["open_interest"]
+        self.pre_closes = self.slots["pre_close"]
+        self.bid_prices = self.slots["bid_price"]
+        self.bid_volumes = self.slots["bid_volume"]
+        self.ask_prices = self.slots["ask_price"]
+        self.ask_volumes = self.slots["ask_volume"]
+        self.slot_map: dict[str, int] = {}
+        self.refresh_slot_map()
+    # ----------------------------------------------------------------------------------------------------
+    @classmethod
+    def create(cls, name: str, capacity: int) -> "TickBoard":
+        """
+        发布进程创建共享内存，同名残留共享内存会被重建
+        """
+        size = HEADER_SIZE + capacity * TICK_SLOT_DTYPE.itemsize
+        try:
+            shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+        header["capacity"] = capacity
+        header["count"] = 0
+        header["version"] = TICK_BOARD_VERSION
+        header["magic"] = TICK_BOARD_MAGIC
+        del header
+        return cls(shm, True)
+    # ----------------------------------------------------------------------------------------------------
+    @classmethod
+    def attach(cls, name: str) -> "TickBoard":
+        """
+        订阅进程只读连接共享内存，进程退出时不删除共享内存
+        """
+        try:
+            shm = SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python 3.13以下没有track参数，需要手动取消资源跟踪
+            shm = SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+        if header["magic"][0] != TICK_BOARD_MAGIC or header["version"][0] != TICK_BOARD_VERSION:
+            del header
+            shm.close()
+            raise ValueError(f"共享内存{name}不是版本{TICK_BOARD_VERSION}的tick快照板")
+        del header
+        return cls(shm, False)
+    # ----------------------------------------------------------------------------------------------------
+    def refresh_slot_map(self) -> None:
+        """
+        根据槽位中的合约名称重建合约和槽位映射
+        """
+        count = int(self.header["count"][0])
+        self.slot_map = {symbol.decode(): index for index, symbol in enumerate(self.symbols[:count])}
+    # ----------------------------------------------------------------------------------------------------
+    def register(self, symbol_exchange: str) -> int | None:
+        """
+        发布进程为合约分配槽位，槽位已满时返回None
+        """
+        index = self.slot_map.get(symbol_exchange)
+        if index is not None:
+            return index
+        index = int(self.header["count"][0])
+        if index >= self.slots.size:
+            return None
+        self.symbols[index] = symbol_exchange.encode()
+        self.slot_map[symbol_exchange] = index
+        self.header["count"] = index + 1
+        return index
+    # ----------------------------------------------------------------------------------------------------
+    def write(self, symbol_exchange: str, tick: TickData) -> None:
+        """
+        写入tick快照，槽位已满未分配到槽位的合约不发布
+        """
+        index = self.slot_map.get(symbol_exchange)
+        if index is None:
+            index = self.register(symbol_exchange)
+            if index is None:
+                return
+        seq = self.seqs[index]
+        self.seqs[index] = seq + 1
+        self.datetimes[index] = int(tick.datetime.timestamp() * 1000)
+        self.last_prices[index] = tick.last_price
+        self.volumes[index] = tick.volume
+        self.open_interests[index] = tick.open_interest
+        self.pre_closes[index] = tick.pre_close
+        self.bid_prices[index] = (tick.bid_price_1, tick.bid_price_2, tick.bid_price_3, tick.bid_price_4, tick.bid_price_5)
+        self.bid_volumes[index] = (
+            tick.bid_volume_1,
+            tick.bid_volume_2,
+            tick.bid_volume_3,
+            tick.bid_volume_4,
+            tick.bid_volume_5,
+        )
+        self.ask_prices[index] = (tick.ask_price_1, tick.ask_price_2, tick.ask_price_3, tick.ask_price_4, tick.ask_price_5)
+        self.ask_volumes[index] = (
+            tick.ask_volume_1,
+            tick.ask_volume_2,
+            tick.ask_volume_3,
+            tick.ask_volume_4,
+            tick.ask_volume_5,
+        )
+        self.seqs[index] = seq + 2
+    # ----------------------------------------------------------------------------------------------------
+    def read(self, symbol_exchange: str) -> np.void | None:
+        """
+        读取合约一致的tick快照(结构化记录副本)，合约不存在或写入方长时间未完成写入时返回None
+        """
+        index = self.slot_map.get(symbol_exchange)
+        if index is None:
+            self.refresh_slot_map()
+            index = self.slot_map.get(symbol_exchange)
+            if index is None:
+                return None
+        seqs = self.seqs
+        for _ in range(MAX_READ_RETRY):
+            seq = seqs[index]
+            if seq & 1:
+                continue
+            record = self.slots[index].copy()
+            if seqs[index] == seq:
+                return record
+        return None
+    # ----------------------------------------------------------------------------------------------------
+    def get_sequence(self, symbol_exchange: str) -> int:
+        """
+        获取合约当前写入序号，读取方可据此判断是否有新数据
+        """
+        index = self.slot_map.get(symbol_exchange)
+        if index is None:
+            return 0
+        return int(self.seqs[index])
+    # ----------------------------------------------------------------------------------------------------
+    def close(self) -> None:
+        """
+        关闭共享内存，发布进程同时删除共享内存
+        """
+        # 释放对共享内存的numpy视图后才能关闭
+        for name in list(vars(self)):
+            if isinstance(getattr(self, name), np.ndarray):
+                setattr(self, name, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()